@@ -1,8 +1,15 @@
 from fastapi import APIRouter
-from app.api.v1 import auth, cards, media
+from app.api.v1 import auth, cards, events, export, imports, jobs, media, metrics, sync, tags
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(cards.router, prefix="/library", tags=["knowledge-cards"])
-api_router.include_router(media.router, prefix="/media", tags=["media-items"])
\ No newline at end of file
+api_router.include_router(media.router, prefix="/media", tags=["media-items"])
+api_router.include_router(tags.router, prefix="/tags", tags=["tags"])
+api_router.include_router(export.router, prefix="/export", tags=["export"])
+api_router.include_router(imports.router, prefix="/import", tags=["import"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(sync.router, prefix="/sync", tags=["sync"])
+api_router.include_router(events.router, prefix="/events", tags=["events"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
\ No newline at end of file
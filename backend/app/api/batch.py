@@ -0,0 +1,44 @@
+from typing import Any, List, Tuple, Type
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from app.core.config import settings
+from app.schemas.batch import BatchItemError
+
+
+def check_batch_size(size: int) -> None:
+    if size > settings.BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {size} items, at most {settings.BATCH_MAX_SIZE} allowed",
+        )
+
+
+def validate_batch(schema: Type[BaseModel], items: List[Any]) -> Tuple[List[Tuple[int, BaseModel]], List[BatchItemError]]:
+    check_batch_size(len(items))
+    valid = []
+    errors = []
+    for index, raw in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(raw)))
+        except ValidationError as e:
+            detail = [{"loc": err["loc"], "msg": err["msg"], "type": err["type"]} for err in e.errors()]
+            errors.append(BatchItemError(index=index, id=raw.get("id") if isinstance(raw, dict) else None, detail=detail))
+    return valid, errors
+
+
+def select_owned(
+    valid: List[Tuple[int, BaseModel]], owned_ids: List[int], not_found: str
+) -> Tuple[List[Tuple[int, BaseModel]], List[BatchItemError]]:
+    owned = set(owned_ids)
+    seen = set()
+    selected = []
+    errors = []
+    for index, item in valid:
+        if item.id not in owned:
+            errors.append(BatchItemError(index=index, id=item.id, detail=not_found))
+        elif item.id in seen:
+            errors.append(BatchItemError(index=index, id=item.id, detail="Duplicate id in batch"))
+        else:
+            seen.add(item.id)
+            selected.append((index, item))
+    return selected, errors
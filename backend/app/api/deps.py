@@ -1,7 +1,11 @@
-from fastapi import Depends, HTTPException, status
+from typing import AsyncGenerator, Callable, Optional
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.database import get_db
+from app.core.admission import expensive_requests
+from app.core.cache import user_cache, write_markers
+from app.core.database import AsyncSessionLocal, get_db
+from app.core.pagination import Cursor, decode_cursor
 from app.core.security import verify_token
 from app.crud.user import user_crud
 from app.models.user import User
@@ -21,10 +25,21 @@ async def get_current_user(
     if email is None:
         raise credentials_exception
     
-    user = await user_crud.get_by_email(db, email=email)
-    if user is None:
-        raise credentials_exception
+    user = await user_cache.get(email)
+    if user is not None:
+        user = await db.merge(user, load=False)
+    else:
+        # Looked up on the primary: a replica may not have a fresh sign-up yet.
+        replica_reads = db.info.pop("replica_reads", False)
+        user = await user_crud.get_by_email(db, email=email)
+        if user is None:
+            raise credentials_exception
+        await user_cache.set(email, user)
+        db.info["replica_reads"] = replica_reads
     
+    db.info["user_id"] = user.id
+    if await write_markers.is_recent(user.id):
+        db.info["replica_reads"] = False
     return user
 
 
@@ -36,6 +51,22 @@ async def get_current_active_user(
     return current_user
 
 
+async def get_stream_user(token: Optional[str]) -> Optional[User]:
+    # Event streams stay open for hours, so the lookup uses a session of its own
+    # instead of holding one from get_db for the whole connection.
+    email = verify_token(token) if token else None
+    if email is None:
+        return None
+    user = await user_cache.get(email)
+    if user is None:
+        async with AsyncSessionLocal() as db:
+            user = await user_crud.get_by_email(db, email=email)
+            if user is None:
+                return None
+            await user_cache.set(email, user)
+    return user if await user_crud.is_active(user) else None
+
+
 async def get_current_superuser(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -43,4 +74,26 @@ async def get_current_superuser(
         raise HTTPException(
             status_code=400, detail="The user doesn't have enough privileges"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+def expensive_request(name: str, *, query_param: Optional[str] = None) -> Callable:
+    async def dependency(
+        request: Request, current_user: User = Depends(get_current_active_user)
+    ) -> AsyncGenerator[None, None]:
+        if query_param is not None and not request.query_params.get(query_param):
+            yield
+            return
+        async with expensive_requests.slot(name, current_user.id):
+            yield
+    
+    return dependency
+
+
+def get_cursor(cursor: Optional[str] = Query(None)) -> Optional[Cursor]:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
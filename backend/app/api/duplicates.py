@@ -0,0 +1,77 @@
+from typing import Any, Awaitable, Callable, Dict, List
+from fastapi import HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.services.dedup import DuplicateIndexCache
+
+DUPLICATES_HEADER = "X-Possible-Duplicates"
+ON_DUPLICATE_PATTERN = "^(allow|warn|reject)$"
+
+
+async def live_titles(
+    db: AsyncSession,
+    *,
+    index: DuplicateIndexCache,
+    ids: List[int],
+    owner_id: int,
+    get_titles: Callable[..., Awaitable[Dict[int, str]]]
+) -> Dict[int, str]:
+    # Indexes are cached per process, so rows deleted through another worker can still be in them.
+    titles = await get_titles(db, ids=ids, owner_id=owner_id)
+    missing = [id for id in ids if id not in titles]
+    if missing:
+        index.remove(owner_id, missing)
+    return titles
+
+
+async def check_duplicates(
+    db: AsyncSession,
+    response: Response,
+    *,
+    index: DuplicateIndexCache,
+    obj_in: Any,
+    owner_id: int,
+    on_duplicate: str,
+    get_titles: Callable[..., Awaitable[Dict[int, str]]]
+) -> None:
+    if on_duplicate == "allow":
+        return
+    matches = await index.find(db, owner_id=owner_id, obj=obj_in)
+    if not matches:
+        return
+    titles = await live_titles(db, index=index, ids=[id for id, _ in matches], owner_id=owner_id, get_titles=get_titles)
+    matches = [(id, similarity) for id, similarity in matches if id in titles][:settings.DEDUP_MAX_MATCHES]
+    if not matches:
+        return
+    if on_duplicate == "warn":
+        response.headers[DUPLICATES_HEADER] = ",".join(str(id) for id, _ in matches)
+        return
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={
+            "message": "Possible duplicate",
+            "duplicates": [
+                {"id": id, "title": titles[id], "similarity": round(similarity, 4)}
+                for id, similarity in matches
+            ],
+        },
+    )
+
+
+async def duplicate_groups(
+    db: AsyncSession,
+    *,
+    index: DuplicateIndexCache,
+    owner_id: int,
+    limit: int,
+    get_titles: Callable[..., Awaitable[Dict[int, str]]]
+) -> List[List[Dict[str, Any]]]:
+    groups = (await index.groups(db, owner_id=owner_id))[:limit]
+    ids = [id for group in groups for id, _ in group]
+    titles = await live_titles(db, index=index, ids=ids, owner_id=owner_id, get_titles=get_titles)
+    groups = [[(id, similarity) for id, similarity in group if id in titles] for group in groups]
+    return [
+        [{"id": id, "title": titles[id], "similarity": round(similarity, 4)} for id, similarity in group]
+        for group in groups
+        if len(group) > 1
+    ]
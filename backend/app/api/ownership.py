@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Any, NoReturn, Optional
+from fastapi import HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.etag import check_if_match, make_etag
+
+
+def check_version(version: Any, *, owner_id: int, not_found: str) -> None:
+    if not version:
+        raise HTTPException(status_code=404, detail=not_found)
+    if version.owner_id != owner_id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+
+async def if_match_version(
+    request: Request, crud: Any, db: AsyncSession, *, id: int, owner_id: int, not_found: str
+) -> Optional[datetime]:
+    if request.headers.get("if-match") is None:
+        return None
+    version = await crud.get_version(db, id=id)
+    check_version(version, owner_id=owner_id, not_found=not_found)
+    check_if_match(request, make_etag(version.id, version.updated_at))
+    return version.updated_at
+
+
+async def raise_write_failed(crud: Any, db: AsyncSession, *, id: int, owner_id: int, not_found: str) -> NoReturn:
+    # Owner-scoped writes match nothing for missing, foreign and concurrently changed rows alike;
+    # only this failure path pays for telling them apart.
+    version = await crud.get_version(db, id=id)
+    check_version(version, owner_id=owner_id, not_found=not_found)
+    raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Resource has been modified")
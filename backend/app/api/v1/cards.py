@@ -1,25 +1,79 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Any, List, Optional, Union
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.api.deps import get_current_active_user
+from app.api.batch import check_batch_size, select_owned, validate_batch
+from app.api.duplicates import ON_DUPLICATE_PATTERN, check_duplicates, duplicate_groups
+from app.api.deps import expensive_request, get_current_active_user, get_cursor
+from app.api.ownership import if_match_version, raise_write_failed
 from app.core.database import get_db
-from app.crud.card import knowledge_card_crud, notebook_crud
-from app.schemas.card import KnowledgeCard, KnowledgeCardCreate, KnowledgeCardUpdate, Notebook, NotebookCreate, NotebookUpdate
+from app.core.etag import conditional_list, make_etag, not_modified, set_etag
+from app.core.pagination import Cursor, set_cursor_headers
+from app.core.config import settings
+from app.core.serialization import dump_rows, fast_json
+from app.crud.card import card_reference_crud, knowledge_card_crud, notebook_crud
+from app.schemas.batch import BatchDelete, BatchDeleteResult, BatchItemError
+from app.schemas.card import KnowledgeCard, KnowledgeCardCreate, KnowledgeCardSearchHit, KnowledgeCardUpdate, KnowledgeCardBatchUpdate, KnowledgeCardBatchResult, Notebook, NotebookCreate, NotebookUpdate
+from app.schemas.card import CardReference, CardReferenceCreate, CardGraph, CardGraphComponent, CardPath, KnowledgeCardSummary, KnowledgeCardSummaryHit, RelatedCard
+from app.schemas.card import CardDuplicateGroup, CardMerge
+from app.services.graph import GRAPH_DIRECTIONS, reference_graph_cache
+from app.services.dedup import card_duplicates
+from app.services.related import related_card_index
 
 router = APIRouter()
 
+GRAPH_DIRECTION_PATTERN = f"^({'|'.join(GRAPH_DIRECTIONS)})$"
 
-@router.get("/cards", response_model=List[KnowledgeCard])
+
+async def _get_card_title(db: AsyncSession, *, card_id: int, owner_id: int) -> str:
+    titles = await knowledge_card_crud.get_titles(db, ids=[card_id], owner_id=owner_id)
+    if card_id not in titles:
+        raise HTTPException(status_code=404, detail="Knowledge card not found")
+    return titles[card_id]
+
+
+@router.get(
+    "/cards",
+    response_model=Union[List[KnowledgeCardSearchHit], List[KnowledgeCardSummaryHit]],
+    dependencies=[Depends(expensive_request("card_search", query_param="search"))]
+)
 async def get_knowledge_cards(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: Any = Depends(get_current_active_user),
+    cursor: Optional[Cursor] = Depends(get_cursor),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     category: str = Query(None),
     tags: str = Query(None),
+    tag_mode: str = Query("all", pattern="^(all|any)$"),
     status: str = Query(None),
-    search: str = Query(None)
+    search: str = Query(None),
+    view: str = Query("full", pattern="^(full|summary)$")
 ) -> Any:
+    summary = view == "summary"
+    card_schema = KnowledgeCardSummary if summary else KnowledgeCard
+    if search:
+        hits = await knowledge_card_crud.search(
+            db,
+            owner_id=current_user.id,
+            search=search,
+            skip=skip,
+            limit=limit,
+            category=category,
+            tags=tags,
+            match_all_tags=tag_mode == "all",
+            status=status,
+            summary=summary
+        )
+        cached = conditional_list(request, response, [card for card, _ in hits])
+        if cached:
+            return cached
+        results = dump_rows(card_schema, [card for card, _ in hits])
+        for result, (_, snippet) in zip(results, hits):
+            result["snippet"] = snippet
+        return fast_json(results, response)
+    
     cards = await knowledge_card_crud.get_multi(
         db,
         owner_id=current_user.id,
@@ -27,10 +81,16 @@ async def get_knowledge_cards(
         limit=limit,
         category=category,
         tags=tags,
+        match_all_tags=tag_mode == "all",
         status=status,
-        search=search
+        cursor=cursor,
+        summary=summary
     )
-    return cards
+    set_cursor_headers(response, cards, cursor=cursor, skip=skip, limit=limit)
+    cached = conditional_list(request, response, cards)
+    if cached:
+        return cached
+    return fast_json(dump_rows(card_schema, cards), response)
 
 
 @router.post("/cards", response_model=KnowledgeCard)
@@ -38,24 +98,178 @@ async def create_knowledge_card(
     *,
     db: AsyncSession = Depends(get_db),
     current_user: Any = Depends(get_current_active_user),
-    card_in: KnowledgeCardCreate
+    response: Response,
+    card_in: KnowledgeCardCreate,
+    on_duplicate: str = Query("warn", pattern=ON_DUPLICATE_PATTERN)
 ) -> Any:
+    await check_duplicates(
+        db,
+        response,
+        index=card_duplicates,
+        obj_in=card_in,
+        owner_id=current_user.id,
+        on_duplicate=on_duplicate,
+        get_titles=knowledge_card_crud.get_titles
+    )
     card = await knowledge_card_crud.create(db, obj_in=card_in, owner_id=current_user.id)
     return card
 
 
+@router.post("/cards/batch", response_model=KnowledgeCardBatchResult)
+async def create_knowledge_cards_batch(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(get_current_active_user),
+    items: List[Any] = Body(...)
+) -> Any:
+    valid, errors = validate_batch(KnowledgeCardCreate, items)
+    cards = await knowledge_card_crud.create_many(
+        db, objs_in=[card_in for _, card_in in valid], owner_id=current_user.id
+    )
+    return {"items": cards, "errors": errors}
+
+
+@router.patch("/cards/batch", response_model=KnowledgeCardBatchResult)
+async def update_knowledge_cards_batch(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(get_current_active_user),
+    items: List[Any] = Body(...)
+) -> Any:
+    valid, errors = validate_batch(KnowledgeCardBatchUpdate, items)
+    owned_ids = await knowledge_card_crud.get_owned_ids(
+        db, ids=[card_in.id for _, card_in in valid], owner_id=current_user.id
+    )
+    selected, not_found = select_owned(valid, owned_ids, "Knowledge card not found")
+    cards = await knowledge_card_crud.update_many(
+        db, updates={card_in.id: card_in for _, card_in in selected}, owner_id=current_user.id
+    )
+    return {"items": cards, "errors": sorted(errors + not_found, key=lambda error: error.index)}
+
+
+@router.delete("/cards/batch", response_model=BatchDeleteResult)
+async def delete_knowledge_cards_batch(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(get_current_active_user),
+    batch_in: BatchDelete
+) -> Any:
+    check_batch_size(len(batch_in.ids))
+    deleted = await knowledge_card_crud.delete_many(db, ids=batch_in.ids, owner_id=current_user.id)
+    deleted_set = set(deleted)
+    errors = [
+        BatchItemError(index=index, id=id, detail="Knowledge card not found")
+        for index, id in enumerate(batch_in.ids)
+        if id not in deleted_set
+    ]
+    return {"deleted": deleted, "errors": errors}
+
+
+@router.get("/cards/favorites", response_model=Union[List[KnowledgeCard], List[KnowledgeCardSummary]])
+async def get_favorite_cards(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(get_current_active_user),
+    cursor: Optional[Cursor] = Depends(get_cursor),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    view: str = Query("full", pattern="^(full|summary)$")
+) -> Any:
+    summary = view == "summary"
+    cards = await knowledge_card_crud.get_favorites(
+        db, owner_id=current_user.id, skip=skip, limit=limit, cursor=cursor, summary=summary
+    )
+    set_cursor_headers(response, cards, cursor=cursor, skip=skip, limit=limit)
+    cached = conditional_list(request, response, cards)
+    if cached:
+        return cached
+    return fast_json(dump_rows(KnowledgeCardSummary if summary else KnowledgeCard, cards), response)
+
+
+@router.get("/cards/recent", response_model=Union[List[KnowledgeCard], List[KnowledgeCardSummary]])
+async def get_recent_cards(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(get_current_active_user),
+    limit: int = Query(10, ge=1, le=100),
+    view: str = Query("full", pattern="^(full|summary)$")
+) -> Any:
+    summary = view == "summary"
+    cards = await knowledge_card_crud.get_recent(db, owner_id=current_user.id, limit=limit, summary=summary)
+    cached = conditional_list(request, response, cards)
+    if cached:
+        return cached
+    return fast_json(dump_rows(KnowledgeCardSummary if summary else KnowledgeCard, cards), response)
+
+
+@router.get("/cards/statistics", dependencies=[Depends(expensive_request("card_statistics"))])
+async def get_card_statistics(
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(get_current_active_user)
+) -> Any:
+    stats = await knowledge_card_crud.get_statistics(db, owner_id=current_user.id)
+    return stats
+
+
+@router.get("/cards/graph/components", response_model=List[CardGraphComponent])
+async def get_card_graph_components(
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(get_current_active_user),
+    min_size: int = Query(2, ge=1),
+    limit: int = Query(100, ge=1, le=1000)
+) -> Any:
+    graph = await reference_graph_cache.get(db, owner_id=current_user.id)
+    components = [component for component in graph.components() if len(component) >= min_size]
+    return [{"size": len(component), "card_ids": component} for component in components[:limit]]
+
+
+@router.get(
+    "/cards/duplicates",
+    response_model=List[CardDuplicateGroup],
+    dependencies=[Depends(expensive_request("card_duplicates"))]
+)
+async def get_duplicate_cards(
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(get_current_active_user),
+    limit: int = Query(100, ge=1, le=1000)
+) -> Any:
+    groups = await duplicate_groups(
+        db, index=card_duplicates, owner_id=current_user.id, limit=limit, get_titles=knowledge_card_crud.get_titles
+    )
+    return fast_json([
+        {"similarity": min(card["similarity"] for card in cards), "cards": cards}
+        for cards in groups
+        if len(cards) > 1
+    ])
+
+
 @router.get("/cards/{card_id}", response_model=KnowledgeCard)
 async def get_knowledge_card(
     *,
     db: AsyncSession = Depends(get_db),
     current_user: Any = Depends(get_current_active_user),
+    request: Request,
+    response: Response,
     card_id: int
 ) -> Any:
+    if request.headers.get("if-none-match"):
+        version = await knowledge_card_crud.get_version(db, id=card_id)
+        if not version:
+            raise HTTPException(status_code=404, detail="Knowledge card not found")
+        if version.owner_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+        cached = not_modified(request, make_etag(version.id, version.updated_at))
+        if cached:
+            return cached
+    
     card = await knowledge_card_crud.get_by_id(db, id=card_id)
     if not card:
         raise HTTPException(status_code=404, detail="Knowledge card not found")
     if card.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
+    set_etag(response, make_etag(card.id, card.updated_at))
     return card
 
 
@@ -64,15 +278,21 @@ async def update_knowledge_card(
     *,
     db: AsyncSession = Depends(get_db),
     current_user: Any = Depends(get_current_active_user),
+    request: Request,
+    response: Response,
     card_id: int,
     card_in: KnowledgeCardUpdate
 ) -> Any:
-    card = await knowledge_card_crud.get_by_id(db, id=card_id)
+    not_found = "Knowledge card not found"
+    updated_at = await if_match_version(
+        request, knowledge_card_crud, db, id=card_id, owner_id=current_user.id, not_found=not_found
+    )
+    card = await knowledge_card_crud.update(
+        db, id=card_id, owner_id=current_user.id, obj_in=card_in, updated_at=updated_at
+    )
     if not card:
-        raise HTTPException(status_code=404, detail="Knowledge card not found")
-    if card.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    card = await knowledge_card_crud.update(db, db_obj=card, obj_in=card_in)
+        await raise_write_failed(knowledge_card_crud, db, id=card_id, owner_id=current_user.id, not_found=not_found)
+    set_etag(response, make_etag(card.id, card.updated_at))
     return card
 
 
@@ -81,33 +301,156 @@ async def delete_knowledge_card(
     *,
     db: AsyncSession = Depends(get_db),
     current_user: Any = Depends(get_current_active_user),
+    request: Request,
     card_id: int
 ) -> Any:
-    success = await knowledge_card_crud.delete(db, id=card_id, owner_id=current_user.id)
+    not_found = "Knowledge card not found"
+    updated_at = await if_match_version(
+        request, knowledge_card_crud, db, id=card_id, owner_id=current_user.id, not_found=not_found
+    )
+    success = await knowledge_card_crud.delete(db, id=card_id, owner_id=current_user.id, updated_at=updated_at)
     if not success:
-        raise HTTPException(status_code=404, detail="Knowledge card not found")
+        await raise_write_failed(knowledge_card_crud, db, id=card_id, owner_id=current_user.id, not_found=not_found)
     return {"message": "Knowledge card deleted successfully"}
 
 
-@router.get("/cards/favorites", response_model=List[KnowledgeCard])
-async def get_favorite_cards(
+@router.get("/cards/{card_id}/references", response_model=List[CardReference])
+async def get_card_references(
+    *,
     db: AsyncSession = Depends(get_db),
     current_user: Any = Depends(get_current_active_user),
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=100)
+    card_id: int
 ) -> Any:
-    cards = await knowledge_card_crud.get_favorites(db, owner_id=current_user.id, skip=skip, limit=limit)
-    return cards
+    await _get_card_title(db, card_id=card_id, owner_id=current_user.id)
+    references = await card_reference_crud.get_by_card_id(db, card_id=card_id)
+    return references
 
 
-@router.get("/cards/recent", response_model=List[KnowledgeCard])
-async def get_recent_cards(
+@router.post("/cards/{card_id}/references", response_model=CardReference)
+async def create_card_reference(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(get_current_active_user),
+    card_id: int,
+    reference_in: CardReferenceCreate
+) -> Any:
+    titles = await knowledge_card_crud.get_titles(
+        db, ids=[card_id, reference_in.referenced_card_id], owner_id=current_user.id
+    )
+    if card_id not in titles or reference_in.referenced_card_id not in titles:
+        raise HTTPException(status_code=404, detail="Knowledge card not found")
+    reference = await card_reference_crud.create(
+        db,
+        card_id=card_id,
+        owner_id=current_user.id,
+        **reference_in.dict()
+    )
+    return reference
+
+
+@router.delete("/cards/{card_id}/references/{reference_id}")
+async def delete_card_reference(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(get_current_active_user),
+    card_id: int,
+    reference_id: int
+) -> Any:
+    reference = await card_reference_crud.get_by_id(db, id=reference_id)
+    if not reference or reference.card_id != card_id:
+        raise HTTPException(status_code=404, detail="Card reference not found")
+    success = await card_reference_crud.delete(db, id=reference_id, owner_id=current_user.id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Card reference not found")
+    return {"message": "Card reference deleted successfully"}
+
+
+@router.get("/cards/{card_id}/backlinks", response_model=List[CardReference])
+async def get_card_backlinks(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(get_current_active_user),
+    card_id: int
+) -> Any:
+    await _get_card_title(db, card_id=card_id, owner_id=current_user.id)
+    backlinks = await card_reference_crud.get_backlinks(db, card_id=card_id)
+    return backlinks
+
+
+@router.get("/cards/{card_id}/graph", response_model=CardGraph)
+async def get_card_graph(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(get_current_active_user),
+    card_id: int,
+    depth: int = Query(1, ge=1, le=settings.GRAPH_MAX_DEPTH),
+    direction: str = Query("both", pattern=GRAPH_DIRECTION_PATTERN)
+) -> Any:
+    await _get_card_title(db, card_id=card_id, owner_id=current_user.id)
+    graph = await reference_graph_cache.get(db, owner_id=current_user.id)
+    depths, truncated = graph.neighborhood(
+        card_id, depth=depth, direction=direction, max_nodes=settings.GRAPH_MAX_NODES
+    )
+    titles = await knowledge_card_crud.get_titles(db, ids=list(depths), owner_id=current_user.id)
+    return {
+        "nodes": [{"id": id, "title": titles[id], "depth": depth} for id, depth in depths.items() if id in titles],
+        "edges": [
+            {"source": source, "target": target, "reference_type": reference_type}
+            for source, target, reference_type in graph.edges_between(titles)
+        ],
+        "truncated": truncated
+    }
+
+
+@router.get("/cards/{card_id}/path/{target_id}", response_model=CardPath)
+async def get_card_path(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(get_current_active_user),
+    card_id: int,
+    target_id: int,
+    direction: str = Query("both", pattern=GRAPH_DIRECTION_PATTERN)
+) -> Any:
+    await _get_card_title(db, card_id=card_id, owner_id=current_user.id)
+    await _get_card_title(db, card_id=target_id, owner_id=current_user.id)
+    graph = await reference_graph_cache.get(db, owner_id=current_user.id)
+    path = graph.shortest_path(card_id, target_id, direction=direction)
+    if path is None:
+        raise HTTPException(status_code=404, detail="No path between cards")
+    titles = await knowledge_card_crud.get_titles(db, ids=path, owner_id=current_user.id)
+    return {
+        "length": len(path) - 1,
+        "nodes": [{"id": id, "title": titles.get(id, ""), "depth": depth} for depth, id in enumerate(path)]
+    }
+
+
+@router.get("/cards/{card_id}/related", response_model=List[RelatedCard])
+async def get_related_cards(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(get_current_active_user),
+    card_id: int,
+    limit: int = Query(10, ge=1, le=settings.RELATED_MAX_RESULTS)
+) -> Any:
+    await _get_card_title(db, card_id=card_id, owner_id=current_user.id)
+    related = await related_card_index.related(db, owner_id=current_user.id, card_id=card_id, limit=limit)
+    return fast_json([{"id": id, "title": title, "score": round(score, 4)} for id, title, score in related])
+
+
+@router.post("/cards/{card_id}/merge", response_model=KnowledgeCard)
+async def merge_knowledge_cards(
+    *,
     db: AsyncSession = Depends(get_db),
     current_user: Any = Depends(get_current_active_user),
-    limit: int = Query(10, ge=1, le=100)
+    card_id: int,
+    merge_in: CardMerge
 ) -> Any:
-    cards = await knowledge_card_crud.get_recent(db, owner_id=current_user.id, limit=limit)
-    return cards
+    card = await knowledge_card_crud.merge(
+        db, target_id=card_id, duplicate_ids=merge_in.duplicate_ids, owner_id=current_user.id
+    )
+    if not card:
+        raise HTTPException(status_code=404, detail="Knowledge card not found")
+    return card
 
 
 @router.get("/notebooks", response_model=List[Notebook])
@@ -138,12 +481,9 @@ async def update_notebook(
     notebook_id: int,
     notebook_in: NotebookUpdate
 ) -> Any:
-    notebook = await notebook_crud.get_by_id(db, id=notebook_id)
+    notebook = await notebook_crud.update(db, id=notebook_id, owner_id=current_user.id, obj_in=notebook_in)
     if not notebook:
-        raise HTTPException(status_code=404, detail="Notebook not found")
-    if notebook.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    notebook = await notebook_crud.update(db, db_obj=notebook, obj_in=notebook_in)
+        await raise_write_failed(notebook_crud, db, id=notebook_id, owner_id=current_user.id, not_found="Notebook not found")
     return notebook
 
 
@@ -156,7 +496,7 @@ async def delete_notebook(
 ) -> Any:
     success = await notebook_crud.delete(db, id=notebook_id, owner_id=current_user.id)
     if not success:
-        raise HTTPException(status_code=404, detail="Notebook not found")
+        await raise_write_failed(notebook_crud, db, id=notebook_id, owner_id=current_user.id, not_found="Notebook not found")
     return {"message": "Notebook deleted successfully"}
 
 
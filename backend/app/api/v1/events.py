@@ -0,0 +1,92 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from starlette.requests import HTTPConnection
+from app.api.deps import get_stream_user
+from app.core.events import CLOSED, HEARTBEAT, Subscription, event_hub
+
+router = APIRouter()
+
+# Proxies such as nginx would otherwise hold events back in their buffers.
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+SSE_RETRY_MS = 5000
+
+
+def stream_token(connection: HTTPConnection, token: Optional[str]) -> Optional[str]:
+    # EventSource and browser WebSockets cannot set headers, so the token may come as a query parameter.
+    scheme, _, credentials = connection.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and credentials:
+        return credentials
+    return token
+
+
+def sse_message(message: Dict[str, Any]) -> str:
+    if message is HEARTBEAT:
+        return ": heartbeat\n\n"
+    return f"event: {message['event']}\ndata: {json.dumps(message)}\n\n"
+
+
+async def sse_stream(owner_id: int) -> AsyncIterator[str]:
+    # Subscribed only once the stream runs, so the finally below always releases it.
+    subscription = event_hub.subscribe(owner_id)
+    if subscription is None:
+        return
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        while True:
+            yield sse_message(await subscription.get())
+    finally:
+        event_hub.unsubscribe(subscription)
+
+
+async def read_until_closed(websocket: WebSocket, subscription: Subscription) -> None:
+    # Client messages are read only to be dropped, so they do not pile up in the server's
+    # buffers and a close frame ends the sender right away instead of at its next send.
+    try:
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    finally:
+        subscription.close()
+
+
+@router.get("")
+async def event_stream(request: Request, token: Optional[str] = None) -> Any:
+    user = await get_stream_user(stream_token(request, token))
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if not event_hub.has_room(user.id):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many open event streams"
+        )
+    return StreamingResponse(sse_stream(user.id), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.websocket("/ws")
+async def event_socket(websocket: WebSocket, token: Optional[str] = None) -> None:
+    user = await get_stream_user(stream_token(websocket, token))
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    subscription = event_hub.subscribe(user.id)
+    if subscription is None:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+    reader = None
+    try:
+        await websocket.accept()
+        reader = asyncio.create_task(read_until_closed(websocket, subscription))
+        while (message := await subscription.get()) is not CLOSED:
+            await websocket.send_text(json.dumps(message))
+    except (WebSocketDisconnect, OSError):
+        pass
+    finally:
+        event_hub.unsubscribe(subscription)
+        if reader is not None:
+            reader.cancel()
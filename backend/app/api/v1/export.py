@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from app.api.deps import expensive_request, get_current_active_user
+from app.services.exporter import EXPORT_ENTITIES, export_stream
+
+router = APIRouter()
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+@router.get("", dependencies=[Depends(expensive_request("export"))])
+async def export_library(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    entity: Optional[str] = None,
+    gzip: bool = False,
+    current_user: Any = Depends(get_current_active_user)
+) -> Any:
+    if entity is not None and entity not in EXPORT_ENTITIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"entity must be one of: {', '.join(EXPORT_ENTITIES)}"
+        )
+    if format == "csv" and entity is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV export requires an entity"
+        )
+    
+    entities = [entity] if entity else list(EXPORT_ENTITIES)
+    filename = f"mindgarden-{entity or 'export'}-{datetime.utcnow():%Y%m%d%H%M%S}.{format}"
+    media_type = EXPORT_MEDIA_TYPES[format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    
+    return StreamingResponse(
+        export_stream(current_user.id, format=format, entities=entities, gzip=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
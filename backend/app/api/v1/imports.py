@@ -0,0 +1,88 @@
+import asyncio
+import os
+import tempfile
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile, status
+from app.api.deps import get_current_active_user
+from app.core.config import settings
+from app.core.jobs import job_queue
+from app.schemas.imports import ImportJob
+from app.services.importer import IMPORT_JOB, RECORD_SCHEMAS, import_job_view, new_import_progress
+
+router = APIRouter()
+
+
+def _check_type(default_type: Optional[str]) -> None:
+    if default_type is not None and default_type not in RECORD_SCHEMAS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"type must be one of: {', '.join(RECORD_SCHEMAS)}"
+        )
+
+
+def _spool_file(suffix: str) -> Any:
+    fd, path = tempfile.mkstemp(prefix="mindgarden-import-", suffix=suffix, dir=settings.IMPORT_SPOOL_DIR)
+    return os.fdopen(fd, "wb"), path
+
+
+@router.post("", response_model=ImportJob, status_code=status.HTTP_202_ACCEPTED)
+async def import_file(
+    file: UploadFile = File(...),
+    default_type: Optional[str] = Query(None, alias="type"),
+    current_user: Any = Depends(get_current_active_user)
+) -> Any:
+    _check_type(default_type)
+    filename = file.filename or "upload"
+    out, path = _spool_file(os.path.splitext(filename)[1])
+    with out:
+        while chunk := await file.read(settings.IMPORT_UPLOAD_CHUNK_BYTES):
+            await asyncio.to_thread(out.write, chunk)
+        size = out.tell()
+    
+    job = await job_queue.enqueue(
+        IMPORT_JOB,
+        owner_id=current_user.id,
+        progress=new_import_progress(size),
+        path=path,
+        filename=filename,
+        default_type=default_type
+    )
+    return import_job_view(job)
+
+
+@router.post("/stream", response_model=ImportJob, status_code=status.HTTP_202_ACCEPTED)
+async def import_stream(
+    request: Request,
+    default_type: Optional[str] = Query(None, alias="type"),
+    current_user: Any = Depends(get_current_active_user)
+) -> Any:
+    _check_type(default_type)
+    out, path = _spool_file(".ndjson")
+    with out:
+        async for chunk in request.stream():
+            await asyncio.to_thread(out.write, chunk)
+        size = out.tell()
+    
+    job = await job_queue.enqueue(
+        IMPORT_JOB,
+        owner_id=current_user.id,
+        progress=new_import_progress(size),
+        path=path,
+        filename="stream.ndjson",
+        default_type=default_type
+    )
+    return import_job_view(job)
+
+
+@router.get("/{job_id}", response_model=ImportJob)
+async def get_import_job(
+    job_id: str,
+    current_user: Any = Depends(get_current_active_user)
+) -> Any:
+    job = await job_queue.get(job_id)
+    if not job or job["name"] != IMPORT_JOB or job["owner_id"] != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found"
+        )
+    return import_job_view(job)
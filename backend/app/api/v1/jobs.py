@@ -0,0 +1,29 @@
+from typing import Any, List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.api.deps import get_current_active_user
+from app.core.jobs import job_queue
+from app.schemas.job import Job
+
+router = APIRouter()
+
+
+@router.get("", response_model=List[Job])
+async def get_jobs(
+    limit: int = Query(50, ge=1, le=200),
+    current_user: Any = Depends(get_current_active_user)
+) -> Any:
+    return await job_queue.list(owner_id=current_user.id, limit=limit)
+
+
+@router.get("/{job_id}", response_model=Job)
+async def get_job(
+    job_id: str,
+    current_user: Any = Depends(get_current_active_user)
+) -> Any:
+    job = await job_queue.get(job_id)
+    if not job or job["owner_id"] != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
@@ -1,26 +1,45 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Any, List, Optional, Union
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.api.deps import get_current_active_user
+from app.api.batch import check_batch_size, select_owned, validate_batch
+from app.api.duplicates import ON_DUPLICATE_PATTERN, check_duplicates, duplicate_groups
+from app.api.deps import expensive_request, get_current_active_user, get_cursor
+from app.api.ownership import if_match_version, raise_write_failed
 from app.core.database import get_db
+from app.core.etag import conditional_list, make_etag, not_modified, set_etag
+from app.core.pagination import Cursor, set_cursor_headers
+from app.core.serialization import dump_rows, fast_json
 from app.crud.media import media_item_crud, media_collection_crud
-from app.schemas.media import MediaItem, MediaItemCreate, MediaItemUpdate, MediaCollection, MediaCollectionCreate, MediaCollectionUpdate
+from app.schemas.batch import BatchDelete, BatchDeleteResult, BatchItemError
+from app.schemas.media import MediaItem, MediaItemCreate, MediaItemUpdate, MediaItemBatchUpdate, MediaItemBatchResult, MediaItemSummary, MediaCollection, MediaCollectionCreate, MediaCollectionUpdate
+from app.schemas.media import MediaDuplicateGroup
+from app.services.dedup import media_duplicates
 
 router = APIRouter()
 
 
-@router.get("/media", response_model=List[MediaItem])
+@router.get(
+    "/media",
+    response_model=Union[List[MediaItem], List[MediaItemSummary]],
+    dependencies=[Depends(expensive_request("media_search", query_param="search"))]
+)
 async def get_media_items(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: Any = Depends(get_current_active_user),
+    cursor: Optional[Cursor] = Depends(get_cursor),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     media_type: str = Query(None),
     status: str = Query(None),
     category: str = Query(None),
     tags: str = Query(None),
-    search: str = Query(None)
+    tag_mode: str = Query("all", pattern="^(all|any)$"),
+    search: str = Query(None),
+    view: str = Query("full", pattern="^(full|summary)$")
 ) -> Any:
+    summary = view == "summary"
     items = await media_item_crud.get_multi(
         db,
         owner_id=current_user.id,
@@ -30,9 +49,16 @@ async def get_media_items(
         status=status,
         category=category,
         tags=tags,
-        search=search
+        match_all_tags=tag_mode == "all",
+        search=search,
+        cursor=cursor,
+        summary=summary
     )
-    return items
+    set_cursor_headers(response, items, cursor=cursor, skip=skip, limit=limit)
+    cached = conditional_list(request, response, items)
+    if cached:
+        return cached
+    return fast_json(dump_rows(MediaItemSummary if summary else MediaItem, items), response)
 
 
 @router.post("/media", response_model=MediaItem)
@@ -40,24 +66,148 @@ async def create_media_item(
     *,
     db: AsyncSession = Depends(get_db),
     current_user: Any = Depends(get_current_active_user),
-    media_in: MediaItemCreate
+    response: Response,
+    media_in: MediaItemCreate,
+    on_duplicate: str = Query("warn", pattern=ON_DUPLICATE_PATTERN)
 ) -> Any:
+    await check_duplicates(
+        db,
+        response,
+        index=media_duplicates,
+        obj_in=media_in,
+        owner_id=current_user.id,
+        on_duplicate=on_duplicate,
+        get_titles=media_item_crud.get_titles
+    )
     item = await media_item_crud.create(db, obj_in=media_in, owner_id=current_user.id)
     return item
 
 
+@router.post("/media/batch", response_model=MediaItemBatchResult)
+async def create_media_items_batch(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(get_current_active_user),
+    items: List[Any] = Body(...)
+) -> Any:
+    valid, errors = validate_batch(MediaItemCreate, items)
+    media_items = await media_item_crud.create_many(
+        db, objs_in=[media_in for _, media_in in valid], owner_id=current_user.id
+    )
+    return {"items": media_items, "errors": errors}
+
+
+@router.patch("/media/batch", response_model=MediaItemBatchResult)
+async def update_media_items_batch(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(get_current_active_user),
+    items: List[Any] = Body(...)
+) -> Any:
+    valid, errors = validate_batch(MediaItemBatchUpdate, items)
+    owned_ids = await media_item_crud.get_owned_ids(
+        db, ids=[media_in.id for _, media_in in valid], owner_id=current_user.id
+    )
+    selected, not_found = select_owned(valid, owned_ids, "Media item not found")
+    media_items = await media_item_crud.update_many(
+        db, updates={media_in.id: media_in for _, media_in in selected}, owner_id=current_user.id
+    )
+    return {"items": media_items, "errors": sorted(errors + not_found, key=lambda error: error.index)}
+
+
+@router.delete("/media/batch", response_model=BatchDeleteResult)
+async def delete_media_items_batch(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(get_current_active_user),
+    batch_in: BatchDelete
+) -> Any:
+    check_batch_size(len(batch_in.ids))
+    deleted = await media_item_crud.delete_many(db, ids=batch_in.ids, owner_id=current_user.id)
+    deleted_set = set(deleted)
+    errors = [
+        BatchItemError(index=index, id=id, detail="Media item not found")
+        for index, id in enumerate(batch_in.ids)
+        if id not in deleted_set
+    ]
+    return {"deleted": deleted, "errors": errors}
+
+
+@router.get("/media/recent", response_model=Union[List[MediaItem], List[MediaItemSummary]])
+async def get_recent_media(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(get_current_active_user),
+    limit: int = Query(10, ge=1, le=100),
+    view: str = Query("full", pattern="^(full|summary)$")
+) -> Any:
+    summary = view == "summary"
+    items = await media_item_crud.get_recent(db, owner_id=current_user.id, limit=limit, summary=summary)
+    cached = conditional_list(request, response, items)
+    if cached:
+        return cached
+    return fast_json(dump_rows(MediaItemSummary if summary else MediaItem, items), response)
+
+
+@router.get("/media/statistics", dependencies=[Depends(expensive_request("media_statistics"))])
+async def get_media_statistics(
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(get_current_active_user)
+) -> Any:
+    stats = await media_item_crud.get_statistics(db, owner_id=current_user.id)
+    return stats
+
+
+@router.get(
+    "/media/duplicates",
+    response_model=List[MediaDuplicateGroup],
+    dependencies=[Depends(expensive_request("media_duplicates"))]
+)
+async def get_duplicate_media_items(
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(get_current_active_user),
+    limit: int = Query(100, ge=1, le=1000)
+) -> Any:
+    index = await media_duplicates.get(db, owner_id=current_user.id)
+    groups = await duplicate_groups(
+        db, index=media_duplicates, owner_id=current_user.id, limit=limit, get_titles=media_item_crud.get_titles
+    )
+    return fast_json([
+        {
+            "similarity": min(item["similarity"] for item in items),
+            "items": [{**item, "media_type": index.scopes.get(item["id"], "")} for item in items],
+        }
+        for items in groups
+        if len(items) > 1
+    ])
+
+
 @router.get("/media/{item_id}", response_model=MediaItem)
 async def get_media_item(
     *,
     db: AsyncSession = Depends(get_db),
     current_user: Any = Depends(get_current_active_user),
+    request: Request,
+    response: Response,
     item_id: int
 ) -> Any:
+    if request.headers.get("if-none-match"):
+        version = await media_item_crud.get_version(db, id=item_id)
+        if not version:
+            raise HTTPException(status_code=404, detail="Media item not found")
+        if version.owner_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+        cached = not_modified(request, make_etag(version.id, version.updated_at))
+        if cached:
+            return cached
+    
     item = await media_item_crud.get_by_id(db, id=item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Media item not found")
     if item.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
+    set_etag(response, make_etag(item.id, item.updated_at))
     return item
 
 
@@ -66,15 +216,19 @@ async def update_media_item(
     *,
     db: AsyncSession = Depends(get_db),
     current_user: Any = Depends(get_current_active_user),
+    request: Request,
+    response: Response,
     item_id: int,
     media_in: MediaItemUpdate
 ) -> Any:
-    item = await media_item_crud.get_by_id(db, id=item_id)
+    not_found = "Media item not found"
+    updated_at = await if_match_version(
+        request, media_item_crud, db, id=item_id, owner_id=current_user.id, not_found=not_found
+    )
+    item = await media_item_crud.update(db, id=item_id, owner_id=current_user.id, obj_in=media_in, updated_at=updated_at)
     if not item:
-        raise HTTPException(status_code=404, detail="Media item not found")
-    if item.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    item = await media_item_crud.update(db, db_obj=item, obj_in=media_in)
+        await raise_write_failed(media_item_crud, db, id=item_id, owner_id=current_user.id, not_found=not_found)
+    set_etag(response, make_etag(item.id, item.updated_at))
     return item
 
 
@@ -83,53 +237,53 @@ async def delete_media_item(
     *,
     db: AsyncSession = Depends(get_db),
     current_user: Any = Depends(get_current_active_user),
+    request: Request,
     item_id: int
 ) -> Any:
-    success = await media_item_crud.delete(db, id=item_id, owner_id=current_user.id)
+    not_found = "Media item not found"
+    updated_at = await if_match_version(
+        request, media_item_crud, db, id=item_id, owner_id=current_user.id, not_found=not_found
+    )
+    success = await media_item_crud.delete(db, id=item_id, owner_id=current_user.id, updated_at=updated_at)
     if not success:
-        raise HTTPException(status_code=404, detail="Media item not found")
+        await raise_write_failed(media_item_crud, db, id=item_id, owner_id=current_user.id, not_found=not_found)
     return {"message": "Media item deleted successfully"}
 
 
-@router.get("/media/status/{status}", response_model=List[MediaItem])
+@router.get("/media/status/{status}", response_model=Union[List[MediaItem], List[MediaItemSummary]])
 async def get_media_by_status(
     *,
     db: AsyncSession = Depends(get_db),
     current_user: Any = Depends(get_current_active_user),
-    status: str
+    request: Request,
+    response: Response,
+    status: str,
+    view: str = Query("full", pattern="^(full|summary)$")
 ) -> Any:
-    items = await media_item_crud.get_by_status(db, owner_id=current_user.id, status=status)
-    return items
+    summary = view == "summary"
+    items = await media_item_crud.get_by_status(db, owner_id=current_user.id, status=status, summary=summary)
+    cached = conditional_list(request, response, items)
+    if cached:
+        return cached
+    return fast_json(dump_rows(MediaItemSummary if summary else MediaItem, items), response)
 
 
-@router.get("/media/type/{media_type}", response_model=List[MediaItem])
+@router.get("/media/type/{media_type}", response_model=Union[List[MediaItem], List[MediaItemSummary]])
 async def get_media_by_type(
     *,
     db: AsyncSession = Depends(get_db),
     current_user: Any = Depends(get_current_active_user),
-    media_type: str
+    request: Request,
+    response: Response,
+    media_type: str,
+    view: str = Query("full", pattern="^(full|summary)$")
 ) -> Any:
-    items = await media_item_crud.get_by_type(db, owner_id=current_user.id, media_type=media_type)
-    return items
-
-
-@router.get("/media/recent", response_model=List[MediaItem])
-async def get_recent_media(
-    db: AsyncSession = Depends(get_db),
-    current_user: Any = Depends(get_current_active_user),
-    limit: int = Query(10, ge=1, le=100)
-) -> Any:
-    items = await media_item_crud.get_recent(db, owner_id=current_user.id, limit=limit)
-    return items
-
-
-@router.get("/media/statistics")
-async def get_media_statistics(
-    db: AsyncSession = Depends(get_db),
-    current_user: Any = Depends(get_current_active_user)
-) -> Any:
-    stats = await media_item_crud.get_statistics(db, owner_id=current_user.id)
-    return stats
+    summary = view == "summary"
+    items = await media_item_crud.get_by_type(db, owner_id=current_user.id, media_type=media_type, summary=summary)
+    cached = conditional_list(request, response, items)
+    if cached:
+        return cached
+    return fast_json(dump_rows(MediaItemSummary if summary else MediaItem, items), response)
 
 
 @router.get("/collections", response_model=List[MediaCollection])
@@ -160,12 +314,13 @@ async def update_media_collection(
     collection_id: int,
     collection_in: MediaCollectionUpdate
 ) -> Any:
-    collection = await media_collection_crud.get_by_id(db, id=collection_id)
+    collection = await media_collection_crud.update(
+        db, id=collection_id, owner_id=current_user.id, obj_in=collection_in
+    )
     if not collection:
-        raise HTTPException(status_code=404, detail="Media collection not found")
-    if collection.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    collection = await media_collection_crud.update(db, db_obj=collection, obj_in=collection_in)
+        await raise_write_failed(
+            media_collection_crud, db, id=collection_id, owner_id=current_user.id, not_found="Media collection not found"
+        )
     return collection
 
 
@@ -178,7 +333,9 @@ async def delete_media_collection(
 ) -> Any:
     success = await media_collection_crud.delete(db, id=collection_id, owner_id=current_user.id)
     if not success:
-        raise HTTPException(status_code=404, detail="Media collection not found")
+        await raise_write_failed(
+            media_collection_crud, db, id=collection_id, owner_id=current_user.id, not_found="Media collection not found"
+        )
     return {"message": "Media collection deleted successfully"}
 
 
@@ -0,0 +1,13 @@
+from typing import Any
+from fastapi import APIRouter, Depends
+from app.api.deps import get_current_superuser
+from app.core.metrics import metrics
+
+router = APIRouter()
+
+
+@router.get("")
+async def get_metrics(
+    current_user: Any = Depends(get_current_superuser)
+) -> Any:
+    return metrics.snapshot()
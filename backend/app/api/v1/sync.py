@@ -0,0 +1,32 @@
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_current_active_user
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.serialization import fast_json
+from app.schemas.sync import SyncPage
+from app.services.sync import SyncTokenExpired, decode_sync_token, sync_page
+
+router = APIRouter()
+
+
+@router.get("", response_model=SyncPage)
+async def sync_changes(
+    since: Optional[str] = None,
+    limit: int = Query(settings.SYNC_PAGE_SIZE, ge=1, le=settings.SYNC_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(get_current_active_user)
+) -> Any:
+    try:
+        token = decode_sync_token(since) if since else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid sync token")
+    try:
+        page = await sync_page(db, owner_id=current_user.id, token=token, limit=limit)
+    except SyncTokenExpired:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Sync token has expired, start over without one"
+        )
+    return fast_json(page)
@@ -0,0 +1,18 @@
+from typing import Any, List
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_current_active_user
+from app.core.database import get_db
+from app.crud.tag import tag_crud
+from app.schemas.tag import TagCount
+
+router = APIRouter()
+
+
+@router.get("", response_model=List[TagCount])
+async def get_tags(
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(get_current_active_user)
+) -> Any:
+    tags = await tag_crud.get_counts(db, owner_id=current_user.id)
+    return tags
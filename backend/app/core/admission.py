@@ -0,0 +1,223 @@
+import logging
+import math
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Tuple
+from fastapi import HTTPException, status
+from redis.exceptions import RedisError
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.pool import pool_wait_seconds
+from app.core.redis import get_redis
+from app.core.security import verify_token
+
+logger = logging.getLogger(__name__)
+
+ADMITTED, USER_LIMITED, GLOBAL_LIMITED = 0, 1, 2
+GLOBAL_BUCKET = "global"
+REDIS_RETRY_SECONDS = 5.0
+
+# KEYS: user bucket, global bucket. ARGV: user rate, user burst, global rate, global burst.
+# A request takes a token from both buckets or from neither.
+TOKEN_BUCKET_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local function refill(key, rate, burst)
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local ts = tonumber(state[2]) or now
+    return math.min(burst, tokens + math.max(0, now - ts) * rate)
+end
+local user_rate, user_burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+local global_rate, global_burst = tonumber(ARGV[3]), tonumber(ARGV[4])
+local user = refill(KEYS[1], user_rate, user_burst)
+local global = refill(KEYS[2], global_rate, global_burst)
+local outcome, retry_after = 0, 0
+if user < 1 then
+    outcome, retry_after = 1, (1 - user) / user_rate
+elseif global < 1 then
+    outcome, retry_after = 2, (1 - global) / global_rate
+else
+    user, global = user - 1, global - 1
+end
+redis.call('HSET', KEYS[1], 'tokens', user, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(user_burst / user_rate * 1000) + 1000)
+redis.call('HSET', KEYS[2], 'tokens', global, 'ts', now)
+redis.call('PEXPIRE', KEYS[2], math.ceil(global_burst / global_rate * 1000) + 1000)
+return {outcome, tostring(retry_after)}
+"""
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        *,
+        user_rate: float,
+        user_burst: int,
+        global_rate: float,
+        global_burst: int,
+        use_redis: bool,
+        max_size: int
+    ):
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.global_rate = global_rate
+        self.global_burst = global_burst
+        self.use_redis = use_redis
+        self.max_size = max_size
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        # Kept out of the LRU: a flood of distinct callers must not evict it back to a full burst.
+        self._global_bucket = (float(global_burst), time.monotonic())
+        self._script = None
+        self._redis_down_until = 0.0
+    
+    def _redis_key(self, key: str) -> str:
+        return f"mindgarden:bucket:{key}"
+    
+    def _refill(self, bucket: Tuple[float, float], rate: float, burst: int, now: float) -> float:
+        tokens, ts = bucket
+        return min(burst, tokens + max(0.0, now - ts) * rate)
+    
+    def _take_local(self, key: str) -> Tuple[int, float]:
+        now = time.monotonic()
+        user = self._refill(self._buckets.get(key, (self.user_burst, now)), self.user_rate, self.user_burst, now)
+        total = self._refill(self._global_bucket, self.global_rate, self.global_burst, now)
+        outcome, retry_after = ADMITTED, 0.0
+        if user < 1:
+            outcome, retry_after = USER_LIMITED, (1 - user) / self.user_rate
+        elif total < 1:
+            outcome, retry_after = GLOBAL_LIMITED, (1 - total) / self.global_rate
+        else:
+            user, total = user - 1, total - 1
+        self._buckets[key] = (user, now)
+        self._global_bucket = (total, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_size:
+            self._buckets.popitem(last=False)
+        return outcome, retry_after
+    
+    async def _take_redis(self, key: str) -> Tuple[int, float]:
+        if self._script is None:
+            self._script = get_redis().register_script(TOKEN_BUCKET_SCRIPT)
+        outcome, retry_after = await self._script(
+            keys=[self._redis_key(key), self._redis_key(GLOBAL_BUCKET)],
+            args=[self.user_rate, self.user_burst, self.global_rate, self.global_burst],
+        )
+        return int(outcome), float(retry_after)
+    
+    async def take(self, key: str) -> Tuple[int, float]:
+        if self.use_redis and time.monotonic() >= self._redis_down_until:
+            try:
+                return await self._take_redis(key)
+            except RedisError as e:
+                # Per-process buckets until Redis is back: limits loosen by the instance count.
+                logger.warning("Rate limiting in Redis failed, using in-process buckets: %s", e)
+                self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+        return self._take_local(key)
+
+
+class ConcurrencyLimiter:
+    def __init__(self, *, per_user: int, total: int, shed_wait_ms: float):
+        self.per_user = per_user
+        self.total = total
+        self.shed_wait_ms = shed_wait_ms
+        self.active = 0
+        self._by_user: Dict[int, int] = defaultdict(int)
+        metrics.gauge("expensive_requests_active", lambda: self.active)
+    
+    def _reject(self, name: str, reason: str, status_code: int, detail: str) -> None:
+        metrics.counter("admission_rejected_total", reason=reason, endpoint=name).inc()
+        raise HTTPException(status_code=status_code, detail=detail, headers={"Retry-After": "1"})
+    
+    @asynccontextmanager
+    async def slot(self, name: str, user_id: int) -> AsyncIterator[None]:
+        # Checked before any connection is taken, so a busy pool sheds the
+        # expensive work first instead of queueing it behind everyone else.
+        if pool_wait_seconds() * 1000 >= self.shed_wait_ms:
+            self._reject(name, "pool_wait", status.HTTP_503_SERVICE_UNAVAILABLE, "Server is busy, please retry")
+        if self._by_user[user_id] >= self.per_user:
+            self._reject(name, "user_concurrency", status.HTTP_429_TOO_MANY_REQUESTS, "Too many concurrent requests")
+        if self.active >= self.total:
+            self._reject(name, "concurrency", status.HTTP_503_SERVICE_UNAVAILABLE, "Server is busy, please retry")
+        
+        self.active += 1
+        self._by_user[user_id] += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._by_user[user_id] -= 1
+            if not self._by_user[user_id]:
+                del self._by_user[user_id]
+
+
+def client_key(scope: Scope) -> str:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            subject = verify_token(token) if scheme.lower() == "bearer" else None
+            if subject is not None:
+                return f"user:{subject}"
+            break
+    client = scope.get("client")
+    return f"ip:{client[0] if client else '-'}"
+
+
+class AdmissionMiddleware:
+    def __init__(self, app: ASGIApp, *, limiter: RateLimiter, path_prefix: str, shed_wait_ms: float):
+        self.app = app
+        self.limiter = limiter
+        self.path_prefix = path_prefix
+        self.shed_wait_ms = shed_wait_ms
+    
+    async def _reject(
+        self, scope: Scope, receive: Receive, send: Send, reason: str, status_code: int, detail: str, retry_after: float
+    ) -> None:
+        metrics.counter("admission_rejected_total", reason=reason, endpoint="*").inc()
+        response = JSONResponse(
+            {"detail": detail},
+            status_code=status_code,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        await response(scope, receive, send)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+        if pool_wait_seconds() * 1000 >= self.shed_wait_ms:
+            await self._reject(
+                scope, receive, send, "pool_wait", status.HTTP_503_SERVICE_UNAVAILABLE, "Server is busy, please retry", 1
+            )
+            return
+        outcome, retry_after = await self.limiter.take(client_key(scope))
+        if outcome == USER_LIMITED:
+            await self._reject(
+                scope, receive, send, "user_rate", status.HTTP_429_TOO_MANY_REQUESTS, "Rate limit exceeded", retry_after
+            )
+            return
+        if outcome == GLOBAL_LIMITED:
+            await self._reject(
+                scope, receive, send, "global_rate", status.HTTP_503_SERVICE_UNAVAILABLE, "Server is busy, please retry", retry_after
+            )
+            return
+        await self.app(scope, receive, send)
+
+
+rate_limiter = RateLimiter(
+    user_rate=settings.RATE_LIMIT_USER_PER_SECOND,
+    user_burst=settings.RATE_LIMIT_USER_BURST,
+    global_rate=settings.RATE_LIMIT_GLOBAL_PER_SECOND,
+    global_burst=settings.RATE_LIMIT_GLOBAL_BURST,
+    use_redis=settings.RATE_LIMIT_REDIS,
+    max_size=settings.USER_CACHE_MAX_SIZE,
+)
+
+expensive_requests = ConcurrencyLimiter(
+    per_user=settings.EXPENSIVE_REQUESTS_PER_USER,
+    total=settings.EXPENSIVE_REQUESTS_TOTAL,
+    shed_wait_ms=settings.SHED_EXPENSIVE_POOL_WAIT_MS,
+)
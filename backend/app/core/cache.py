@@ -0,0 +1,174 @@
+import json
+import logging
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from redis.exceptions import RedisError
+from sqlalchemy.orm import make_transient_to_detached
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+    
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class VersionedCache:
+    # Invalidation bumps the key's version, so a load that raced a write is
+    # returned to its caller but never stored.
+    def __init__(self, *, max_size: int, ttl: float):
+        self._local = TTLCache(max_size=max_size, ttl=ttl)
+        self._versions: Dict[Hashable, int] = defaultdict(int)
+    
+    async def get(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        value = self._local.get(key)
+        if value is not None:
+            return value
+        version = self._versions[key]
+        value = await load()
+        if self._versions[key] == version:
+            self._local.set(key, value)
+        return value
+    
+    def peek(self, key: Hashable) -> Optional[Any]:
+        return self._local.get(key)
+    
+    def invalidate(self, key: Hashable) -> None:
+        self._versions[key] += 1
+        self._local.delete(key)
+
+
+class UserCache:
+    # Keyed by token subject; the password hash is deliberately not cached.
+    FIELDS = ("id", "email", "username", "full_name", "is_active", "is_superuser", "created_at", "updated_at")
+    DATETIME_FIELDS = ("created_at", "updated_at")
+    
+    def __init__(self, *, max_size: int, ttl: int, use_redis: bool):
+        self.ttl = ttl
+        self.use_redis = use_redis
+        self._local = TTLCache(max_size=max_size, ttl=ttl)
+    
+    def _redis_key(self, subject: str) -> str:
+        return f"mindgarden:user:{subject}"
+    
+    def _dump(self, user: User) -> Dict[str, Any]:
+        return {field: getattr(user, field) for field in self.FIELDS}
+    
+    def _load(self, data: Dict[str, Any]) -> User:
+        user = User(**data)
+        make_transient_to_detached(user)
+        return user
+    
+    async def get(self, subject: str) -> Optional[User]:
+        data = self._local.get(subject)
+        if data is None and self.use_redis:
+            try:
+                raw = await get_redis().get(self._redis_key(subject))
+            except RedisError as e:
+                logger.warning("User cache read from Redis failed: %s", e)
+                raw = None
+            if raw is not None:
+                data = json.loads(raw)
+                for field in self.DATETIME_FIELDS:
+                    data[field] = datetime.fromisoformat(data[field])
+                self._local.set(subject, data)
+        return self._load(data) if data is not None else None
+    
+    async def set(self, subject: str, user: User) -> None:
+        data = self._dump(user)
+        self._local.set(subject, data)
+        if self.use_redis:
+            try:
+                await get_redis().set(self._redis_key(subject), json.dumps(data, default=datetime.isoformat), ex=self.ttl)
+            except RedisError as e:
+                logger.warning("User cache write to Redis failed: %s", e)
+    
+    async def invalidate(self, *subjects: str) -> None:
+        for subject in subjects:
+            self._local.delete(subject)
+        if self.use_redis and subjects:
+            try:
+                await get_redis().delete(*(self._redis_key(subject) for subject in subjects))
+            except RedisError as e:
+                logger.warning("User cache invalidation in Redis failed: %s", e)
+
+
+class WriteMarkers:
+    # Users who committed a write in the last `ttl` seconds read from the primary,
+    # so a lagging replica never hides their own edits from them.
+    def __init__(self, *, max_size: int, ttl: float, enabled: bool, use_redis: bool):
+        self.ttl = ttl
+        self.enabled = enabled
+        self.use_redis = use_redis
+        self._local = TTLCache(max_size=max_size, ttl=ttl)
+    
+    def _redis_key(self, user_id: int) -> str:
+        return f"mindgarden:wrote:{user_id}"
+    
+    def mark(self, user_id: int) -> None:
+        if self.enabled:
+            self._local.set(user_id, True)
+    
+    async def share(self, user_id: int) -> None:
+        # Other instances only learn about the write through Redis.
+        if self.enabled and self.use_redis:
+            try:
+                await get_redis().set(self._redis_key(user_id), 1, px=int(self.ttl * 1000))
+            except RedisError as e:
+                logger.warning("Write marker update in Redis failed: %s", e)
+    
+    async def is_recent(self, user_id: int) -> bool:
+        if not self.enabled:
+            return False
+        if self._local.get(user_id):
+            return True
+        if self.use_redis:
+            try:
+                return bool(await get_redis().exists(self._redis_key(user_id)))
+            except RedisError as e:
+                logger.warning("Write marker read from Redis failed: %s", e)
+        return False
+
+
+user_cache = UserCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+    use_redis=settings.USER_CACHE_REDIS,
+)
+
+write_markers = WriteMarkers(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.REPLICA_PIN_SECONDS,
+    enabled=bool(settings.REPLICA_DATABASE_URLS),
+    use_redis=settings.REPLICA_PIN_REDIS,
+)
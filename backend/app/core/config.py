@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -9,6 +9,10 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
     
+    PASSWORD_HASH_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    
     PROJECT_NAME: str = "MindGarden"
     VERSION: str = "1.0.0"
     
@@ -19,14 +23,116 @@ class Settings(BaseSettings):
     POSTGRES_PORT: int = 5432
     SQLALCHEMY_DATABASE_URL: Optional[str] = "sqlite+aiosqlite:///./mindgarden.db"
     
+    # migrate: upgrade to head at startup; check: refuse to start unless at head; skip: no schema work.
+    SCHEMA_STARTUP_MODE: Literal["migrate", "check", "skip"] = "migrate"
+    
+    SQL_ECHO: bool = False
+    
+    # File-backed SQLite only: one writer connection, a pool of read-only WAL readers.
+    SQLITE_READ_POOL_SIZE: int = 8
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_WRITE_TIMEOUT_SECONDS: float = 30.0
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    
+    # Read-only copies of the database; GET requests read from one of them.
+    REPLICA_DATABASE_URLS: list[str] = []
+    # How long after a write a user's reads stay on the primary.
+    REPLICA_PIN_SECONDS: float = 5.0
+    REPLICA_PIN_REDIS: bool = False
+    
+    # Token buckets are per process unless RATE_LIMIT_REDIS shares them through REDIS_URL.
+    ADMISSION_CONTROL_ENABLED: bool = True
+    RATE_LIMIT_REDIS: bool = False
+    RATE_LIMIT_USER_PER_SECOND: float = 20.0
+    RATE_LIMIT_USER_BURST: int = 100
+    RATE_LIMIT_GLOBAL_PER_SECOND: float = 1000.0
+    RATE_LIMIT_GLOBAL_BURST: int = 2000
+    # Search, statistics and export; keep the total well under the connection pool.
+    EXPENSIVE_REQUESTS_PER_USER: int = 2
+    EXPENSIVE_REQUESTS_TOTAL: int = 6
+    # Recent mean pool checkout wait above which expensive requests, then all API requests, are shed.
+    SHED_EXPENSIVE_POOL_WAIT_MS: float = 50.0
+    SHED_ALL_POOL_WAIT_MS: float = 250.0
+    
+    QUERY_METRICS_ENABLED: bool = False
+    QUERY_METRICS_SAMPLE_RATE: float = 1.0
+    SLOW_QUERY_THRESHOLD_MS: float = 250.0
+    
     BACKEND_CORS_ORIGINS: list[str] = [
         "http://localhost:5173",
         "http://localhost:3000",
         "http://localhost:8000",
     ]
     
+    BATCH_MAX_SIZE: int = 1000
+    IMPORT_CHUNK_SIZE: int = 500
+    IMPORT_UPLOAD_CHUNK_BYTES: int = 1024 * 1024
+    # Markdown notes are parsed whole, so each file or zip member is capped.
+    IMPORT_MAX_MEMBER_BYTES: int = 10 * 1024 * 1024
+    EXPORT_BATCH_SIZE: int = 500
+    EXPORT_CHUNK_BYTES: int = 64 * 1024
+    
+    STATS_RECONCILE_INTERVAL_SECONDS: float = 3600.0
+    
+    # "memory" keeps jobs inside the API process; "redis" shares them through REDIS_URL
+    # with workers started as `python -m app.worker`.
+    JOB_BACKEND: Literal["memory", "redis"] = "memory"
+    JOB_WORKER_IN_PROCESS: bool = True
+    JOB_WORKER_CONCURRENCY: int = 2
+    JOB_POLL_INTERVAL_SECONDS: float = 0.5
+    JOB_RETRY_BACKOFF_SECONDS: float = 5.0
+    JOB_RETRY_BACKOFF_MAX_SECONDS: float = 300.0
+    JOB_RETENTION_SECONDS: int = 7 * 24 * 3600
+    JOB_MEMORY_MAX_JOBS: int = 1000
+    # Uploads are spooled here for the worker; it must be shared storage when workers run elsewhere.
+    IMPORT_SPOOL_DIR: Optional[str] = None
+    
+    SYNC_PAGE_SIZE: int = 500
+    SYNC_MAX_PAGE_SIZE: int = 2000
+    # Clients offline for longer than this get 410 and start over with a full sync.
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30
+    SYNC_COMPACT_INTERVAL_SECONDS: float = 24 * 3600.0
+    
+    # Change events pushed over SSE/WebSocket; "redis" fans them out to every API process.
+    EVENTS_BACKEND: Literal["memory", "redis"] = "memory"
+    # Below the idle timeout of common proxies and load balancers.
+    EVENTS_HEARTBEAT_SECONDS: float = 25.0
+    EVENTS_QUEUE_SIZE: int = 256
+    EVENTS_MAX_CONNECTIONS_PER_USER: int = 10
+    
     REDIS_URL: str = "redis://localhost:6379/0"
     
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10000
+    USER_CACHE_REDIS: bool = False
+    
+    GRAPH_CACHE_TTL_SECONDS: float = 60.0
+    GRAPH_CACHE_MAX_SIZE: int = 1000
+    GRAPH_MAX_DEPTH: int = 5
+    GRAPH_MAX_NODES: int = 500
+    
+    # Hashed TF-IDF width: a 50k-card library takes 50k x dim x 4 bytes in memory.
+    RELATED_VECTOR_DIM: int = 256
+    RELATED_CACHE_TTL_SECONDS: float = 3600.0
+    RELATED_CACHE_MAX_SIZE: int = 32
+    RELATED_MAX_RESULTS: int = 50
+    # Hash collisions give unrelated cards small positive scores.
+    RELATED_MIN_SCORE: float = 0.1
+    
+    # MinHash/LSH near-duplicates: bands x rows = permutations; 16 bands of 8 rows
+    # start catching pairs around an estimated Jaccard similarity of 0.7.
+    DEDUP_NUM_PERM: int = 128
+    DEDUP_BANDS: int = 16
+    DEDUP_THRESHOLD: float = 0.8
+    DEDUP_CACHE_TTL_SECONDS: float = 3600.0
+    DEDUP_CACHE_MAX_SIZE: int = 32
+    DEDUP_MAX_MATCHES: int = 10
+    
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    
     SMTP_TLS: bool = True
     SMTP_PORT: Optional[int] = None
     SMTP_HOST: Optional[str] = None
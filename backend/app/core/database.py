@@ -1,31 +1,90 @@
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from datetime import datetime
+from typing import Any, AsyncGenerator, Optional
+from fastapi import Request
+from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import Insert
+from sqlalchemy.sql.elements import ColumnElement
 from app.core.config import settings
+from app.core.instrumentation import install_query_instrumentation
+from app.core.pool import MonitoredQueuePool
+from app.core.cache import write_markers
+from app.core.routing import SAFE_METHODS, routing_session_class
+from app.core.sqlite import create_sqlite_engines, create_sqlite_read_engine, is_file_sqlite
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=True,
-    pool_pre_ping=True,
-    pool_size=20,
-    max_overflow=30
-)
+
+
+def create_read_engine(url: str) -> AsyncEngine:
+    if is_file_sqlite(url):
+        return create_sqlite_read_engine(url)
+    return create_async_engine(
+        url,
+        echo=settings.SQL_ECHO,
+        poolclass=MonitoredQueuePool,
+        pool_pre_ping=True,
+        pool_size=20,
+        max_overflow=30
+    )
+
+
+if is_file_sqlite(settings.database_url):
+    engine, read_engine = create_sqlite_engines(settings.database_url)
+else:
+    engine = create_async_engine(
+        settings.database_url,
+        echo=settings.SQL_ECHO,
+        poolclass=MonitoredQueuePool,
+        pool_pre_ping=True,
+        pool_size=20,
+        max_overflow=30
+    )
+    read_engine = engine
+replica_engines = [create_read_engine(url) for url in settings.REPLICA_DATABASE_URLS]
+install_query_instrumentation(engine.sync_engine)
+for bound in {read_engine, *replica_engines} - {engine}:
+    install_query_instrumentation(bound.sync_engine)
+
+if read_engine is engine and not replica_engines:
+    sync_session_class = Session
+else:
+    sync_session_class = routing_session_class(engine, read_engine, replica_engines)
 
 AsyncSessionLocal = sessionmaker(
     bind=engine,
     class_=AsyncSession,
+    sync_session_class=sync_session_class,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False
 )
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
+        # Mutations read from the primary; GETs may be served by a replica.
+        session.info["replica_reads"] = request.method in SAFE_METHODS
         try:
             yield session
         except Exception as e:
             await session.rollback()
             raise e
         finally:
-            await session.close()
\ No newline at end of file
+            if session.info.get("wrote"):
+                await write_markers.share(session.info["user_id"])
+            await session.close()
+
+def dialect_insert(dialect: str, table: Any) -> Insert:
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+
+def owned_row(model: Any, *, id: int, owner_id: int, updated_at: Optional[datetime] = None) -> ColumnElement:
+    clauses = [model.id == id, model.owner_id == owner_id]
+    if updated_at is not None:
+        # Pins the write to the version an If-Match header named.
+        clauses.append(model.updated_at == updated_at)
+    return and_(*clauses)
@@ -0,0 +1,62 @@
+import hashlib
+from datetime import datetime
+from typing import Any, Iterable, Optional
+from fastapi import HTTPException, Request, Response, status
+
+ETAG_HEADER = "ETag"
+
+
+def make_etag(id: int, updated_at: datetime) -> str:
+    digest = hashlib.blake2b(f"{id}:{updated_at.isoformat()}".encode(), digest_size=8).hexdigest()
+    return f'"{id}-{digest}"'
+
+
+def list_etag(items: Iterable[Any], variant: str = "") -> str:
+    digest = hashlib.blake2b(variant.encode(), digest_size=12)
+    for item in items:
+        digest.update(f"{item.id}:{item.updated_at.isoformat()};".encode())
+    return f'"l-{digest.hexdigest()}"'
+
+
+def _parse(header: str) -> list:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def etag_matches(header: Optional[str], etag: str, *, weak: bool) -> bool:
+    if not header:
+        return False
+    for tag in _parse(header):
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            if weak and tag[2:] == etag:
+                return True
+        elif tag == etag:
+            return True
+    return False
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    # If-None-Match uses the weak comparison (RFC 9110 13.1.2).
+    if etag_matches(request.headers.get("if-none-match"), etag, weak=True):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={ETAG_HEADER: etag})
+    return None
+
+
+def check_if_match(request: Request, etag: Optional[str]) -> None:
+    header = request.headers.get("if-match")
+    if header is None:
+        return
+    if etag is None or not etag_matches(header, etag, weak=False):
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Resource has been modified")
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers[ETAG_HEADER] = etag
+
+
+def conditional_list(request: Request, response: Response, items: Iterable[Any]) -> Optional[Response]:
+    # The same rows rendered through another view or query must not share a tag.
+    etag = list_etag(items, variant=f"{request.url.path}?{request.url.query}")
+    set_etag(response, etag)
+    return not_modified(request, etag)
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional, Set
+from redis.exceptions import RedisError
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT = {"event": "heartbeat"}
+# Sent in place of the events a slow consumer missed: the client catches up through GET /sync.
+RESYNC = {"event": "resync"}
+CLOSED = {"event": "closed"}
+
+
+class Subscription:
+    __slots__ = ("owner_id", "queue", "overflowed")
+    
+    def __init__(self, owner_id: int, *, queue_size: int):
+        self.owner_id = owner_id
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.overflowed = False
+    
+    def offer(self, message: Dict[str, Any]) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Memory per connection stays bounded: the backlog is replaced by a single resync.
+            self.overflowed = True
+            self._replace_backlog(RESYNC)
+            metrics.counter("event_overflows_total").inc()
+    
+    def _replace_backlog(self, message: Dict[str, Any]) -> None:
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+    
+    def close(self) -> None:
+        # Wakes the sender up even when its queue is full; nothing is offered after this.
+        self.overflowed = True
+        self._replace_backlog(CLOSED)
+    
+    async def get(self) -> Dict[str, Any]:
+        message = await self.queue.get()
+        if message is RESYNC:
+            self.overflowed = False
+        return message
+
+
+class EventHub:
+    # Idle connections only wait on their queue; one shared task sends every heartbeat.
+    def __init__(
+        self,
+        *,
+        backend: str,
+        queue_size: int,
+        max_per_owner: int,
+        heartbeat: float,
+        channel: str = "mindgarden:events"
+    ):
+        self.backend = backend
+        self.queue_size = queue_size
+        self.max_per_owner = max_per_owner
+        self.heartbeat = heartbeat
+        self.channel = channel
+        self.subscribers: Dict[int, Set[Subscription]] = {}
+        self.connections = 0
+        self._pending: Set[asyncio.Task] = set()
+        metrics.gauge("event_connections", lambda: self.connections)
+    
+    def has_room(self, owner_id: int) -> bool:
+        return len(self.subscribers.get(owner_id, ())) < self.max_per_owner
+    
+    def subscribe(self, owner_id: int) -> Optional[Subscription]:
+        if not self.has_room(owner_id):
+            return None
+        subscribers = self.subscribers.setdefault(owner_id, set())
+        subscription = Subscription(owner_id, queue_size=self.queue_size)
+        subscribers.add(subscription)
+        self.connections += 1
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self.subscribers.get(subscription.owner_id)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        self.connections -= 1
+        if not subscribers:
+            del self.subscribers[subscription.owner_id]
+    
+    def deliver(self, owner_id: int, events: List[Dict[str, Any]]) -> None:
+        for subscription in self.subscribers.get(owner_id, ()):
+            for event in events:
+                subscription.offer(event)
+    
+    def publish(self, owner_id: int, events: List[Dict[str, Any]]) -> None:
+        # Called from commit hooks, which cannot await; outside an event loop there is nobody to tell.
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self.backend != "redis":
+            self.deliver(owner_id, events)
+            return
+        task = loop.create_task(self._publish_redis(owner_id, events))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+    
+    async def _publish_redis(self, owner_id: int, events: List[Dict[str, Any]]) -> None:
+        try:
+            await get_redis().publish(self.channel, json.dumps({"owner_id": owner_id, "events": events}))
+        except RedisError as e:
+            logger.warning("Publishing events failed, delivering locally only: %s", e)
+            self.deliver(owner_id, events)
+    
+    def _resync_all(self) -> None:
+        for subscribers in self.subscribers.values():
+            for subscription in subscribers:
+                subscription.offer(RESYNC)
+    
+    async def _listen(self) -> None:
+        # Every node hears every owner's events and drops those without a local subscriber.
+        failed = False
+        while True:
+            pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                if failed:
+                    self._resync_all()
+                    failed = False
+                async for message in pubsub.listen():
+                    payload = json.loads(message["data"])
+                    self.deliver(payload["owner_id"], payload["events"])
+            except RedisError as e:
+                logger.warning("Event subscription lost: %s", e)
+                failed = True
+            finally:
+                await pubsub.aclose()
+            await asyncio.sleep(self.heartbeat)
+    
+    async def _beat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            for subscribers in self.subscribers.values():
+                for subscription in subscribers:
+                    # A connection with events still queued is not idle.
+                    if subscription.queue.empty():
+                        subscription.offer(HEARTBEAT)
+    
+    async def run(self) -> None:
+        if self.backend == "redis":
+            await asyncio.gather(self._beat(), self._listen())
+        else:
+            await self._beat()
+
+
+event_hub = EventHub(
+    backend=settings.EVENTS_BACKEND,
+    queue_size=settings.EVENTS_QUEUE_SIZE,
+    max_per_owner=settings.EVENTS_MAX_CONNECTIONS_PER_USER,
+    heartbeat=settings.EVENTS_HEARTBEAT_SECONDS,
+)
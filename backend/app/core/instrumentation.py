@@ -0,0 +1,93 @@
+import logging
+import random
+import re
+import time
+from contextvars import ContextVar
+from typing import Any, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger("app.sql")
+
+ROW_BUCKETS = (0, 1, 10, 50, 100, 500, 1000, 5000, 10000)
+UNMATCHED_ENDPOINT = "<unmatched>"
+
+_request_scope: ContextVar[Optional[Scope]] = ContextVar("request_scope", default=None)
+_VERB_RE = re.compile(r"^\s*(?:WITH\b.*?\)\s*)?(\w+)", re.IGNORECASE | re.DOTALL)
+_TABLE_RE = re.compile(r"\b(?:FROM|INTO|UPDATE|JOIN)\s+\"?(\w+)", re.IGNORECASE)
+
+
+class QueryContextMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_scope.reset(token)
+
+
+def current_endpoint() -> str:
+    scope = _request_scope.get()
+    if scope is None:
+        return "-"
+    route = scope.get("route")
+    # Raw paths of unmatched requests (404 scans) would each open a new metric series.
+    return f"{scope['method']} {route.path if route is not None else UNMATCHED_ENDPOINT}"
+
+
+def statement_label(statement: str) -> str:
+    verb = _VERB_RE.match(statement)
+    label = verb.group(1).upper() if verb else "?"
+    if label not in ("SELECT", "INSERT", "UPDATE", "DELETE"):
+        return label
+    table = _TABLE_RE.search(statement)
+    return f"{label} {table.group(1)}" if table else label
+
+
+def _row_count(cursor: Any) -> Optional[int]:
+    if cursor.rowcount is not None and cursor.rowcount >= 0:
+        return cursor.rowcount
+    # The async adapters buffer SELECT results before the hook fires.
+    rows = getattr(cursor, "_rows", None)
+    return len(rows) if rows is not None else None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if settings.QUERY_METRICS_SAMPLE_RATE < 1.0 and random.random() >= settings.QUERY_METRICS_SAMPLE_RATE:
+        return
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    label = statement_label(statement)
+    endpoint = current_endpoint()
+    
+    metrics.histogram("db_query_seconds", statement=label, endpoint=endpoint).observe(elapsed)
+    rows = _row_count(cursor)
+    if rows is not None:
+        metrics.histogram("db_query_rows", buckets=ROW_BUCKETS, statement=label, endpoint=endpoint).observe(rows)
+    
+    elapsed_ms = elapsed * 1000
+    if elapsed_ms >= settings.SLOW_QUERY_THRESHOLD_MS:
+        metrics.counter("db_slow_queries_total", statement=label, endpoint=endpoint).inc()
+        logger.warning("Slow query (%.1f ms, %s rows) from %s: %s", elapsed_ms, rows, endpoint, statement)
+
+
+def install_query_instrumentation(engine: Engine) -> None:
+    if not settings.QUERY_METRICS_ENABLED:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
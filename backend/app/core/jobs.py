@@ -0,0 +1,322 @@
+import asyncio
+import heapq
+import json
+import logging
+import random
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from redis.exceptions import RedisError
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, RETRYING, COMPLETED, FAILED = "queued", "running", "retrying", "completed", "failed"
+FINISHED = (COMPLETED, FAILED)
+INTERRUPTED_ERROR = "Interrupted by a worker shutdown"
+DATETIME_FIELDS = ("created_at", "started_at", "finished_at", "run_at")
+
+# Takes the earliest due job off the queue, so two workers never start the same one.
+POP_DUE_SCRIPT = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, 1)
+if #ids == 0 then
+    return false
+end
+redis.call('ZREM', KEYS[1], ids[1])
+return ids[1]
+"""
+
+Handler = Callable[..., Awaitable[Any]]
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _epoch(moment: datetime) -> float:
+    # Job times are naive UTC, which datetime.timestamp() would read as local time.
+    return (moment - _EPOCH).total_seconds()
+
+
+@dataclass
+class JobTask:
+    handler: Handler
+    max_attempts: int
+    backoff: float
+
+
+class MemoryJobBackend:
+    # Jobs live in this process only: enough for a single API process and for tests.
+    def __init__(self, *, max_jobs: int):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._queue: List[Tuple[float, int, str]] = []
+        self._sequence = 0
+        self._claims: Dict[str, float] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+    
+    def _event(self) -> asyncio.Event:
+        # An Event binds to the first loop that waits on it; tests run one loop each.
+        loop = asyncio.get_running_loop()
+        if self._wakeup is None or self._wakeup_loop is not loop:
+            self._wakeup, self._wakeup_loop = asyncio.Event(), loop
+        return self._wakeup
+    
+    async def save(self, job: Dict[str, Any]) -> None:
+        self._jobs[job["id"]] = job
+        self._jobs.move_to_end(job["id"])
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+    
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self._jobs.get(job_id)
+    
+    async def list(self, owner_id: int, limit: int) -> List[Dict[str, Any]]:
+        jobs = [job for job in reversed(self._jobs.values()) if job["owner_id"] == owner_id]
+        return sorted(jobs, key=lambda job: job["created_at"], reverse=True)[:limit]
+    
+    async def push(self, job: Dict[str, Any]) -> None:
+        self._sequence += 1
+        heapq.heappush(self._queue, (_epoch(job["run_at"]), self._sequence, job["id"]))
+        self._event().set()
+    
+    async def pop(self) -> Optional[str]:
+        if self._queue and self._queue[0][0] <= time.time():
+            return heapq.heappop(self._queue)[2]
+        return None
+    
+    async def wait(self, timeout: float) -> None:
+        if self._queue:
+            timeout = max(0.0, min(timeout, self._queue[0][0] - time.time()))
+        wakeup = self._event()
+        wakeup.clear()
+        try:
+            await asyncio.wait_for(wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+    
+    async def claim(self, name: str, interval: float) -> bool:
+        now = time.monotonic()
+        if self._claims.get(name, 0.0) > now:
+            return False
+        self._claims[name] = now + interval
+        return True
+
+
+class RedisJobBackend:
+    # Job records are JSON strings; the queue is a sorted set scored by due time.
+    def __init__(self, *, retention: int, prefix: str = "mindgarden:jobs"):
+        self.retention = retention
+        self.prefix = prefix
+        self._script = None
+    
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.prefix}:job:{job_id}"
+    
+    def _owner_key(self, owner_id: int) -> str:
+        return f"{self.prefix}:owner:{owner_id}"
+    
+    async def save(self, job: Dict[str, Any]) -> None:
+        pipeline = get_redis().pipeline()
+        pipeline.set(self._job_key(job["id"]), json.dumps(job, default=datetime.isoformat), ex=self.retention)
+        if job["owner_id"] is not None:
+            owner_key = self._owner_key(job["owner_id"])
+            pipeline.zadd(owner_key, {job["id"]: _epoch(job["created_at"])})
+            pipeline.zremrangebyscore(owner_key, "-inf", time.time() - self.retention)
+            pipeline.expire(owner_key, self.retention)
+        await pipeline.execute()
+    
+    def _load(self, raw: str) -> Dict[str, Any]:
+        job = json.loads(raw)
+        for field in DATETIME_FIELDS:
+            if job.get(field):
+                job[field] = datetime.fromisoformat(job[field])
+        return job
+    
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = await get_redis().get(self._job_key(job_id))
+        return self._load(raw) if raw is not None else None
+    
+    async def list(self, owner_id: int, limit: int) -> List[Dict[str, Any]]:
+        job_ids = await get_redis().zrevrange(self._owner_key(owner_id), 0, limit - 1)
+        if not job_ids:
+            return []
+        raws = await get_redis().mget([self._job_key(job_id) for job_id in job_ids])
+        return [self._load(raw) for raw in raws if raw is not None]
+    
+    async def push(self, job: Dict[str, Any]) -> None:
+        await get_redis().zadd(f"{self.prefix}:queue", {job["id"]: _epoch(job["run_at"])})
+    
+    async def pop(self) -> Optional[str]:
+        if self._script is None:
+            self._script = get_redis().register_script(POP_DUE_SCRIPT)
+        return await self._script(keys=[f"{self.prefix}:queue"], args=[time.time()]) or None
+    
+    async def wait(self, timeout: float) -> None:
+        await asyncio.sleep(timeout)
+    
+    async def claim(self, name: str, interval: float) -> bool:
+        # Whichever worker sets the key runs this tick; the rest see it until it expires.
+        return bool(await get_redis().set(f"{self.prefix}:schedule:{name}", 1, nx=True, px=max(1, int(interval * 1000))))
+
+
+class JobQueue:
+    def __init__(self, backend: Any):
+        self.backend = backend
+        self.tasks: Dict[str, JobTask] = {}
+        self.schedules: Dict[str, float] = {}
+    
+    def task(
+        self, name: str, *, max_attempts: int = 1, backoff: float = settings.JOB_RETRY_BACKOFF_SECONDS
+    ) -> Callable[[Handler], Handler]:
+        def register(handler: Handler) -> Handler:
+            self.tasks[name] = JobTask(handler=handler, max_attempts=max_attempts, backoff=backoff)
+            return handler
+        return register
+    
+    def schedule(self, name: str, interval: float) -> None:
+        self.schedules[name] = interval
+    
+    async def enqueue(
+        self,
+        name: str,
+        *,
+        owner_id: Optional[int] = None,
+        delay: float = 0.0,
+        progress: Optional[Dict[str, Any]] = None,
+        **args: Any
+    ) -> Dict[str, Any]:
+        if name not in self.tasks:
+            raise ValueError(f"Unknown job '{name}'")
+        now = datetime.utcnow()
+        job = {
+            "id": uuid.uuid4().hex,
+            "name": name,
+            "owner_id": owner_id,
+            "args": args,
+            "status": QUEUED,
+            "attempts": 0,
+            "max_attempts": self.tasks[name].max_attempts,
+            "progress": progress or {},
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "run_at": now + timedelta(seconds=delay),
+        }
+        await self.backend.save(job)
+        await self.backend.push(job)
+        metrics.counter("jobs_total", job=name, status=QUEUED).inc()
+        return job
+    
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.backend.get(job_id)
+    
+    async def list(self, *, owner_id: int, limit: int = 50) -> List[Dict[str, Any]]:
+        return await self.backend.list(owner_id, limit)
+    
+    async def save(self, job: Dict[str, Any]) -> None:
+        # Handlers call this to publish progress; a failed write only delays the update.
+        try:
+            await self.backend.save(job)
+        except RedisError as e:
+            logger.warning("Saving job %s failed: %s", job["id"], e)
+
+
+class Worker:
+    def __init__(self, queue: JobQueue, *, concurrency: int, poll_interval: float = settings.JOB_POLL_INTERVAL_SECONDS):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+    
+    async def run(self) -> None:
+        await asyncio.gather(self._schedule(), *(self._consume() for _ in range(self.concurrency)))
+    
+    async def _schedule(self) -> None:
+        # The first claim only starts the clock: a restart does not rerun every schedule.
+        for name, interval in self.queue.schedules.items():
+            await self.queue.backend.claim(name, interval)
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            for name, interval in self.queue.schedules.items():
+                try:
+                    if await self.queue.backend.claim(name, interval):
+                        await self.queue.enqueue(name)
+                except RedisError as e:
+                    logger.warning("Scheduling job %s failed: %s", name, e)
+    
+    async def _consume(self) -> None:
+        while True:
+            try:
+                job_id = await self.queue.backend.pop()
+                job = await self.queue.get(job_id) if job_id else None
+            except RedisError as e:
+                logger.warning("Reading the job queue failed: %s", e)
+                job_id = job = None
+            if job is None:
+                if job_id:
+                    logger.warning("Job %s expired before it ran", job_id)
+                await self.queue.backend.wait(self.poll_interval)
+                continue
+            await self.execute(job)
+    
+    def _retry_delay(self, task: JobTask, attempts: int) -> float:
+        delay = min(task.backoff * 2 ** (attempts - 1), settings.JOB_RETRY_BACKOFF_MAX_SECONDS)
+        return delay * random.uniform(0.5, 1.0)
+    
+    async def execute(self, job: Dict[str, Any]) -> None:
+        task = self.queue.tasks.get(job["name"])
+        job["attempts"] += 1
+        job["started_at"] = datetime.utcnow()
+        if task is None:
+            job.update(status=FAILED, error=f"Unknown job '{job['name']}'", finished_at=datetime.utcnow())
+            await self.queue.save(job)
+            return
+        job["status"] = RUNNING
+        await self.queue.save(job)
+        started = time.perf_counter()
+        try:
+            job["result"] = await task.handler(job, **job["args"])
+            job.update(status=COMPLETED, error=None, finished_at=datetime.utcnow())
+        except asyncio.CancelledError:
+            if task.max_attempts == 1:
+                # Tasks declared not retryable may have partly applied; starting them again would repeat that.
+                job.update(status=FAILED, error=INTERRUPTED_ERROR, finished_at=datetime.utcnow())
+                await asyncio.shield(self.queue.save(job))
+                raise
+            # Shutdown: hand the job back so the next worker starts it again.
+            job.update(status=QUEUED, attempts=job["attempts"] - 1, run_at=datetime.utcnow())
+            await asyncio.shield(self._requeue(job))
+            raise
+        except Exception as e:
+            logger.exception("Job %s (%s) failed on attempt %d", job["id"], job["name"], job["attempts"])
+            job["error"] = str(e)
+            if job["attempts"] < task.max_attempts:
+                job.update(status=RETRYING, run_at=datetime.utcnow() + timedelta(seconds=self._retry_delay(task, job["attempts"])))
+                await self._requeue(job)
+            else:
+                job.update(status=FAILED, finished_at=datetime.utcnow())
+        metrics.counter("jobs_total", job=job["name"], status=job["status"]).inc()
+        metrics.histogram("job_duration_seconds", job=job["name"]).observe(time.perf_counter() - started)
+        if job["status"] in FINISHED:
+            await self.queue.save(job)
+    
+    async def _requeue(self, job: Dict[str, Any]) -> None:
+        try:
+            await self.queue.backend.save(job)
+            await self.queue.backend.push(job)
+        except RedisError as e:
+            logger.error("Requeueing job %s failed: %s", job["id"], e)
+
+
+def create_backend() -> Any:
+    if settings.JOB_BACKEND == "redis":
+        return RedisJobBackend(retention=settings.JOB_RETENTION_SECONDS)
+    return MemoryJobBackend(max_jobs=settings.JOB_MEMORY_MAX_JOBS)
+
+
+job_queue = JobQueue(create_backend())
@@ -0,0 +1,83 @@
+import bisect
+from typing import Callable, Dict, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+    
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+    
+    def snapshot(self) -> int:
+        return self.value
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+    
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+    
+    def snapshot(self) -> dict:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "max": round(self.max, 6),
+            "buckets": buckets,
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._counters: Dict[str, Dict[LabelKey, Counter]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+    
+    def counter(self, name: str, **labels: str) -> Counter:
+        series = self._counters.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        if key not in series:
+            series[key] = Counter()
+        return series[key]
+    
+    def histogram(self, name: str, buckets: Sequence[float] = DEFAULT_BUCKETS, **labels: str) -> Histogram:
+        series = self._histograms.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        if key not in series:
+            series[key] = Histogram(buckets)
+        return series[key]
+    
+    def gauge(self, name: str, callback: Callable[[], float]) -> None:
+        self._gauges[name] = callback
+    
+    def snapshot(self) -> dict:
+        def series_list(series: Dict[LabelKey, object]) -> List[dict]:
+            return [{"labels": dict(key), "value": metric.snapshot()} for key, metric in series.items()]
+        
+        return {
+            "counters": {name: series_list(series) for name, series in self._counters.items()},
+            "histograms": {name: series_list(series) for name, series in self._histograms.items()},
+            "gauges": {name: callback() for name, callback in self._gauges.items()},
+        }
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,64 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Iterable, List, NamedTuple, Optional, Tuple
+from fastapi import Response
+from sqlalchemy import tuple_
+from sqlalchemy.orm import load_only
+from sqlalchemy.sql import Select
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+PREV_CURSOR_HEADER = "X-Prev-Cursor"
+
+
+class Cursor(NamedTuple):
+    updated_at: datetime
+    id: int
+    direction: str = "next"
+
+
+def encode_cursor(updated_at: datetime, id: int, direction: str = "next") -> str:
+    payload = json.dumps({"u": updated_at.isoformat(), "i": id, "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Cursor:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        cursor = Cursor(datetime.fromisoformat(payload["u"]), int(payload["i"]), payload.get("d", "next"))
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if cursor.direction not in ("next", "prev"):
+        raise ValueError("Invalid cursor")
+    return cursor
+
+
+# Keyset seek on (updated_at, id) newest first; skip is the legacy offset mode.
+# Prev pages are read oldest first, the flag tells the caller to reverse them.
+def paginate(query: Select, model: Any, *, cursor: Optional[Cursor], skip: int, limit: int) -> Tuple[Select, bool]:
+    key = tuple_(model.updated_at, model.id)
+    if cursor is None:
+        return query.order_by(model.updated_at.desc(), model.id.desc()).offset(skip).limit(limit), False
+    if cursor.direction == "prev":
+        query = query.where(key > tuple_(cursor.updated_at, cursor.id))
+        return query.order_by(model.updated_at.asc(), model.id.asc()).limit(limit), True
+    query = query.where(key < tuple_(cursor.updated_at, cursor.id))
+    return query.order_by(model.updated_at.desc(), model.id.desc()).limit(limit), False
+
+
+def summary_projection(query: Select, model: Any, fields: Iterable[str], summary: bool) -> Select:
+    # List views read only the columns they render; touching any other one raises.
+    if not summary:
+        return query
+    return query.options(load_only(*(getattr(model, field) for field in fields), raiseload=True))
+
+
+def set_cursor_headers(response: Response, items: List[Any], *, cursor: Optional[Cursor], skip: int, limit: int) -> None:
+    if not items:
+        return
+    backwards = cursor is not None and cursor.direction == "prev"
+    if backwards or len(items) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(items[-1].updated_at, items[-1].id, "next")
+    if (backwards and len(items) == limit) or (cursor is not None and not backwards) or (cursor is None and skip > 0):
+        response.headers[PREV_CURSOR_HEADER] = encode_cursor(items[0].updated_at, items[0].id, "prev")
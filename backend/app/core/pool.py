@@ -0,0 +1,36 @@
+import math
+import time
+import weakref
+from typing import Any
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Seconds for an old wait sample to fade to 1/e once checkouts stop.
+WAIT_DECAY_SECONDS = 1.0
+WAIT_SMOOTHING = 0.3
+
+_pools: "weakref.WeakSet[MonitoredQueuePool]" = weakref.WeakSet()
+
+
+class MonitoredQueuePool(AsyncAdaptedQueuePool):
+    def __init__(self, *args: Any, **kw: Any):
+        super().__init__(*args, **kw)
+        self._wait = 0.0
+        self._sampled_at = time.monotonic()
+        _pools.add(self)
+    
+    def _do_get(self) -> Any:
+        started = time.monotonic()
+        try:
+            return super()._do_get()
+        finally:
+            now = time.monotonic()
+            self._wait = self.recent_wait(now) * (1 - WAIT_SMOOTHING) + (now - started) * WAIT_SMOOTHING
+            self._sampled_at = now
+    
+    def recent_wait(self, now: float) -> float:
+        return self._wait * math.exp(-(now - self._sampled_at) / WAIT_DECAY_SECONDS)
+
+
+def pool_wait_seconds() -> float:
+    now = time.monotonic()
+    return max((pool.recent_wait(now) for pool in list(_pools)), default=0.0)
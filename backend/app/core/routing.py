@@ -0,0 +1,66 @@
+import random
+from typing import Any, Optional, Sequence
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.expression import Select, TextClause
+from app.core.cache import write_markers
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class RoutingSession(Session):
+    write_bind: Optional[Engine] = None
+    primary_read_bind: Optional[Engine] = None
+    replica_binds: Sequence[Engine] = ()
+    
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kw: Any) -> Engine:
+        if self.info.get("writing"):
+            return self.write_bind
+        # SELECT ... FOR UPDATE marks a read whose result feeds a write, so it has
+        # to see the writer's snapshot rather than a reader's.
+        locking = isinstance(clause, Select) and clause._for_update_arg is not None
+        if self._flushing or locking or isinstance(clause, (UpdateBase, TextClause)):
+            # Stay on the writer until the transaction ends so later reads see our own writes.
+            self.info["writing"] = True
+            return self.write_bind
+        # Only request sessions opt in; jobs and startup work always read the primary.
+        if not self.info.get("replica_reads") or not self.replica_binds:
+            return self.primary_read_bind
+        # One replica per session keeps every read of a request on the same snapshot.
+        replica = self.info.get("replica")
+        if replica is None:
+            replica = self.info["replica"] = random.choice(self.replica_binds)
+        return replica
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _mark_writer(session: Session) -> None:
+    user_id = session.info.get("user_id")
+    if session.info.get("writing") and user_id is not None:
+        write_markers.mark(user_id)
+        session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _end_writing(session: Session, transaction: Any) -> None:
+    if transaction.parent is None:
+        session.info.pop("writing", None)
+
+
+def routing_session_class(
+    write_engine: AsyncEngine,
+    primary_read_engine: AsyncEngine,
+    replica_engines: Sequence[AsyncEngine] = ()
+) -> type:
+    return type(
+        "PrimaryReplicaSession",
+        (RoutingSession,),
+        {
+            "write_bind": write_engine.sync_engine,
+            "primary_read_bind": primary_read_engine.sync_engine,
+            "replica_binds": tuple(engine.sync_engine for engine in replica_engines),
+        },
+    )
@@ -0,0 +1,38 @@
+import html
+import re
+from typing import List, Optional
+
+KNOWLEDGE_CARD_FTS_TABLE = "knowledge_cards_fts"
+KNOWLEDGE_CARD_SEARCH_VECTOR = "search_vector"
+
+# The databases wrap matches in these control characters; render_snippet escapes
+# the card text around them before they become <mark> tags.
+SNIPPET_START = "\x02"
+SNIPPET_END = "\x03"
+
+
+def render_snippet(snippet: Optional[str]) -> Optional[str]:
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(SNIPPET_START, "<mark>").replace(SNIPPET_END, "</mark>")
+
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Scripts written without word separators; unicode61 would treat a whole
+# sentence as one token, so these queries keep using substring matching.
+_UNSEGMENTED_RE = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]")
+
+
+def tokenize_query(search: str) -> List[str]:
+    return [token.lower() for token in _TOKEN_RE.findall(search)]
+
+
+def supports_fulltext(search: str) -> bool:
+    return bool(tokenize_query(search)) and not _UNSEGMENTED_RE.search(search)
+
+
+def build_fulltext_query(search: str, dialect: str) -> str:
+    tokens = tokenize_query(search)
+    if dialect == "postgresql":
+        return " & ".join(f"{token}:*" for token in tokens)
+    return " ".join(f'"{token}"*' for token in tokens)
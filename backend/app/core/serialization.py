@@ -0,0 +1,41 @@
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import AliasChoices, BaseModel
+
+
+def _source_attribute(name: str, field: Any) -> str:
+    alias = field.validation_alias
+    if isinstance(alias, AliasChoices):
+        return alias.choices[0]
+    if isinstance(alias, str):
+        return alias
+    return name
+
+
+@lru_cache()
+def row_serializer(schema: Type[BaseModel]) -> Callable[[Any], Dict[str, Any]]:
+    # Read schemas mirror ORM columns one to one, so the values can be copied
+    # straight off the row instead of being validated again by pydantic.
+    keys = tuple(schema.model_fields)
+    attributes = tuple(_source_attribute(name, field) for name, field in schema.model_fields.items())
+    if len(keys) == 1:
+        getter = attrgetter(attributes[0])
+        return lambda row: {keys[0]: getter(row)}
+    getter = attrgetter(*attributes)
+    return lambda row: dict(zip(keys, getter(row)))
+
+
+def dump_rows(schema: Type[BaseModel], rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    serialize = row_serializer(schema)
+    return [serialize(row) for row in rows]
+
+
+def fast_json(content: Any, response: Optional[Response] = None, status_code: int = 200) -> ORJSONResponse:
+    fast_response = ORJSONResponse(content, status_code=status_code)
+    if response is not None:
+        # Headers set on the injected Response (cursors, ETag) are otherwise dropped.
+        fast_response.headers.raw.extend(response.headers.raw)
+    return fast_response
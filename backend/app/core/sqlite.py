@@ -0,0 +1,75 @@
+from typing import Any
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core.config import settings
+from app.core.pool import MonitoredQueuePool
+
+
+def is_file_sqlite(url: str) -> bool:
+    url = make_url(url)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def _pragmas(*, read_only: bool) -> list:
+    pragmas = [
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        "PRAGMA journal_mode=WAL",
+        # WAL + NORMAL only fsyncs at checkpoints: a power loss can drop the last
+        # commits but never corrupts the database.
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    return pragmas
+
+
+def install_sqlite_profile(engine: Engine, *, writer: bool) -> None:
+    pragmas = _pragmas(read_only=not writer)
+    
+    @event.listens_for(engine, "connect")
+    def configure_connection(dbapi_connection: Any, connection_record: Any) -> None:
+        # Take transaction control away from the driver so BEGIN can be chosen below.
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+    
+    @event.listens_for(engine, "begin")
+    def begin(conn: Any) -> None:
+        # Writers lock up front so a transaction never fails upgrading a read
+        # lock halfway through; readers keep a plain snapshot transaction.
+        conn.exec_driver_sql("BEGIN IMMEDIATE" if writer else "BEGIN")
+
+
+def create_sqlite_read_engine(url: str) -> AsyncEngine:
+    read_engine = create_async_engine(
+        url,
+        echo=settings.SQL_ECHO,
+        poolclass=MonitoredQueuePool,
+        pool_size=settings.SQLITE_READ_POOL_SIZE,
+        max_overflow=0,
+    )
+    install_sqlite_profile(read_engine.sync_engine, writer=False)
+    return read_engine
+
+
+def create_sqlite_engines(url: str) -> tuple:
+    # A single pooled connection is the write queue: sessions wait for it in
+    # arrival order instead of racing each other for the database lock. Waiting
+    # here is by design, so this pool stays out of load shedding.
+    write_engine = create_async_engine(
+        url,
+        echo=settings.SQL_ECHO,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=settings.SQLITE_WRITE_TIMEOUT_SECONDS,
+    )
+    install_sqlite_profile(write_engine.sync_engine, writer=True)
+    return write_engine, create_sqlite_read_engine(url)
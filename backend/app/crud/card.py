@@ -1,10 +1,38 @@
-from typing import List, Optional, Any
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Any, Set, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, update
+from sqlalchemy import select, and_, or_, func, update, insert, delete, table, column, literal_column, null, tuple_
 from sqlalchemy.orm import selectinload
-from app.models.card import KnowledgeCard, Notebook, CardReference
+from sqlalchemy.sql import Select
+from app.models.card import KnowledgeCard, Notebook, CardReference, CardLink
 from app.schemas.card import KnowledgeCardCreate, KnowledgeCardUpdate, NotebookCreate, NotebookUpdate
-from app.core.utils import normalize_tags, paginate_results
+from app.core.search import (
+    KNOWLEDGE_CARD_FTS_TABLE,
+    KNOWLEDGE_CARD_SEARCH_VECTOR,
+    SNIPPET_START,
+    SNIPPET_END,
+    build_fulltext_query,
+    render_snippet,
+    supports_fulltext,
+)
+from app.core.database import owned_row
+from app.core.pagination import Cursor, paginate, summary_projection
+from app.core.utils import normalize_tags, get_current_timestamp
+from app.crud.sync import track_changes
+from app.crud.tag import parse_tags, tag_crud
+from app.services.dedup import CARD_DEDUP_FIELDS, card_duplicates
+from app.services.graph import reference_graph_cache
+from app.services.related import TEXT_FIELDS, related_card_index
+from app.services.wikilinks import (
+    WIKILINK_REFERENCE_TYPE, extract_wikilinks, load_title_index, normalize_title
+)
+from app.crud.stats import CARD_STAT_FIELDS, stats_crud, new_deltas, add_card_deltas, stat_values
+
+# Columns the list views render; content stays unread and raises if touched.
+KNOWLEDGE_CARD_SUMMARY_FIELDS = (
+    "id", "title", "summary", "content_type", "tags", "category", "status", "priority",
+    "is_favorite", "is_public", "owner_id", "created_at", "updated_at", "last_accessed",
+)
 
 
 class KnowledgeCardCRUD:
@@ -16,6 +44,39 @@ class KnowledgeCardCRUD:
         )
         return result.scalar_one_or_none()
     
+    async def get_version(self, db: AsyncSession, *, id: int) -> Optional[Any]:
+        result = await db.execute(
+            select(KnowledgeCard.id, KnowledgeCard.owner_id, KnowledgeCard.updated_at).where(KnowledgeCard.id == id)
+        )
+        return result.first()
+    
+    def _filter(
+        self,
+        query: Select,
+        *,
+        owner_id: int,
+        category: Optional[str] = None,
+        tags: Optional[str] = None,
+        match_all_tags: bool = True,
+        status: Optional[str] = None
+    ) -> Select:
+        query = query.where(KnowledgeCard.owner_id == owner_id)
+        
+        if category:
+            query = query.where(KnowledgeCard.category == category)
+        
+        if status:
+            query = query.where(KnowledgeCard.status == status)
+        
+        if normalize_tags(tags or ""):
+            query = query.where(
+                KnowledgeCard.id.in_(
+                    tag_crud.tagged_card_ids(owner_id=owner_id, tags=tags, match_all=match_all_tags)
+                )
+            )
+        
+        return query
+    
     async def get_multi(
         self, 
         db: AsyncSession, 
@@ -25,79 +86,559 @@ class KnowledgeCardCRUD:
         limit: int = 100,
         category: Optional[str] = None,
         tags: Optional[str] = None,
+        match_all_tags: bool = True,
         status: Optional[str] = None,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        cursor: Optional[Cursor] = None,
+        summary: bool = False
     ) -> List[KnowledgeCard]:
-        query = select(KnowledgeCard).where(KnowledgeCard.owner_id == owner_id)
-        
-        if category:
-            query = query.where(KnowledgeCard.category == category)
-        
-        if status:
-            query = query.where(KnowledgeCard.status == status)
-        
-        if tags:
-            normalized_tags = normalize_tags(tags)
-            for tag in normalized_tags:
-                query = query.where(KnowledgeCard.tags.like(f"%{tag}%"))
-        
         if search:
+            hits = await self.search(
+                db,
+                owner_id=owner_id,
+                search=search,
+                skip=skip,
+                limit=limit,
+                category=category,
+                tags=tags,
+                match_all_tags=match_all_tags,
+                status=status,
+                summary=summary
+            )
+            return [card for card, _ in hits]
+        
+        query = self._filter(
+            summary_projection(select(KnowledgeCard), KnowledgeCard, KNOWLEDGE_CARD_SUMMARY_FIELDS, summary),
+            owner_id=owner_id,
+            category=category,
+            tags=tags,
+            match_all_tags=match_all_tags,
+            status=status
+        )
+        query, reverse = paginate(query, KnowledgeCard, cursor=cursor, skip=skip, limit=limit)
+        result = await db.execute(query)
+        cards = result.scalars().all()
+        return cards[::-1] if reverse else cards
+    
+    async def search(
+        self,
+        db: AsyncSession,
+        *,
+        owner_id: int,
+        search: str,
+        skip: int = 0,
+        limit: int = 100,
+        category: Optional[str] = None,
+        tags: Optional[str] = None,
+        match_all_tags: bool = True,
+        status: Optional[str] = None,
+        summary: bool = False
+    ) -> List[Tuple[KnowledgeCard, Optional[str]]]:
+        dialect = db.get_bind().dialect.name
+        if not supports_fulltext(search) or dialect not in ("sqlite", "postgresql"):
+            # Substring matching for text the FTS tokenizers cannot segment (CJK).
             search_term = f"%{search}%"
-            query = query.where(
+            query = select(KnowledgeCard, null()).where(
                 or_(
                     KnowledgeCard.title.like(search_term),
                     KnowledgeCard.content.like(search_term),
                     KnowledgeCard.summary.like(search_term)
                 )
             )
+            order_by = [KnowledgeCard.updated_at.desc()]
+        elif dialect == "sqlite":
+            fts = table(KNOWLEDGE_CARD_FTS_TABLE, column("rowid"))
+            fts_ref = literal_column(KNOWLEDGE_CARD_FTS_TABLE)
+            snippet = func.snippet(fts_ref, -1, SNIPPET_START, SNIPPET_END, "…", 24)
+            query = (
+                select(KnowledgeCard, snippet)
+                .join(fts, fts.c.rowid == KnowledgeCard.id)
+                .where(fts_ref.op("MATCH")(build_fulltext_query(search, dialect)))
+            )
+            order_by = [func.bm25(fts_ref, 10.0, 5.0, 1.0), KnowledgeCard.updated_at.desc()]
+        else:
+            ts_query = func.to_tsquery("simple", build_fulltext_query(search, dialect))
+            search_vector = literal_column(f"knowledge_cards.{KNOWLEDGE_CARD_SEARCH_VECTOR}")
+            snippet = func.ts_headline(
+                "simple",
+                func.coalesce(KnowledgeCard.summary, "") + " " + KnowledgeCard.content,
+                ts_query,
+                f"StartSel=\"{SNIPPET_START}\", StopSel=\"{SNIPPET_END}\", MaxWords=35, MinWords=15, MaxFragments=1"
+            )
+            query = select(KnowledgeCard, snippet).where(search_vector.op("@@")(ts_query))
+            order_by = [func.ts_rank_cd(search_vector, ts_query).desc(), KnowledgeCard.updated_at.desc()]
         
-        query = query.offset(skip).limit(limit).order_by(KnowledgeCard.updated_at.desc())
+        query = self._filter(
+            query,
+            owner_id=owner_id,
+            category=category,
+            tags=tags,
+            match_all_tags=match_all_tags,
+            status=status
+        )
+        query = (
+            summary_projection(query, KnowledgeCard, KNOWLEDGE_CARD_SUMMARY_FIELDS, summary)
+            .order_by(*order_by)
+            .offset(skip)
+            .limit(limit)
+        )
         result = await db.execute(query)
-        return result.scalars().all()
+        return [(card, render_snippet(snippet)) for card, snippet in result.all()]
+    
+    async def _sync_wikilinks(
+        self,
+        db: AsyncSession,
+        *,
+        owner_id: int,
+        contents: Dict[int, Optional[str]],
+        new: bool = False
+    ) -> bool:
+        links = {card_id: extract_wikilinks(content) for card_id, content in contents.items()}
+        if new and not any(links.values()):
+            return False
+        await self._store_links(db, owner_id=owner_id, links=links, new=new)
+        # Read inside this transaction: a per-process cache can miss titles other workers just
+        # added, renamed or deleted, and a deleted target would fail the foreign key.
+        titles = await load_title_index(db, owner_id) if any(links.values()) else {}
+        return await self._resolve_wikilinks(db, owner_id=owner_id, links=links, titles=titles, new=new)
+    
+    async def _store_links(self, db: AsyncSession, *, owner_id: int, links: Dict[int, Set[str]], new: bool) -> None:
+        existing = set()
+        if not new:
+            result = await db.execute(select(CardLink.card_id, CardLink.title).where(CardLink.card_id.in_(links.keys())))
+            existing = {tuple(row) for row in result}
+        wanted = {(card_id, name) for card_id, names in links.items() for name in names}
+        stale, missing = existing - wanted, wanted - existing
+        if stale:
+            await db.execute(delete(CardLink).where(tuple_(CardLink.card_id, CardLink.title).in_(stale)))
+        if missing:
+            await db.execute(
+                insert(CardLink),
+                [{"card_id": card_id, "title": name, "owner_id": owner_id} for card_id, name in sorted(missing)]
+            )
+    
+    async def _relink(
+        self, db: AsyncSession, *, owner_id: int, names: Set[str], card_ids: Iterable[int] = ()
+    ) -> bool:
+        # Re-resolves the cards linking to titles that were just added, renamed or removed.
+        links: Dict[int, Set[str]] = {card_id: set() for card_id in card_ids}
+        conditions = [CardLink.card_id.in_(links.keys())] if links else []
+        if names:
+            linking = select(CardLink.card_id).where(and_(CardLink.owner_id == owner_id, CardLink.title.in_(names)))
+            conditions.append(CardLink.card_id.in_(linking))
+        if not conditions:
+            return False
+        result = await db.execute(select(CardLink.card_id, CardLink.title).where(or_(*conditions)))
+        for card_id, name in result:
+            links.setdefault(card_id, set()).add(name)
+        if not links:
+            return False
+        titles = await load_title_index(db, owner_id)
+        return await self._resolve_wikilinks(db, owner_id=owner_id, links=links, titles=titles)
+    
+    async def _resolve_wikilinks(
+        self,
+        db: AsyncSession,
+        *,
+        owner_id: int,
+        links: Dict[int, Set[str]],
+        titles: Dict[str, int],
+        new: bool = False
+    ) -> bool:
+        wanted = {
+            (card_id, titles[name])
+            for card_id, names in links.items()
+            for name in names
+            if name in titles and titles[name] != card_id
+        }
+        existing = set()
+        if not new:
+            result = await db.execute(
+                select(CardReference.card_id, CardReference.referenced_card_id).where(
+                    and_(
+                        CardReference.card_id.in_(links.keys()),
+                        CardReference.reference_type == WIKILINK_REFERENCE_TYPE
+                    )
+                )
+            )
+            existing = {tuple(row) for row in result}
+        
+        stale, missing = existing - wanted, wanted - existing
+        if stale:
+            result = await db.execute(
+                delete(CardReference).where(
+                    and_(
+                        CardReference.reference_type == WIKILINK_REFERENCE_TYPE,
+                        tuple_(CardReference.card_id, CardReference.referenced_card_id).in_(stale)
+                    )
+                ).returning(CardReference.id)
+            )
+            track_changes(db, owner_id=owner_id, entity_type="reference", ids=result.scalars().all(), deleted=True)
+        if missing:
+            now = get_current_timestamp()
+            result = await db.execute(
+                insert(CardReference).returning(CardReference.id),
+                [
+                    {
+                        "card_id": card_id,
+                        "referenced_card_id": referenced_card_id,
+                        "reference_type": WIKILINK_REFERENCE_TYPE,
+                        "created_at": now
+                    }
+                    for card_id, referenced_card_id in sorted(missing)
+                ]
+            )
+            track_changes(db, owner_id=owner_id, entity_type="reference", ids=result.scalars().all())
+        return bool(stale or missing)
     
     async def create(self, db: AsyncSession, *, obj_in: KnowledgeCardCreate, owner_id: int) -> KnowledgeCard:
         db_obj = KnowledgeCard(**obj_in.dict(), owner_id=owner_id)
         db.add(db_obj)
+        await db.flush()
+        await tag_crud.set_card_tags(db, owner_id=owner_id, tags_by_card={db_obj.id: db_obj.tags})
+        await stats_crud.apply(
+            db, owner_id=owner_id, deltas=add_card_deltas(new_deltas(), stat_values(db_obj, CARD_STAT_FIELDS))
+        )
+        linked = await self._sync_wikilinks(db, owner_id=owner_id, contents={db_obj.id: db_obj.content}, new=True)
+        linked = await self._relink(db, owner_id=owner_id, names={normalize_title(db_obj.title)}) or linked
+        track_changes(db, owner_id=owner_id, entity_type="card", ids=[db_obj.id])
         await db.commit()
+        if linked:
+            reference_graph_cache.invalidate(owner_id)
+        related_card_index.upsert(owner_id, [db_obj])
+        card_duplicates.upsert(owner_id, [db_obj])
         await db.refresh(db_obj)
         return db_obj
     
-    async def update(self, db: AsyncSession, *, db_obj: KnowledgeCard, obj_in: KnowledgeCardUpdate) -> KnowledgeCard:
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        id: int,
+        owner_id: int,
+        obj_in: KnowledgeCardUpdate,
+        updated_at: Optional[datetime] = None
+    ) -> Optional[KnowledgeCard]:
         update_data = obj_in.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_obj, field, value)
+        owned = owned_row(KnowledgeCard, id=id, owner_id=owner_id, updated_at=updated_at)
+        previous = None
+        # RETURNING only sees the new row, so old stat fields and title are read (and locked) first, only when they can change.
+        if update_data.keys() & {*CARD_STAT_FIELDS, "title"}:
+            result = await db.execute(
+                select(KnowledgeCard.status, KnowledgeCard.category, KnowledgeCard.title).where(owned).with_for_update()
+            )
+            previous = result.first()
+            if previous is None:
+                return None
+        result = await db.scalars(
+            update(KnowledgeCard)
+            .where(owned)
+            .values(**update_data, updated_at=get_current_timestamp())
+            .returning(KnowledgeCard),
+            execution_options={"synchronize_session": False, "populate_existing": True}
+        )
+        card = result.one_or_none()
+        if card is None:
+            return None
         
-        db.add(db_obj)
+        if "tags" in update_data:
+            await tag_crud.set_card_tags(db, owner_id=owner_id, tags_by_card={card.id: card.tags})
+        if update_data.keys() & set(CARD_STAT_FIELDS):
+            deltas = add_card_deltas(new_deltas(), stat_values(previous, CARD_STAT_FIELDS), -1)
+            await stats_crud.apply(db, owner_id=owner_id, deltas=add_card_deltas(deltas, stat_values(card, CARD_STAT_FIELDS)))
+        linked = "content" in update_data and await self._sync_wikilinks(
+            db, owner_id=owner_id, contents={card.id: card.content}
+        )
+        names = {normalize_title(previous.title), normalize_title(card.title)} if "title" in update_data else set()
+        if len(names) > 1:
+            linked = await self._relink(db, owner_id=owner_id, names=names) or linked
+        track_changes(db, owner_id=owner_id, entity_type="card", ids=[card.id])
         await db.commit()
-        await db.refresh(db_obj)
-        return db_obj
+        if linked:
+            reference_graph_cache.invalidate(owner_id)
+        if update_data.keys() & set(TEXT_FIELDS):
+            related_card_index.upsert(owner_id, [card])
+        if update_data.keys() & set(CARD_DEDUP_FIELDS):
+            card_duplicates.upsert(owner_id, [card])
+        return card
     
-    async def delete(self, db: AsyncSession, *, id: int, owner_id: int) -> bool:
-        card = await self.get_by_id(db, id=id)
-        if card and card.owner_id == owner_id:
-            await db.delete(card)
-            await db.commit()
-            return True
-        return False
+    async def delete(self, db: AsyncSession, *, id: int, owner_id: int, updated_at: Optional[datetime] = None) -> bool:
+        owned = owned_row(KnowledgeCard, id=id, owner_id=owner_id, updated_at=updated_at)
+        # Child rows go first for the foreign keys; selecting the card through the same
+        # owner/version filter leaves them alone whenever the card itself will not match.
+        owned_id = select(KnowledgeCard.id).where(owned).scalar_subquery()
+        result = await db.execute(
+            delete(CardReference).where(
+                or_(CardReference.card_id == owned_id, CardReference.referenced_card_id == owned_id)
+            ).returning(CardReference.id)
+        )
+        reference_ids = result.scalars().all()
+        await db.execute(delete(CardLink).where(CardLink.card_id == owned_id))
+        await tag_crud.clear_card_tags(db, card_ids=[owned_id])
+        result = await db.execute(
+            delete(KnowledgeCard)
+            .where(owned)
+            .returning(KnowledgeCard.status, KnowledgeCard.category, KnowledgeCard.title),
+            execution_options={"synchronize_session": False}
+        )
+        deleted = result.first()
+        if deleted is None:
+            return False
+        await stats_crud.apply(
+            db, owner_id=owner_id, deltas=add_card_deltas(new_deltas(), stat_values(deleted, CARD_STAT_FIELDS), -1)
+        )
+        await self._relink(db, owner_id=owner_id, names={normalize_title(deleted.title)})
+        track_changes(db, owner_id=owner_id, entity_type="reference", ids=reference_ids, deleted=True)
+        track_changes(db, owner_id=owner_id, entity_type="card", ids=[id], deleted=True)
+        await db.commit()
+        reference_graph_cache.invalidate(owner_id)
+        related_card_index.remove(owner_id, [id])
+        card_duplicates.remove(owner_id, [id])
+        return True
     
-    async def get_favorites(self, db: AsyncSession, *, owner_id: int, skip: int = 0, limit: int = 100) -> List[KnowledgeCard]:
+    async def create_many(
+        self, db: AsyncSession, *, objs_in: List[KnowledgeCardCreate], owner_id: int
+    ) -> List[KnowledgeCard]:
+        if not objs_in:
+            return []
+        now = get_current_timestamp()
+        rows = [
+            {**obj_in.dict(), "owner_id": owner_id, "created_at": now, "updated_at": now}
+            for obj_in in objs_in
+        ]
+        result = await db.scalars(
+            insert(KnowledgeCard).returning(KnowledgeCard, sort_by_parameter_order=True), rows
+        )
+        cards = result.all()
+        await tag_crud.set_card_tags(db, owner_id=owner_id, tags_by_card={card.id: card.tags for card in cards})
+        deltas = new_deltas()
+        for card in cards:
+            add_card_deltas(deltas, stat_values(card, CARD_STAT_FIELDS))
+        await stats_crud.apply(db, owner_id=owner_id, deltas=deltas)
+        links = {card.id: names for card in cards if (names := extract_wikilinks(card.content))}
+        if links:
+            await self._store_links(db, owner_id=owner_id, links=links, new=True)
+        # One pass resolves the new cards' links, links between cards of this batch and
+        # earlier links to the new titles alike.
+        linked = await self._relink(
+            db, owner_id=owner_id, names={normalize_title(card.title) for card in cards}, card_ids=links.keys()
+        )
+        track_changes(db, owner_id=owner_id, entity_type="card", ids=[card.id for card in cards])
+        await db.commit()
+        if linked:
+            reference_graph_cache.invalidate(owner_id)
+        related_card_index.upsert(owner_id, cards)
+        card_duplicates.upsert(owner_id, cards)
+        return cards
+    
+    async def get_owned_ids(self, db: AsyncSession, *, ids: List[int], owner_id: int) -> List[int]:
         result = await db.execute(
-            select(KnowledgeCard)
-            .where(and_(KnowledgeCard.owner_id == owner_id, KnowledgeCard.is_favorite == True))
-            .offset(skip)
-            .limit(limit)
-            .order_by(KnowledgeCard.updated_at.desc())
+            select(KnowledgeCard.id).where(and_(KnowledgeCard.id.in_(ids), KnowledgeCard.owner_id == owner_id))
         )
         return result.scalars().all()
     
-    async def get_recent(self, db: AsyncSession, *, owner_id: int, limit: int = 10) -> List[KnowledgeCard]:
+    async def update_many(
+        self, db: AsyncSession, *, updates: Dict[int, KnowledgeCardUpdate], owner_id: int
+    ) -> List[KnowledgeCard]:
+        if not updates:
+            return []
+        now = get_current_timestamp()
+        update_data = {id: obj_in.dict(exclude_unset=True) for id, obj_in in updates.items()}
+        read_ids = [id for id, data in update_data.items() if data.keys() & {*CARD_STAT_FIELDS, "title"}]
+        previous = {}
+        if read_ids:
+            result = await db.execute(
+                select(KnowledgeCard.id, KnowledgeCard.status, KnowledgeCard.category, KnowledgeCard.title)
+                .where(and_(KnowledgeCard.id.in_(read_ids), KnowledgeCard.owner_id == owner_id))
+                .with_for_update()
+            )
+            previous = {row.id: row for row in result}
+        await db.execute(
+            update(KnowledgeCard).where(KnowledgeCard.owner_id == owner_id),
+            [{**data, "id": id, "updated_at": now} for id, data in update_data.items()],
+            execution_options={"synchronize_session": False}
+        )
+        tags_by_card = {id: data["tags"] for id, data in update_data.items() if "tags" in data}
+        await tag_crud.set_card_tags(db, owner_id=owner_id, tags_by_card=tags_by_card)
+        deltas = new_deltas()
+        names = set()
+        for id, row in previous.items():
+            if update_data[id].keys() & set(CARD_STAT_FIELDS):
+                values = stat_values(row, CARD_STAT_FIELDS)
+                add_card_deltas(deltas, values, -1)
+                add_card_deltas(deltas, {**values, **update_data[id]})
+            if "title" in update_data[id] and normalize_title(row.title) != normalize_title(update_data[id]["title"]):
+                names.update((normalize_title(row.title), normalize_title(update_data[id]["title"])))
+        await stats_crud.apply(db, owner_id=owner_id, deltas=deltas)
+        contents = {id: data["content"] for id, data in update_data.items() if "content" in data}
+        linked = bool(contents) and await self._sync_wikilinks(db, owner_id=owner_id, contents=contents)
+        linked = await self._relink(db, owner_id=owner_id, names=names) or linked
+        track_changes(db, owner_id=owner_id, entity_type="card", ids=update_data.keys())
+        await db.commit()
+        if linked:
+            reference_graph_cache.invalidate(owner_id)
+        
         result = await db.execute(
             select(KnowledgeCard)
+            .where(KnowledgeCard.id.in_(updates.keys()))
+            .execution_options(populate_existing=True)
+        )
+        cards = {card.id: card for card in result.scalars().all()}
+        related_card_index.upsert(
+            owner_id, [cards[id] for id, data in update_data.items() if id in cards and data.keys() & set(TEXT_FIELDS)]
+        )
+        card_duplicates.upsert(
+            owner_id, [cards[id] for id, data in update_data.items() if id in cards and data.keys() & set(CARD_DEDUP_FIELDS)]
+        )
+        return [cards[id] for id in updates if id in cards]
+    
+    async def _delete_owned(
+        self, db: AsyncSession, *, owned_ids: List[int], owner_id: int, relink_ids: Iterable[int] = ()
+    ) -> List[int]:
+        result = await db.execute(
+            delete(CardReference).where(
+                or_(CardReference.card_id.in_(owned_ids), CardReference.referenced_card_id.in_(owned_ids))
+            ).returning(CardReference.id)
+        )
+        track_changes(db, owner_id=owner_id, entity_type="reference", ids=result.scalars().all(), deleted=True)
+        await db.execute(delete(CardLink).where(CardLink.card_id.in_(owned_ids)))
+        await tag_crud.clear_card_tags(db, card_ids=owned_ids)
+        result = await db.execute(
+            delete(KnowledgeCard)
+            .where(and_(KnowledgeCard.id.in_(owned_ids), KnowledgeCard.owner_id == owner_id))
+            .returning(KnowledgeCard.id, KnowledgeCard.status, KnowledgeCard.category, KnowledgeCard.title),
+            execution_options={"synchronize_session": False}
+        )
+        deleted = result.all()
+        deltas = new_deltas()
+        for row in deleted:
+            add_card_deltas(deltas, stat_values(row, CARD_STAT_FIELDS), -1)
+        await stats_crud.apply(db, owner_id=owner_id, deltas=deltas)
+        await self._relink(
+            db, owner_id=owner_id, names={normalize_title(row.title) for row in deleted}, card_ids=relink_ids
+        )
+        deleted_ids = [row.id for row in deleted]
+        track_changes(db, owner_id=owner_id, entity_type="card", ids=deleted_ids, deleted=True)
+        return deleted_ids
+    
+    async def delete_many(self, db: AsyncSession, *, ids: List[int], owner_id: int) -> List[int]:
+        owned_ids = await self.get_owned_ids(db, ids=ids, owner_id=owner_id)
+        if not owned_ids:
+            return []
+        deleted_ids = await self._delete_owned(db, owned_ids=owned_ids, owner_id=owner_id)
+        await db.commit()
+        reference_graph_cache.invalidate(owner_id)
+        related_card_index.remove(owner_id, deleted_ids)
+        card_duplicates.remove(owner_id, deleted_ids)
+        return deleted_ids
+    
+    async def merge(
+        self, db: AsyncSession, *, target_id: int, duplicate_ids: List[int], owner_id: int
+    ) -> Optional[KnowledgeCard]:
+        duplicate_ids = [id for id in dict.fromkeys(duplicate_ids) if id != target_id]
+        owned_ids = set(await self.get_owned_ids(db, ids=[target_id, *duplicate_ids], owner_id=owner_id))
+        if target_id not in owned_ids or not owned_ids.issuperset(duplicate_ids):
+            return None
+        result = await db.execute(
+            select(KnowledgeCard.id, KnowledgeCard.tags).where(KnowledgeCard.id.in_([target_id, *duplicate_ids]))
+        )
+        tags = {id: card_tags for id, card_tags in result}
+        
+        # Edges of the duplicates move to the target; self-links and edges it already had are dropped.
+        result = await db.execute(
+            update(CardReference)
+            .where(CardReference.card_id.in_(duplicate_ids))
+            .values(card_id=target_id)
+            .returning(CardReference.id)
+        )
+        track_changes(db, owner_id=owner_id, entity_type="reference", ids=result.scalars().all())
+        result = await db.execute(
+            update(CardReference)
+            .where(CardReference.referenced_card_id.in_(duplicate_ids))
+            .values(referenced_card_id=target_id)
+            .returning(CardReference.id)
+        )
+        track_changes(db, owner_id=owner_id, entity_type="reference", ids=result.scalars().all())
+        touching = or_(CardReference.card_id == target_id, CardReference.referenced_card_id == target_id)
+        first_edges = (
+            select(func.min(CardReference.id))
+            .where(touching)
+            .group_by(CardReference.card_id, CardReference.referenced_card_id, CardReference.reference_type)
+        )
+        result = await db.execute(
+            delete(CardReference).where(
+                and_(
+                    touching,
+                    or_(CardReference.card_id == CardReference.referenced_card_id, CardReference.id.not_in(first_edges))
+                )
+            ).returning(CardReference.id)
+        )
+        track_changes(db, owner_id=owner_id, entity_type="reference", ids=result.scalars().all(), deleted=True)
+        
+        names = parse_tags(tags.get(target_id))
+        for id in duplicate_ids:
+            names.extend(name for name in parse_tags(tags.get(id)) if name not in names)
+        merged_tags = ", ".join(names) or None
+        result = await db.scalars(
+            update(KnowledgeCard)
+            .where(KnowledgeCard.id == target_id)
+            .values(tags=merged_tags, updated_at=get_current_timestamp())
+            .returning(KnowledgeCard),
+            execution_options={"synchronize_session": False, "populate_existing": True}
+        )
+        card = result.one()
+        await tag_crud.set_card_tags(db, owner_id=owner_id, tags_by_card={target_id: merged_tags})
+        track_changes(db, owner_id=owner_id, entity_type="card", ids=[target_id])
+        # Wikilink edges always follow the text: the target drops the ones it took over from the duplicates.
+        deleted_ids = await self._delete_owned(
+            db, owned_ids=duplicate_ids, owner_id=owner_id, relink_ids=[target_id]
+        )
+        await db.commit()
+        reference_graph_cache.invalidate(owner_id)
+        related_card_index.remove(owner_id, deleted_ids)
+        card_duplicates.remove(owner_id, deleted_ids)
+        return card
+    
+    async def get_favorites(
+        self,
+        db: AsyncSession,
+        *,
+        owner_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[Cursor] = None,
+        summary: bool = False
+    ) -> List[KnowledgeCard]:
+        query = summary_projection(select(KnowledgeCard), KnowledgeCard, KNOWLEDGE_CARD_SUMMARY_FIELDS, summary).where(
+            and_(KnowledgeCard.owner_id == owner_id, KnowledgeCard.is_favorite == True)
+        )
+        query, reverse = paginate(query, KnowledgeCard, cursor=cursor, skip=skip, limit=limit)
+        result = await db.execute(query)
+        cards = result.scalars().all()
+        return cards[::-1] if reverse else cards
+    
+    async def get_recent(
+        self, db: AsyncSession, *, owner_id: int, limit: int = 10, summary: bool = False
+    ) -> List[KnowledgeCard]:
+        result = await db.execute(
+            summary_projection(select(KnowledgeCard), KnowledgeCard, KNOWLEDGE_CARD_SUMMARY_FIELDS, summary)
             .where(KnowledgeCard.owner_id == owner_id)
-            .order_by(KnowledgeCard.updated_at.desc())
+            .order_by(KnowledgeCard.updated_at.desc(), KnowledgeCard.id.desc())
             .limit(limit)
         )
         return result.scalars().all()
+    
+    async def get_statistics(self, db: AsyncSession, *, owner_id: int) -> dict:
+        return await stats_crud.get_card_statistics(db, owner_id=owner_id)
+    
+    async def get_titles(self, db: AsyncSession, *, ids: List[int], owner_id: int) -> Dict[int, str]:
+        if not ids:
+            return {}
+        result = await db.execute(
+            select(KnowledgeCard.id, KnowledgeCard.title)
+            .where(and_(KnowledgeCard.id.in_(ids), KnowledgeCard.owner_id == owner_id))
+        )
+        return dict(result.all())
 
 
 class NotebookCRUD:
@@ -105,6 +646,12 @@ class NotebookCRUD:
         result = await db.execute(select(Notebook).where(Notebook.id == id))
         return result.scalar_one_or_none()
     
+    async def get_version(self, db: AsyncSession, *, id: int) -> Optional[Any]:
+        result = await db.execute(
+            select(Notebook.id, Notebook.owner_id, Notebook.updated_at).where(Notebook.id == id)
+        )
+        return result.first()
+    
     async def get_multi(self, db: AsyncSession, *, owner_id: int) -> List[Notebook]:
         result = await db.execute(
             select(Notebook)
@@ -114,43 +661,56 @@ class NotebookCRUD:
         return result.scalars().all()
     
     async def create(self, db: AsyncSession, *, obj_in: NotebookCreate, owner_id: int) -> Notebook:
-        await db.execute(
+        result = await db.execute(
             update(Notebook)
             .where(and_(Notebook.owner_id == owner_id, Notebook.is_default == True))
             .values(is_default=False)
+            .returning(Notebook.id)
         )
+        track_changes(db, owner_id=owner_id, entity_type="notebook", ids=result.scalars().all())
         
         db_obj = Notebook(**obj_in.dict(), owner_id=owner_id)
         db.add(db_obj)
+        await db.flush()
+        track_changes(db, owner_id=owner_id, entity_type="notebook", ids=[db_obj.id])
         await db.commit()
         await db.refresh(db_obj)
         return db_obj
     
-    async def update(self, db: AsyncSession, *, db_obj: Notebook, obj_in: NotebookUpdate) -> Notebook:
-        update_data = obj_in.dict(exclude_unset=True)
+    async def update(self, db: AsyncSession, *, id: int, owner_id: int, obj_in: NotebookUpdate) -> Optional[Notebook]:
+        result = await db.scalars(
+            update(Notebook)
+            .where(owned_row(Notebook, id=id, owner_id=owner_id))
+            .values(**obj_in.dict(exclude_unset=True), updated_at=get_current_timestamp())
+            .returning(Notebook),
+            execution_options={"synchronize_session": False, "populate_existing": True}
+        )
+        notebook = result.one_or_none()
+        if notebook is None:
+            return None
         
+        track_changes(db, owner_id=owner_id, entity_type="notebook", ids=[id])
         if obj_in.is_default:
-            await db.execute(
+            result = await db.execute(
                 update(Notebook)
-                .where(and_(Notebook.owner_id == db_obj.owner_id, Notebook.is_default == True))
+                .where(and_(Notebook.owner_id == owner_id, Notebook.is_default == True, Notebook.id != id))
                 .values(is_default=False)
+                .returning(Notebook.id)
             )
-        
-        for field, value in update_data.items():
-            setattr(db_obj, field, value)
-        
-        db.add(db_obj)
+            track_changes(db, owner_id=owner_id, entity_type="notebook", ids=result.scalars().all())
         await db.commit()
-        await db.refresh(db_obj)
-        return db_obj
+        return notebook
     
     async def delete(self, db: AsyncSession, *, id: int, owner_id: int) -> bool:
-        notebook = await self.get_by_id(db, id=id)
-        if notebook and notebook.owner_id == owner_id:
-            await db.delete(notebook)
-            await db.commit()
-            return True
-        return False
+        result = await db.execute(
+            delete(Notebook).where(owned_row(Notebook, id=id, owner_id=owner_id)).returning(Notebook.id),
+            execution_options={"synchronize_session": False}
+        )
+        deleted = result.first() is not None
+        if deleted:
+            track_changes(db, owner_id=owner_id, entity_type="notebook", ids=[id], deleted=True)
+        await db.commit()
+        return deleted
     
     async def get_default(self, db: AsyncSession, *, owner_id: int) -> Optional[Notebook]:
         result = await db.execute(
@@ -161,7 +721,20 @@ class NotebookCRUD:
 
 
 class CardReferenceCRUD:
-    async def create(self, db: AsyncSession, *, card_id: int, referenced_card_id: int, reference_type: str = "related", description: Optional[str] = None) -> CardReference:
+    async def get_by_id(self, db: AsyncSession, *, id: int) -> Optional[CardReference]:
+        result = await db.execute(select(CardReference).where(CardReference.id == id))
+        return result.scalar_one_or_none()
+    
+    async def create(
+        self,
+        db: AsyncSession,
+        *,
+        card_id: int,
+        referenced_card_id: int,
+        owner_id: int,
+        reference_type: str = "related",
+        description: Optional[str] = None
+    ) -> CardReference:
         db_obj = CardReference(
             card_id=card_id,
             referenced_card_id=referenced_card_id,
@@ -169,22 +742,39 @@ class CardReferenceCRUD:
             description=description
         )
         db.add(db_obj)
+        await db.flush()
+        track_changes(db, owner_id=owner_id, entity_type="reference", ids=[db_obj.id])
         await db.commit()
         await db.refresh(db_obj)
+        reference_graph_cache.invalidate(owner_id)
         return db_obj
     
     async def get_by_card_id(self, db: AsyncSession, *, card_id: int) -> List[CardReference]:
         result = await db.execute(select(CardReference).where(CardReference.card_id == card_id))
         return result.scalars().all()
     
-    async def delete(self, db: AsyncSession, *, id: int) -> bool:
-        reference = await db.execute(select(CardReference).where(CardReference.id == id))
-        ref_obj = reference.scalar_one_or_none()
-        if ref_obj:
-            await db.delete(ref_obj)
-            await db.commit()
-            return True
-        return False
+    async def get_backlinks(self, db: AsyncSession, *, card_id: int) -> List[CardReference]:
+        result = await db.execute(select(CardReference).where(CardReference.referenced_card_id == card_id))
+        return result.scalars().all()
+    
+    async def delete(self, db: AsyncSession, *, id: int, owner_id: int) -> bool:
+        result = await db.execute(
+            delete(CardReference)
+            .where(
+                and_(
+                    CardReference.id == id,
+                    CardReference.card_id.in_(select(KnowledgeCard.id).where(KnowledgeCard.owner_id == owner_id))
+                )
+            )
+            .returning(CardReference.id)
+        )
+        deleted = result.first() is not None
+        if deleted:
+            track_changes(db, owner_id=owner_id, entity_type="reference", ids=[id], deleted=True)
+        await db.commit()
+        if deleted:
+            reference_graph_cache.invalidate(owner_id)
+        return deleted
 
 
 knowledge_card_crud = KnowledgeCardCRUD()
@@ -1,10 +1,28 @@
-from typing import List, Optional, Any
+from datetime import datetime
+from typing import Dict, List, Optional, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, case
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, and_, or_, update, insert, delete
 from app.models.media import MediaItem, MediaCollection
 from app.schemas.media import MediaItemCreate, MediaItemUpdate, MediaCollectionCreate, MediaCollectionUpdate
-from app.core.utils import normalize_tags, paginate_results
+from app.core.database import owned_row
+from app.core.pagination import Cursor, paginate, summary_projection
+from app.core.utils import normalize_tags, get_current_timestamp
+from app.crud.sync import track_changes
+from app.crud.tag import tag_crud
+from app.crud.stats import MEDIA_STAT_FIELDS, stats_crud, new_deltas, add_media_deltas, stat_values
+from app.services.dedup import MEDIA_DEDUP_FIELDS, media_duplicates
+
+
+def media_item_values(data: Dict[str, Any]) -> Dict[str, Any]:
+    if "metadata" in data:
+        data["meta_data"] = data.pop("metadata") or {}
+    return data
+
+# Columns the list views render; description, content, notes and metadata stay unread.
+MEDIA_ITEM_SUMMARY_FIELDS = (
+    "id", "title", "media_type", "original_title", "rating", "personal_rating", "status", "progress",
+    "poster_url", "tags", "category", "owner_id", "created_at", "updated_at", "last_accessed",
+)
 
 
 class MediaItemCRUD:
@@ -12,6 +30,12 @@ class MediaItemCRUD:
         result = await db.execute(select(MediaItem).where(MediaItem.id == id))
         return result.scalar_one_or_none()
     
+    async def get_version(self, db: AsyncSession, *, id: int) -> Optional[Any]:
+        result = await db.execute(
+            select(MediaItem.id, MediaItem.owner_id, MediaItem.updated_at).where(MediaItem.id == id)
+        )
+        return result.first()
+    
     async def get_multi(
         self, 
         db: AsyncSession, 
@@ -23,9 +47,14 @@ class MediaItemCRUD:
         status: Optional[str] = None,
         category: Optional[str] = None,
         tags: Optional[str] = None,
-        search: Optional[str] = None
+        match_all_tags: bool = True,
+        search: Optional[str] = None,
+        cursor: Optional[Cursor] = None,
+        summary: bool = False
     ) -> List[MediaItem]:
-        query = select(MediaItem).where(MediaItem.owner_id == owner_id)
+        query = summary_projection(select(MediaItem), MediaItem, MEDIA_ITEM_SUMMARY_FIELDS, summary).where(
+            MediaItem.owner_id == owner_id
+        )
         
         if media_type:
             query = query.where(MediaItem.media_type == media_type)
@@ -36,10 +65,12 @@ class MediaItemCRUD:
         if category:
             query = query.where(MediaItem.category == category)
         
-        if tags:
-            normalized_tags = normalize_tags(tags)
-            for tag in normalized_tags:
-                query = query.where(MediaItem.tags.like(f"%{tag}%"))
+        if normalize_tags(tags or ""):
+            query = query.where(
+                MediaItem.id.in_(
+                    tag_crud.tagged_media_ids(owner_id=owner_id, tags=tags, match_all=match_all_tags)
+                )
+            )
         
         if search:
             search_term = f"%{search}%"
@@ -52,84 +83,220 @@ class MediaItemCRUD:
                 )
             )
         
-        query = query.offset(skip).limit(limit).order_by(MediaItem.updated_at.desc())
+        query, reverse = paginate(query, MediaItem, cursor=cursor, skip=skip, limit=limit)
         result = await db.execute(query)
-        return result.scalars().all()
+        items = result.scalars().all()
+        return items[::-1] if reverse else items
     
     async def create(self, db: AsyncSession, *, obj_in: MediaItemCreate, owner_id: int) -> MediaItem:
-        db_obj = MediaItem(**obj_in.dict(), owner_id=owner_id)
+        db_obj = MediaItem(**media_item_values(obj_in.dict()), owner_id=owner_id)
         db.add(db_obj)
+        await db.flush()
+        await tag_crud.set_media_tags(db, owner_id=owner_id, tags_by_item={db_obj.id: db_obj.tags})
+        await stats_crud.apply(
+            db, owner_id=owner_id, deltas=add_media_deltas(new_deltas(), stat_values(db_obj, MEDIA_STAT_FIELDS))
+        )
+        track_changes(db, owner_id=owner_id, entity_type="media", ids=[db_obj.id])
         await db.commit()
+        media_duplicates.upsert(owner_id, [db_obj])
         await db.refresh(db_obj)
         return db_obj
     
-    async def update(self, db: AsyncSession, *, db_obj: MediaItem, obj_in: MediaItemUpdate) -> MediaItem:
-        update_data = obj_in.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_obj, field, value)
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        id: int,
+        owner_id: int,
+        obj_in: MediaItemUpdate,
+        updated_at: Optional[datetime] = None
+    ) -> Optional[MediaItem]:
+        update_data = media_item_values(obj_in.dict(exclude_unset=True))
+        owned = owned_row(MediaItem, id=id, owner_id=owner_id, updated_at=updated_at)
+        previous = None
+        # RETURNING only sees the new row, so old stat fields are read (and locked) first, only when they can change.
+        if update_data.keys() & set(MEDIA_STAT_FIELDS):
+            result = await db.execute(
+                select(*(getattr(MediaItem, field) for field in MEDIA_STAT_FIELDS)).where(owned).with_for_update()
+            )
+            previous = result.first()
+            if previous is None:
+                return None
+        result = await db.scalars(
+            update(MediaItem)
+            .where(owned)
+            .values(**update_data, updated_at=get_current_timestamp())
+            .returning(MediaItem),
+            execution_options={"synchronize_session": False, "populate_existing": True}
+        )
+        item = result.one_or_none()
+        if item is None:
+            return None
         
-        db.add(db_obj)
+        if "tags" in update_data:
+            await tag_crud.set_media_tags(db, owner_id=owner_id, tags_by_item={item.id: item.tags})
+        if previous is not None:
+            deltas = add_media_deltas(new_deltas(), stat_values(previous, MEDIA_STAT_FIELDS), -1)
+            await stats_crud.apply(db, owner_id=owner_id, deltas=add_media_deltas(deltas, stat_values(item, MEDIA_STAT_FIELDS)))
+        track_changes(db, owner_id=owner_id, entity_type="media", ids=[item.id])
         await db.commit()
-        await db.refresh(db_obj)
-        return db_obj
+        if update_data.keys() & set(MEDIA_DEDUP_FIELDS):
+            media_duplicates.upsert(owner_id, [item])
+        return item
     
-    async def delete(self, db: AsyncSession, *, id: int, owner_id: int) -> bool:
-        media = await self.get_by_id(db, id=id)
-        if media and media.owner_id == owner_id:
-            await db.delete(media)
-            await db.commit()
-            return True
-        return False
-    
-    async def get_by_status(self, db: AsyncSession, *, owner_id: int, status: str) -> List[MediaItem]:
+    async def delete(self, db: AsyncSession, *, id: int, owner_id: int, updated_at: Optional[datetime] = None) -> bool:
+        owned = owned_row(MediaItem, id=id, owner_id=owner_id, updated_at=updated_at)
+        # Tag links go first for the foreign key, scoped through the same owner/version filter.
+        await tag_crud.clear_media_tags(db, media_item_ids=[select(MediaItem.id).where(owned).scalar_subquery()])
+        result = await db.execute(
+            delete(MediaItem)
+            .where(owned)
+            .returning(*(getattr(MediaItem, field) for field in MEDIA_STAT_FIELDS)),
+            execution_options={"synchronize_session": False}
+        )
+        deleted = result.first()
+        if deleted is None:
+            return False
+        await stats_crud.apply(
+            db, owner_id=owner_id, deltas=add_media_deltas(new_deltas(), stat_values(deleted, MEDIA_STAT_FIELDS), -1)
+        )
+        track_changes(db, owner_id=owner_id, entity_type="media", ids=[id], deleted=True)
+        await db.commit()
+        media_duplicates.remove(owner_id, [id])
+        return True
+    
+    async def create_many(self, db: AsyncSession, *, objs_in: List[MediaItemCreate], owner_id: int) -> List[MediaItem]:
+        if not objs_in:
+            return []
+        now = get_current_timestamp()
+        rows = [
+            {**media_item_values(obj_in.dict()), "owner_id": owner_id, "created_at": now, "updated_at": now}
+            for obj_in in objs_in
+        ]
+        result = await db.scalars(insert(MediaItem).returning(MediaItem, sort_by_parameter_order=True), rows)
+        items = result.all()
+        await tag_crud.set_media_tags(db, owner_id=owner_id, tags_by_item={item.id: item.tags for item in items})
+        deltas = new_deltas()
+        for item in items:
+            add_media_deltas(deltas, stat_values(item, MEDIA_STAT_FIELDS))
+        await stats_crud.apply(db, owner_id=owner_id, deltas=deltas)
+        track_changes(db, owner_id=owner_id, entity_type="media", ids=[item.id for item in items])
+        await db.commit()
+        media_duplicates.upsert(owner_id, items)
+        return items
+    
+    async def get_owned_ids(self, db: AsyncSession, *, ids: List[int], owner_id: int) -> List[int]:
+        result = await db.execute(
+            select(MediaItem.id).where(and_(MediaItem.id.in_(ids), MediaItem.owner_id == owner_id))
+        )
+        return result.scalars().all()
+    
+    async def update_many(
+        self, db: AsyncSession, *, updates: Dict[int, MediaItemUpdate], owner_id: int
+    ) -> List[MediaItem]:
+        if not updates:
+            return []
+        now = get_current_timestamp()
+        update_data = {id: media_item_values(obj_in.dict(exclude_unset=True)) for id, obj_in in updates.items()}
+        stat_ids = [id for id, data in update_data.items() if data.keys() & set(MEDIA_STAT_FIELDS)]
+        previous = {}
+        if stat_ids:
+            result = await db.execute(
+                select(MediaItem.id, *(getattr(MediaItem, field) for field in MEDIA_STAT_FIELDS))
+                .where(and_(MediaItem.id.in_(stat_ids), MediaItem.owner_id == owner_id))
+                .with_for_update()
+            )
+            previous = {row.id: stat_values(row, MEDIA_STAT_FIELDS) for row in result}
+        await db.execute(
+            update(MediaItem).where(MediaItem.owner_id == owner_id),
+            [{**data, "id": id, "updated_at": now} for id, data in update_data.items()],
+            execution_options={"synchronize_session": False}
+        )
+        tags_by_item = {id: data["tags"] for id, data in update_data.items() if "tags" in data}
+        await tag_crud.set_media_tags(db, owner_id=owner_id, tags_by_item=tags_by_item)
+        deltas = new_deltas()
+        for id, values in previous.items():
+            add_media_deltas(deltas, values, -1)
+            add_media_deltas(deltas, {**values, **update_data[id]})
+        await stats_crud.apply(db, owner_id=owner_id, deltas=deltas)
+        track_changes(db, owner_id=owner_id, entity_type="media", ids=update_data.keys())
+        await db.commit()
+        
         result = await db.execute(
             select(MediaItem)
+            .where(MediaItem.id.in_(updates.keys()))
+            .execution_options(populate_existing=True)
+        )
+        items = {item.id: item for item in result.scalars().all()}
+        media_duplicates.upsert(
+            owner_id, [items[id] for id, data in update_data.items() if id in items and data.keys() & set(MEDIA_DEDUP_FIELDS)]
+        )
+        return [items[id] for id in updates if id in items]
+    
+    async def delete_many(self, db: AsyncSession, *, ids: List[int], owner_id: int) -> List[int]:
+        owned_ids = await self.get_owned_ids(db, ids=ids, owner_id=owner_id)
+        if not owned_ids:
+            return []
+        await tag_crud.clear_media_tags(db, media_item_ids=owned_ids)
+        result = await db.execute(
+            delete(MediaItem)
+            .where(and_(MediaItem.id.in_(owned_ids), MediaItem.owner_id == owner_id))
+            .returning(MediaItem.id, *(getattr(MediaItem, field) for field in MEDIA_STAT_FIELDS)),
+            execution_options={"synchronize_session": False}
+        )
+        deleted = result.all()
+        deltas = new_deltas()
+        for row in deleted:
+            add_media_deltas(deltas, stat_values(row, MEDIA_STAT_FIELDS), -1)
+        await stats_crud.apply(db, owner_id=owner_id, deltas=deltas)
+        deleted_ids = [row.id for row in deleted]
+        track_changes(db, owner_id=owner_id, entity_type="media", ids=deleted_ids, deleted=True)
+        await db.commit()
+        media_duplicates.remove(owner_id, deleted_ids)
+        return deleted_ids
+    
+    async def get_by_status(
+        self, db: AsyncSession, *, owner_id: int, status: str, summary: bool = False
+    ) -> List[MediaItem]:
+        result = await db.execute(
+            summary_projection(select(MediaItem), MediaItem, MEDIA_ITEM_SUMMARY_FIELDS, summary)
             .where(and_(MediaItem.owner_id == owner_id, MediaItem.status == status))
-            .order_by(MediaItem.updated_at.desc())
+            .order_by(MediaItem.updated_at.desc(), MediaItem.id.desc())
         )
         return result.scalars().all()
     
-    async def get_by_type(self, db: AsyncSession, *, owner_id: int, media_type: str) -> List[MediaItem]:
+    async def get_by_type(
+        self, db: AsyncSession, *, owner_id: int, media_type: str, summary: bool = False
+    ) -> List[MediaItem]:
         result = await db.execute(
-            select(MediaItem)
+            summary_projection(select(MediaItem), MediaItem, MEDIA_ITEM_SUMMARY_FIELDS, summary)
             .where(and_(MediaItem.owner_id == owner_id, MediaItem.media_type == media_type))
-            .order_by(MediaItem.updated_at.desc())
+            .order_by(MediaItem.updated_at.desc(), MediaItem.id.desc())
         )
         return result.scalars().all()
     
-    async def get_recent(self, db: AsyncSession, *, owner_id: int, limit: int = 10) -> List[MediaItem]:
+    async def get_recent(
+        self, db: AsyncSession, *, owner_id: int, limit: int = 10, summary: bool = False
+    ) -> List[MediaItem]:
         result = await db.execute(
-            select(MediaItem)
+            summary_projection(select(MediaItem), MediaItem, MEDIA_ITEM_SUMMARY_FIELDS, summary)
             .where(MediaItem.owner_id == owner_id)
-            .order_by(MediaItem.updated_at.desc())
+            .order_by(MediaItem.updated_at.desc(), MediaItem.id.desc())
             .limit(limit)
         )
         return result.scalars().all()
     
     async def get_statistics(self, db: AsyncSession, *, owner_id: int) -> dict:
+        return await stats_crud.get_media_statistics(db, owner_id=owner_id)
+    
+    async def get_titles(self, db: AsyncSession, *, ids: List[int], owner_id: int) -> Dict[int, str]:
+        if not ids:
+            return {}
         result = await db.execute(
-            select(
-                func.count(MediaItem.id).label('total'),
-                func.count(case((MediaItem.status == "completed", 1))).label('completed'),
-                func.count(case((MediaItem.status == "reading", 1))).label('reading'),
-                func.count(case((MediaItem.status == "want_to_read", 1))).label('want_to_read'),
-                func.count(case((MediaItem.media_type == "book", 1))).label('books'),
-                func.count(case((MediaItem.media_type == "movie", 1))).label('movies'),
-                func.count(case((MediaItem.media_type == "tv", 1))).label('tv_shows'),
-                func.count(case((MediaItem.media_type == "podcast", 1))).label('podcasts')
-            ).where(MediaItem.owner_id == owner_id)
-        )
-        stats = result.fetchone()
-        return {
-            "total": stats.total,
-            "completed": stats.completed,
-            "reading": stats.reading,
-            "want_to_read": stats.want_to_read,
-            "books": stats.books,
-            "movies": stats.movies,
-            "tv_shows": stats.tv_shows,
-            "podcasts": stats.podcasts
-        }
+            select(MediaItem.id, MediaItem.title)
+            .where(and_(MediaItem.id.in_(ids), MediaItem.owner_id == owner_id))
+        )
+        return dict(result.all())
 
 
 class MediaCollectionCRUD:
@@ -137,6 +304,13 @@ class MediaCollectionCRUD:
         result = await db.execute(select(MediaCollection).where(MediaCollection.id == id))
         return result.scalar_one_or_none()
     
+    async def get_version(self, db: AsyncSession, *, id: int) -> Optional[Any]:
+        result = await db.execute(
+            select(MediaCollection.id, MediaCollection.owner_id, MediaCollection.updated_at)
+            .where(MediaCollection.id == id)
+        )
+        return result.first()
+    
     async def get_multi(self, db: AsyncSession, *, owner_id: int) -> List[MediaCollection]:
         result = await db.execute(
             select(MediaCollection)
@@ -148,27 +322,40 @@ class MediaCollectionCRUD:
     async def create(self, db: AsyncSession, *, obj_in: MediaCollectionCreate, owner_id: int) -> MediaCollection:
         db_obj = MediaCollection(**obj_in.dict(), owner_id=owner_id)
         db.add(db_obj)
+        await db.flush()
+        track_changes(db, owner_id=owner_id, entity_type="collection", ids=[db_obj.id])
         await db.commit()
         await db.refresh(db_obj)
         return db_obj
     
-    async def update(self, db: AsyncSession, *, db_obj: MediaCollection, obj_in: MediaCollectionUpdate) -> MediaCollection:
-        update_data = obj_in.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_obj, field, value)
-        
-        db.add(db_obj)
+    async def update(
+        self, db: AsyncSession, *, id: int, owner_id: int, obj_in: MediaCollectionUpdate
+    ) -> Optional[MediaCollection]:
+        result = await db.scalars(
+            update(MediaCollection)
+            .where(owned_row(MediaCollection, id=id, owner_id=owner_id))
+            .values(**obj_in.dict(exclude_unset=True), updated_at=get_current_timestamp())
+            .returning(MediaCollection),
+            execution_options={"synchronize_session": False, "populate_existing": True}
+        )
+        collection = result.one_or_none()
+        if collection is not None:
+            track_changes(db, owner_id=owner_id, entity_type="collection", ids=[id])
         await db.commit()
-        await db.refresh(db_obj)
-        return db_obj
+        return collection
     
     async def delete(self, db: AsyncSession, *, id: int, owner_id: int) -> bool:
-        collection = await self.get_by_id(db, id=id)
-        if collection and collection.owner_id == owner_id:
-            await db.delete(collection)
-            await db.commit()
-            return True
-        return False
+        result = await db.execute(
+            delete(MediaCollection)
+            .where(owned_row(MediaCollection, id=id, owner_id=owner_id))
+            .returning(MediaCollection.id),
+            execution_options={"synchronize_session": False}
+        )
+        deleted = result.first() is not None
+        if deleted:
+            track_changes(db, owner_id=owner_id, entity_type="collection", ids=[id], deleted=True)
+        await db.commit()
+        return deleted
     
     async def get_default(self, db: AsyncSession, *, owner_id: int) -> Optional[MediaCollection]:
         result = await db.execute(
@@ -0,0 +1,177 @@
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, and_
+from app.core.database import dialect_insert
+from app.core.utils import get_current_timestamp
+from app.models.card import KnowledgeCard
+from app.models.media import MediaItem
+from app.models.stats import UserStatCounter
+
+MEDIA_STAT_FIELDS = ("status", "media_type", "rating", "personal_rating", "progress")
+CARD_STAT_FIELDS = ("status", "category")
+MEDIA_SCOPES = ("media", "media_status", "media_type")
+CARD_SCOPES = ("card", "card_status", "card_category")
+COUNTER_FIELDS = (
+    "count",
+    "rating_count",
+    "rating_sum",
+    "personal_rating_count",
+    "personal_rating_sum",
+    "progress_sum",
+)
+
+# (scope, key) -> counter field -> delta
+CounterDeltas = Dict[Tuple[str, str], Dict[str, float]]
+
+
+def stat_values(obj: Any, fields: Iterable[str]) -> Dict[str, Any]:
+    return {field: getattr(obj, field) for field in fields}
+
+
+def new_deltas() -> CounterDeltas:
+    return defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+
+
+def add_media_deltas(deltas: CounterDeltas, values: Mapping[str, Any], sign: int = 1) -> CounterDeltas:
+    rating, personal_rating = values.get("rating"), values.get("personal_rating")
+    for key in (("media", ""), ("media_status", values["status"]), ("media_type", values["media_type"])):
+        counter = deltas[key]
+        counter["count"] += sign
+        counter["progress_sum"] += sign * (values.get("progress") or 0.0)
+        if rating is not None:
+            counter["rating_count"] += sign
+            counter["rating_sum"] += sign * rating
+        if personal_rating is not None:
+            counter["personal_rating_count"] += sign
+            counter["personal_rating_sum"] += sign * personal_rating
+    return deltas
+
+
+def add_card_deltas(deltas: CounterDeltas, values: Mapping[str, Any], sign: int = 1) -> CounterDeltas:
+    for key in (("card", ""), ("card_status", values["status"]), ("card_category", values["category"] or "")):
+        deltas[key]["count"] += sign
+    return deltas
+
+
+def _average(total: float, count: int) -> Optional[float]:
+    return round(total / count, 2) if count else None
+
+
+class StatsCRUD:
+    async def apply(self, db: AsyncSession, *, owner_id: int, deltas: CounterDeltas) -> None:
+        now = get_current_timestamp()
+        rows = [
+            {"owner_id": owner_id, "scope": scope, "key": key, "updated_at": now, **counter}
+            for (scope, key), counter in deltas.items()
+            if any(counter.values())
+        ]
+        if not rows:
+            return
+        
+        stmt = dialect_insert(db.get_bind().dialect.name, UserStatCounter)
+        columns = UserStatCounter.__table__.c
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[columns.owner_id, columns.scope, columns.key],
+            set_={
+                **{field: columns[field] + stmt.excluded[field] for field in COUNTER_FIELDS},
+                "updated_at": stmt.excluded.updated_at,
+            }
+        )
+        await db.execute(stmt, rows)
+    
+    async def get_counters(
+        self, db: AsyncSession, *, owner_id: int, scopes: Iterable[str]
+    ) -> List[UserStatCounter]:
+        result = await db.execute(
+            select(UserStatCounter).where(
+                and_(UserStatCounter.owner_id == owner_id, UserStatCounter.scope.in_(scopes))
+            )
+        )
+        return result.scalars().all()
+    
+    async def get_media_statistics(self, db: AsyncSession, *, owner_id: int) -> dict:
+        counters = await self.get_counters(db, owner_id=owner_id, scopes=MEDIA_SCOPES)
+        total = next((c for c in counters if c.scope == "media"), UserStatCounter(owner_id=owner_id, scope="media"))
+        by_status = {c.key: c.count for c in counters if c.scope == "media_status" and c.count}
+        by_type = {c.key: c.count for c in counters if c.scope == "media_type" and c.count}
+        return {
+            "total": total.count,
+            "completed": by_status.get("completed", 0),
+            "reading": by_status.get("reading", 0),
+            "want_to_read": by_status.get("want_to_read", 0),
+            "books": by_type.get("book", 0),
+            "movies": by_type.get("movie", 0),
+            "tv_shows": by_type.get("tv", 0),
+            "podcasts": by_type.get("podcast", 0),
+            "by_status": by_status,
+            "by_type": by_type,
+            "average_rating": _average(total.rating_sum, total.rating_count),
+            "average_personal_rating": _average(total.personal_rating_sum, total.personal_rating_count),
+            "progress_sum": round(total.progress_sum, 2),
+        }
+    
+    async def get_card_statistics(self, db: AsyncSession, *, owner_id: int) -> dict:
+        counters = await self.get_counters(db, owner_id=owner_id, scopes=CARD_SCOPES)
+        return {
+            "total": sum(c.count for c in counters if c.scope == "card"),
+            "by_status": {c.key: c.count for c in counters if c.scope == "card_status" and c.count},
+            "by_category": {c.key: c.count for c in counters if c.scope == "card_category" and c.count},
+        }
+    
+    async def reconcile(self, db: AsyncSession, *, owner_id: int) -> None:
+        # Locked before aggregating, or a write committing in between would be lost from both
+        # sides. FOR UPDATE also pins the session to the writer (the write lock on SQLite).
+        result = await db.execute(
+            select(
+                UserStatCounter.scope,
+                UserStatCounter.key,
+                *(getattr(UserStatCounter, field) for field in COUNTER_FIELDS)
+            )
+            .where(UserStatCounter.owner_id == owner_id)
+            .with_for_update()
+        )
+        current = result.all()
+        deltas = new_deltas()
+        media_groups = await db.execute(
+            select(
+                MediaItem.status,
+                MediaItem.media_type,
+                func.count(),
+                func.count(MediaItem.rating),
+                func.coalesce(func.sum(MediaItem.rating), 0.0),
+                func.count(MediaItem.personal_rating),
+                func.coalesce(func.sum(MediaItem.personal_rating), 0.0),
+                func.coalesce(func.sum(MediaItem.progress), 0.0),
+            )
+            .where(MediaItem.owner_id == owner_id)
+            .group_by(MediaItem.status, MediaItem.media_type)
+        )
+        for status, media_type, *totals in media_groups:
+            for key in (("media", ""), ("media_status", status), ("media_type", media_type)):
+                for field, value in zip(COUNTER_FIELDS, totals):
+                    deltas[key][field] += value
+        
+        card_groups = await db.execute(
+            select(KnowledgeCard.status, KnowledgeCard.category, func.count())
+            .where(KnowledgeCard.owner_id == owner_id)
+            .group_by(KnowledgeCard.status, KnowledgeCard.category)
+        )
+        for status, category, count in card_groups:
+            add_card_deltas(deltas, {"status": status, "category": category}, count)
+        
+        # Only the drift is written, as deltas, so counter rows are never replaced wholesale.
+        for scope, key, *values in current:
+            for field, value in zip(COUNTER_FIELDS, values):
+                deltas[(scope, key)][field] -= value
+        await self.apply(db, owner_id=owner_id, deltas=deltas)
+        await db.commit()
+    
+    async def get_owner_ids(self, db: AsyncSession, *, after_id: int = 0, limit: int = 1000) -> List[int]:
+        owned = select(KnowledgeCard.owner_id).union(select(MediaItem.owner_id), select(UserStatCounter.owner_id))
+        owner_id = owned.subquery().c.owner_id
+        result = await db.execute(select(owner_id).where(owner_id > after_id).order_by(owner_id).limit(limit))
+        return result.scalars().all()
+
+
+stats_crud = StatsCRUD()
@@ -0,0 +1,125 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple
+from sqlalchemy import event, select, delete, update, func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.database import dialect_insert
+from app.core.events import event_hub
+from app.core.utils import get_current_timestamp
+from app.models.sync import SyncChange, SyncCounter
+
+SYNC_ENTITY_TYPES = ("notebook", "card", "reference", "collection", "media")
+PENDING_CHANGES_KEY = "sync_changes"
+RECORDED_CHANGES_KEY = "sync_recorded"
+
+# (entity type, entity id) -> deleted
+PendingChanges = Dict[Tuple[str, int], bool]
+
+
+def track_changes(db: AsyncSession, *, owner_id: int, entity_type: str, ids: Iterable[int], deleted: bool = False) -> None:
+    # Collected on the session and written once, just before the commit that makes them visible.
+    changes = db.info.setdefault(PENDING_CHANGES_KEY, {}).setdefault(owner_id, {})
+    for id in ids:
+        changes[(entity_type, id)] = deleted
+
+
+def _record_pending(session: Session) -> None:
+    pending: Dict[int, PendingChanges] = session.info.pop(PENDING_CHANGES_KEY, None)
+    if not pending:
+        return
+    dialect = session.get_bind(clause=SyncCounter.__table__.insert()).dialect.name
+    now = get_current_timestamp()
+    recorded = session.info.setdefault(RECORDED_CHANGES_KEY, {})
+    for owner_id, changes in pending.items():
+        # The counter row stays locked until commit, so one owner's sequence
+        # numbers become visible in the order they were handed out.
+        stmt = dialect_insert(dialect, SyncCounter).values(owner_id=owner_id, seq=len(changes), compacted_seq=0)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SyncCounter.owner_id],
+            set_={"seq": SyncCounter.__table__.c.seq + len(changes)}
+        ).returning(SyncCounter.seq)
+        last_seq = session.execute(stmt).scalar_one()
+        rows = [
+            {
+                "owner_id": owner_id,
+                "entity_type": entity_type,
+                "entity_id": entity_id,
+                "seq": seq,
+                "deleted": deleted,
+                "changed_at": now,
+            }
+            for seq, ((entity_type, entity_id), deleted) in enumerate(changes.items(), start=last_seq - len(changes) + 1)
+        ]
+        upsert = dialect_insert(dialect, SyncChange)
+        columns = SyncChange.__table__.c
+        session.execute(
+            upsert.on_conflict_do_update(
+                index_elements=[columns.owner_id, columns.entity_type, columns.entity_id],
+                set_={field: upsert.excluded[field] for field in ("seq", "deleted", "changed_at")}
+            ),
+            rows
+        )
+        recorded[owner_id] = [
+            {
+                "event": "change",
+                "entity": row["entity_type"],
+                "id": row["entity_id"],
+                "version": row["seq"],
+                "deleted": row["deleted"],
+            }
+            for row in rows
+        ]
+
+
+def _publish_recorded(session: Session) -> None:
+    for owner_id, events in session.info.pop(RECORDED_CHANGES_KEY, {}).items():
+        event_hub.publish(owner_id, events)
+
+
+def _discard_pending(session: Session, previous_transaction: Any) -> None:
+    session.info.pop(PENDING_CHANGES_KEY, None)
+    session.info.pop(RECORDED_CHANGES_KEY, None)
+
+
+event.listen(Session, "before_commit", _record_pending)
+event.listen(Session, "after_commit", _publish_recorded)
+event.listen(Session, "after_soft_rollback", _discard_pending)
+
+
+class SyncCRUD:
+    async def get_counter(self, db: AsyncSession, *, owner_id: int) -> Tuple[int, int]:
+        result = await db.execute(
+            select(SyncCounter.seq, SyncCounter.compacted_seq).where(SyncCounter.owner_id == owner_id)
+        )
+        row = result.first()
+        return (row.seq, row.compacted_seq) if row else (0, 0)
+    
+    async def get_changes(
+        self, db: AsyncSession, *, owner_id: int, since: int, limit: int
+    ) -> List[SyncChange]:
+        result = await db.execute(
+            select(SyncChange.entity_type, SyncChange.entity_id, SyncChange.seq, SyncChange.deleted)
+            .where(and_(SyncChange.owner_id == owner_id, SyncChange.seq > since))
+            .order_by(SyncChange.seq)
+            .limit(limit)
+        )
+        return result.all()
+    
+    async def compact(self, db: AsyncSession, *, before: datetime) -> int:
+        expired = and_(SyncChange.deleted == True, SyncChange.changed_at < before)
+        result = await db.execute(
+            select(SyncChange.owner_id, func.max(SyncChange.seq)).where(expired).group_by(SyncChange.owner_id)
+        )
+        floors = result.all()
+        for owner_id, seq in floors:
+            await db.execute(
+                update(SyncCounter)
+                .where(and_(SyncCounter.owner_id == owner_id, SyncCounter.compacted_seq < seq))
+                .values(compacted_seq=seq)
+            )
+        result = await db.execute(delete(SyncChange).where(expired), execution_options={"synchronize_session": False})
+        await db.commit()
+        return result.rowcount
+
+
+sync_crud = SyncCRUD()
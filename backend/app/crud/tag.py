@@ -0,0 +1,116 @@
+from typing import Any, Dict, Iterable, List, Optional, Set, Type
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, insert, func, and_
+from sqlalchemy.sql import Select
+from sqlmodel import SQLModel
+from app.core.database import dialect_insert
+from app.core.utils import normalize_tags
+from app.models.tag import Tag, CardTag, MediaItemTag
+
+TAG_NAME_MAX_LENGTH = 100
+
+
+def parse_tags(tags: Optional[str]) -> List[str]:
+    if not tags:
+        return []
+    names = []
+    for name in normalize_tags(tags):
+        name = name[:TAG_NAME_MAX_LENGTH]
+        if name not in names:
+            names.append(name)
+    return names
+
+
+class TagCRUD:
+    async def get_or_create_ids(self, db: AsyncSession, *, owner_id: int, names: Iterable[str]) -> Dict[str, int]:
+        names = set(names)
+        if not names:
+            return {}
+        
+        query = select(Tag.name, Tag.id).where(and_(Tag.owner_id == owner_id, Tag.name.in_(names)))
+        tag_ids = dict((await db.execute(query)).all())
+        missing = names - tag_ids.keys()
+        if missing:
+            await db.execute(
+                dialect_insert(db.get_bind().dialect.name, Tag)
+                .values([{"owner_id": owner_id, "name": name} for name in sorted(missing)])
+                .on_conflict_do_nothing()
+            )
+            query = select(Tag.name, Tag.id).where(and_(Tag.owner_id == owner_id, Tag.name.in_(missing)))
+            tag_ids.update((await db.execute(query)).all())
+        return tag_ids
+    
+    async def _set_links(
+        self,
+        db: AsyncSession,
+        link_model: Type[SQLModel],
+        entity_key: str,
+        *,
+        owner_id: int,
+        tags_by_entity: Dict[int, Optional[str]]
+    ) -> None:
+        if not tags_by_entity:
+            return
+        entity_column = getattr(link_model, entity_key)
+        await db.execute(delete(link_model).where(entity_column.in_(tags_by_entity.keys())))
+        
+        names_by_entity = {entity_id: parse_tags(tags) for entity_id, tags in tags_by_entity.items()}
+        all_names: Set[str] = set()
+        for names in names_by_entity.values():
+            all_names.update(names)
+        tag_ids = await self.get_or_create_ids(db, owner_id=owner_id, names=all_names)
+        
+        rows = [
+            {"tag_id": tag_ids[name], entity_key: entity_id}
+            for entity_id, names in names_by_entity.items()
+            for name in names
+        ]
+        if rows:
+            await db.execute(insert(link_model), rows)
+    
+    async def set_card_tags(self, db: AsyncSession, *, owner_id: int, tags_by_card: Dict[int, Optional[str]]) -> None:
+        await self._set_links(db, CardTag, "card_id", owner_id=owner_id, tags_by_entity=tags_by_card)
+    
+    async def set_media_tags(self, db: AsyncSession, *, owner_id: int, tags_by_item: Dict[int, Optional[str]]) -> None:
+        await self._set_links(db, MediaItemTag, "media_item_id", owner_id=owner_id, tags_by_entity=tags_by_item)
+    
+    async def clear_card_tags(self, db: AsyncSession, *, card_ids: Iterable[int]) -> None:
+        await db.execute(delete(CardTag).where(CardTag.card_id.in_(list(card_ids))))
+    
+    async def clear_media_tags(self, db: AsyncSession, *, media_item_ids: Iterable[int]) -> None:
+        await db.execute(delete(MediaItemTag).where(MediaItemTag.media_item_id.in_(list(media_item_ids))))
+    
+    def _tagged(self, entity_column: Any, link_model: Type[SQLModel], *, owner_id: int, tags: str, match_all: bool) -> Select:
+        names = parse_tags(tags)
+        query = (
+            select(entity_column)
+            .join(Tag, Tag.id == link_model.tag_id)
+            .where(and_(Tag.owner_id == owner_id, Tag.name.in_(names)))
+        )
+        if match_all:
+            return query.group_by(entity_column).having(func.count(link_model.tag_id) == len(names))
+        return query.distinct()
+    
+    def tagged_card_ids(self, *, owner_id: int, tags: str, match_all: bool = True) -> Select:
+        return self._tagged(CardTag.card_id, CardTag, owner_id=owner_id, tags=tags, match_all=match_all)
+    
+    def tagged_media_ids(self, *, owner_id: int, tags: str, match_all: bool = True) -> Select:
+        return self._tagged(MediaItemTag.media_item_id, MediaItemTag, owner_id=owner_id, tags=tags, match_all=match_all)
+    
+    async def get_counts(self, db: AsyncSession, *, owner_id: int) -> List[dict]:
+        counts: Dict[str, dict] = {}
+        for link_model, key in ((CardTag, "cards"), (MediaItemTag, "media")):
+            result = await db.execute(
+                select(Tag.name, func.count())
+                .select_from(Tag)
+                .join(link_model, link_model.tag_id == Tag.id)
+                .where(Tag.owner_id == owner_id)
+                .group_by(Tag.name)
+            )
+            for name, count in result.all():
+                counts.setdefault(name, {"name": name, "cards": 0, "media": 0})[key] = count
+        
+        return sorted(counts.values(), key=lambda tag: (-(tag["cards"] + tag["media"]), tag["name"]))
+
+
+tag_crud = TagCRUD()
@@ -2,7 +2,8 @@ from typing import List, Optional, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
-from app.core.security import get_password_hash, verify_password
+from app.core.cache import user_cache
+from app.core.security import hash_password, verify_and_update_password
 from app.models.user import User, UserProfile
 from app.schemas.user import UserCreate, UserUpdate, UserProfileCreate, UserProfileUpdate
 from app.core.utils import create_response
@@ -26,7 +27,7 @@ class UserCRUD:
             email=obj_in.email,
             username=obj_in.username,
             full_name=obj_in.full_name,
-            hashed_password=get_password_hash(obj_in.password),
+            hashed_password=await hash_password(obj_in.password),
             is_active=True,
             is_superuser=False
         )
@@ -36,12 +37,14 @@ class UserCRUD:
         return db_obj
     
     async def update(self, db: AsyncSession, *, db_obj: User, obj_in: UserUpdate) -> User:
+        previous_email = db_obj.email
         update_data = obj_in.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_obj, field, value)
         
         db.add(db_obj)
         await db.commit()
+        await user_cache.invalidate(previous_email, db_obj.email)
         await db.refresh(db_obj)
         return db_obj
     
@@ -49,8 +52,13 @@ class UserCRUD:
         user = await self.get_by_email(db, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        valid, new_hash = await verify_and_update_password(password, user.hashed_password)
+        if not valid:
             return None
+        if new_hash:
+            user.hashed_password = new_hash
+            db.add(user)
+            await db.commit()
         return user
     
     async def is_active(self, user: User) -> bool:
@@ -1,16 +1,38 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from sqlmodel import SQLModel
+from app.core.admission import AdmissionMiddleware, rate_limiter
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
 from app.core.database import engine
+from app.core.events import event_hub
+from app.core.instrumentation import QueryContextMiddleware
+from app.core.jobs import Worker, job_queue
+from app.core.migrations import check_schema, upgrade_schema
+from app.core.etag import ETAG_HEADER
+from app.core.pagination import NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER
+from app.api.duplicates import DUPLICATES_HEADER
 from app.api import api_router
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
+    if settings.SCHEMA_STARTUP_MODE == "migrate":
+        async with engine.begin() as conn:
+            await conn.run_sync(upgrade_schema)
+    elif settings.SCHEMA_STARTUP_MODE == "check":
+        async with engine.connect() as conn:
+            await conn.run_sync(check_schema)
+    
+    # Jobs registered by the imported services run here unless a separate worker takes them.
+    worker_task = None
+    if settings.JOB_WORKER_IN_PROCESS:
+        worker_task = asyncio.create_task(Worker(job_queue, concurrency=settings.JOB_WORKER_CONCURRENCY).run())
+    events_task = asyncio.create_task(event_hub.run())
     yield
+    events_task.cancel()
+    if worker_task:
+        worker_task.cancel()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -26,6 +48,26 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER, ETAG_HEADER, DUPLICATES_HEADER],
+    )
+
+if settings.QUERY_METRICS_ENABLED:
+    app.add_middleware(QueryContextMiddleware)
+
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
+# Added last so it runs first: rejected requests never reach routing or the pool.
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(
+        AdmissionMiddleware,
+        limiter=rate_limiter,
+        path_prefix=settings.API_V1_STR,
+        shed_wait_ms=settings.SHED_ALL_POOL_WAIT_MS,
     )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
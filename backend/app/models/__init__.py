@@ -1,6 +1,9 @@
 from .user import User, UserProfile
-from .card import KnowledgeCard, Notebook, CardReference
+from .card import KnowledgeCard, Notebook, CardReference, CardLink
 from .media import MediaItem, MediaCollection
+from .tag import Tag, CardTag, MediaItemTag
+from .stats import UserStatCounter
+from .sync import SyncCounter, SyncChange
 
 __all__ = [
     "User",
@@ -8,6 +11,13 @@ __all__ = [
     "KnowledgeCard",
     "Notebook", 
     "CardReference",
+    "CardLink",
     "MediaItem",
-    "MediaCollection"
+    "MediaCollection",
+    "Tag",
+    "CardTag",
+    "MediaItemTag",
+    "UserStatCounter",
+    "SyncCounter",
+    "SyncChange"
 ]
\ No newline at end of file
@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Optional, List
 from sqlmodel import SQLModel, Field, Column, Relationship
+from sqlalchemy import Index
 import sqlalchemy.dialects.postgresql as pg
 from app.models.user import User
 
@@ -19,25 +20,58 @@ class KnowledgeCard(SQLModel, table=True):
         sa_column=Column(pg.VARCHAR(1000), nullable=True)
     )
     category: Optional[str] = Field(
-        sa_column=Column(pg.VARCHAR(100), index=True, nullable=True)
+        sa_column=Column(pg.VARCHAR(100), nullable=True)
     )
     status: str = Field(default="active")
     priority: int = Field(default=0)
     is_favorite: bool = Field(default=False)
     is_public: bool = Field(default=False)
     
-    owner_id: int = Field(foreign_key="users.id", index=True)
+    owner_id: int = Field(foreign_key="users.id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     last_accessed: Optional[datetime] = None
     
     owner: Optional[User] = Relationship(back_populates="cards")
-    references: List["CardReference"] = Relationship(back_populates="card", foreign_keys="CardReference.card_id")
+    references: List["CardReference"] = Relationship(back_populates="card", sa_relationship_kwargs={"foreign_keys": "CardReference.card_id"})
     
     def __repr__(self) -> str:
         return f"<KnowledgeCard(id={self.id}, title='{self.title[:50]}...', owner_id={self.owner_id})>"
 
 
+# List queries are owner-scoped and keyset-ordered on (updated_at, id): one
+# (owner_id, <filter>, updated_at, id) index per filter. All-ascending columns let
+# the same index be walked backwards for newest-first pages and forwards for prev
+# cursors. The owner_id prefix stands in for a single-column owner index.
+Index(
+    "ix_knowledge_cards_owner_id_updated_at_id",
+    KnowledgeCard.owner_id,
+    KnowledgeCard.updated_at,
+    KnowledgeCard.id,
+)
+Index(
+    "ix_knowledge_cards_owner_id_status_updated_at_id",
+    KnowledgeCard.owner_id,
+    KnowledgeCard.status,
+    KnowledgeCard.updated_at,
+    KnowledgeCard.id,
+)
+Index(
+    "ix_knowledge_cards_owner_id_category_updated_at_id",
+    KnowledgeCard.owner_id,
+    KnowledgeCard.category,
+    KnowledgeCard.updated_at,
+    KnowledgeCard.id,
+)
+Index(
+    "ix_knowledge_cards_owner_id_is_favorite_updated_at_id",
+    KnowledgeCard.owner_id,
+    KnowledgeCard.is_favorite,
+    KnowledgeCard.updated_at,
+    KnowledgeCard.id,
+)
+
+
 class Notebook(SQLModel, table=True):
     __tablename__ = "notebooks"
     
@@ -53,23 +87,43 @@ class Notebook(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
-    cards: List[KnowledgeCard] = Relationship()
-    
     def __repr__(self) -> str:
         return f"<Notebook(id={self.id}, name='{self.name}', owner_id={self.owner_id})>"
 
 
 class CardReference(SQLModel, table=True):
     __tablename__ = "card_references"
+    # Composite indexes cover outgoing (card_id) and backlink (referenced_card_id)
+    # lookups without touching the table for the edge list.
+    __table_args__ = (
+        Index("ix_card_references_card_id_referenced_card_id", "card_id", "referenced_card_id"),
+        Index("ix_card_references_referenced_card_id_card_id", "referenced_card_id", "card_id"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
-    card_id: int = Field(foreign_key="knowledge_cards.id", index=True)
-    referenced_card_id: int = Field(foreign_key="knowledge_cards.id", index=True)
+    card_id: int = Field(foreign_key="knowledge_cards.id")
+    referenced_card_id: int = Field(foreign_key="knowledge_cards.id")
     reference_type: str = Field(default="related")
     description: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
-    card: Optional[KnowledgeCard] = Relationship(back_populates="references", foreign_keys="CardReference.card_id")
+    card: Optional[KnowledgeCard] = Relationship(back_populates="references", sa_relationship_kwargs={"foreign_keys": "CardReference.card_id"})
+    
+    def __repr__(self) -> str:
+        return f"<CardReference(id={self.id}, card_id={self.card_id}, referenced_card_id={self.referenced_card_id})>"
+
+class CardLink(SQLModel, table=True):
+    __tablename__ = "card_links"
+    # Every [[title]] in a card's content, resolved or not, so adding or renaming
+    # a card can find the links that now point at it.
+    __table_args__ = (
+        Index("ix_card_links_owner_id_title", "owner_id", "title"),
+    )
+    
+    card_id: int = Field(foreign_key="knowledge_cards.id", primary_key=True)
+    # Normalized as in app.services.wikilinks.normalize_title.
+    title: str = Field(primary_key=True)
+    owner_id: int = Field(foreign_key="users.id")
     
     def __repr__(self) -> str:
-        return f"<CardReference(id={self.id}, card_id={self.card_id}, referenced_card_id={self.referenced_card_id})>"
\ No newline at end of file
+        return f"<CardLink(card_id={self.card_id}, title='{self.title[:50]}')>"
\ No newline at end of file
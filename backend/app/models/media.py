@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from sqlmodel import SQLModel, Field, Column, Relationship
+from sqlalchemy import Index
 import sqlalchemy.dialects.postgresql as pg
 from app.models.user import User
 
@@ -34,10 +35,10 @@ class MediaItem(SQLModel, table=True):
         sa_column=Column(pg.VARCHAR(1000), nullable=True)
     )
     category: Optional[str] = Field(
-        sa_column=Column(pg.VARCHAR(100), index=True, nullable=True)
+        sa_column=Column(pg.VARCHAR(100), nullable=True)
     )
     
-    owner_id: int = Field(foreign_key="users.id", index=True)
+    owner_id: int = Field(foreign_key="users.id")
     owner: Optional[User] = Relationship(back_populates="media")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -47,6 +48,37 @@ class MediaItem(SQLModel, table=True):
         return f"<MediaItem(id={self.id}, title='{self.title[:50]}...', type='{self.media_type}', owner_id={self.owner_id})>"
 
 
+# Same layout as the card indexes: one (owner_id, <filter>, updated_at, id)
+# index per list filter.
+Index(
+    "ix_media_items_owner_id_updated_at_id",
+    MediaItem.owner_id,
+    MediaItem.updated_at,
+    MediaItem.id,
+)
+Index(
+    "ix_media_items_owner_id_status_updated_at_id",
+    MediaItem.owner_id,
+    MediaItem.status,
+    MediaItem.updated_at,
+    MediaItem.id,
+)
+Index(
+    "ix_media_items_owner_id_media_type_updated_at_id",
+    MediaItem.owner_id,
+    MediaItem.media_type,
+    MediaItem.updated_at,
+    MediaItem.id,
+)
+Index(
+    "ix_media_items_owner_id_category_updated_at_id",
+    MediaItem.owner_id,
+    MediaItem.category,
+    MediaItem.updated_at,
+    MediaItem.id,
+)
+
+
 class MediaCollection(SQLModel, table=True):
     __tablename__ = "media_collections"
     
@@ -62,7 +94,5 @@ class MediaCollection(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
-    media_items: List[MediaItem] = Relationship()
-    
     def __repr__(self) -> str:
         return f"<MediaCollection(id={self.id}, name='{self.name}', owner_id={self.owner_id})>"
\ No newline at end of file
@@ -0,0 +1,20 @@
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+
+
+class UserStatCounter(SQLModel, table=True):
+    __tablename__ = "user_stat_counters"
+    
+    owner_id: int = Field(foreign_key="users.id", primary_key=True)
+    scope: str = Field(primary_key=True, max_length=30)
+    key: str = Field(default="", primary_key=True, max_length=255)
+    count: int = Field(default=0)
+    rating_count: int = Field(default=0)
+    rating_sum: float = Field(default=0.0)
+    personal_rating_count: int = Field(default=0)
+    personal_rating_sum: float = Field(default=0.0)
+    progress_sum: float = Field(default=0.0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    def __repr__(self) -> str:
+        return f"<UserStatCounter(owner_id={self.owner_id}, scope='{self.scope}', key='{self.key}', count={self.count})>"
@@ -0,0 +1,33 @@
+from datetime import datetime
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+
+
+class SyncCounter(SQLModel, table=True):
+    __tablename__ = "sync_counters"
+    
+    owner_id: int = Field(foreign_key="users.id", primary_key=True)
+    seq: int = Field(default=0)
+    # Tombstones up to here were compacted away; older tokens need a full resync.
+    compacted_seq: int = Field(default=0)
+    
+    def __repr__(self) -> str:
+        return f"<SyncCounter(owner_id={self.owner_id}, seq={self.seq}, compacted_seq={self.compacted_seq})>"
+
+
+class SyncChange(SQLModel, table=True):
+    __tablename__ = "sync_changes"
+    # One row per entity holding its latest change; deleted rows are the tombstones.
+    __table_args__ = (
+        Index("ix_sync_changes_owner_id_seq", "owner_id", "seq"),
+    )
+    
+    owner_id: int = Field(foreign_key="users.id", primary_key=True)
+    entity_type: str = Field(primary_key=True, max_length=20)
+    entity_id: int = Field(primary_key=True)
+    seq: int
+    deleted: bool = Field(default=False)
+    changed_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    def __repr__(self) -> str:
+        return f"<SyncChange(owner_id={self.owner_id}, {self.entity_type}={self.entity_id}, seq={self.seq}, deleted={self.deleted})>"
@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Optional
+from sqlmodel import SQLModel, Field, Column
+from sqlalchemy import Index, UniqueConstraint
+import sqlalchemy.dialects.postgresql as pg
+
+
+class Tag(SQLModel, table=True):
+    __tablename__ = "tags"
+    __table_args__ = (UniqueConstraint("owner_id", "name", name="uq_tags_owner_id_name"),)
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str = Field(sa_column=Column(pg.VARCHAR(100), nullable=False))
+    owner_id: int = Field(foreign_key="users.id")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    def __repr__(self) -> str:
+        return f"<Tag(id={self.id}, name='{self.name}', owner_id={self.owner_id})>"
+
+
+class CardTag(SQLModel, table=True):
+    __tablename__ = "card_tags"
+    __table_args__ = (Index("ix_card_tags_card_id_tag_id", "card_id", "tag_id"),)
+    
+    tag_id: int = Field(foreign_key="tags.id", primary_key=True)
+    card_id: int = Field(foreign_key="knowledge_cards.id", primary_key=True)
+
+
+class MediaItemTag(SQLModel, table=True):
+    __tablename__ = "media_item_tags"
+    __table_args__ = (Index("ix_media_item_tags_media_item_id_tag_id", "media_item_id", "tag_id"),)
+    
+    tag_id: int = Field(foreign_key="tags.id", primary_key=True)
+    media_item_id: int = Field(foreign_key="media_items.id", primary_key=True)
@@ -3,8 +3,11 @@ from typing import List, Optional
 from pydantic import BaseModel
 
 from .user import User, UserCreate, UserUpdate, UserInDB, UserProfile, UserProfileCreate, UserProfileUpdate
-from .card import KnowledgeCard, KnowledgeCardCreate, KnowledgeCardUpdate, Notebook, NotebookCreate, NotebookUpdate, CardReference, CardReferenceCreate, KnowledgeCardWithReferences
-from .media import MediaItem, MediaItemCreate, MediaItemUpdate, MediaCollection, MediaCollectionCreate, MediaCollectionUpdate
+from .card import KnowledgeCard, KnowledgeCardCreate, KnowledgeCardUpdate, KnowledgeCardSearchHit, KnowledgeCardSummary, KnowledgeCardSummaryHit, Notebook, NotebookCreate, NotebookUpdate, CardReference, CardReferenceCreate, KnowledgeCardWithReferences, CardGraph, CardGraphNode, CardGraphEdge, CardPath, CardGraphComponent
+from .media import MediaItem, MediaItemCreate, MediaItemSummary, MediaItemUpdate, MediaCollection, MediaCollectionCreate, MediaCollectionUpdate
+from .tag import TagCount
+from .batch import BatchItemError, BatchDelete, BatchDeleteResult
+from .imports import ImportJob, ImportRecordError
 
 # Add Token schema
 class Token(BaseModel):
@@ -16,10 +19,14 @@ class Token(BaseModel):
 __all__ = [
     "User", "UserCreate", "UserUpdate", "UserInDB",
     "UserProfile", "UserProfileCreate", "UserProfileUpdate",
-    "KnowledgeCard", "KnowledgeCardCreate", "KnowledgeCardUpdate", "KnowledgeCardWithReferences",
+    "KnowledgeCard", "KnowledgeCardCreate", "KnowledgeCardUpdate", "KnowledgeCardWithReferences", "KnowledgeCardSearchHit", "KnowledgeCardSummary", "KnowledgeCardSummaryHit",
     "Notebook", "NotebookCreate", "NotebookUpdate", 
     "CardReference", "CardReferenceCreate",
-    "MediaItem", "MediaItemCreate", "MediaItemUpdate",
+    "CardGraph", "CardGraphNode", "CardGraphEdge", "CardPath", "CardGraphComponent",
+    "MediaItem", "MediaItemCreate", "MediaItemUpdate", "MediaItemSummary",
     "MediaCollection", "MediaCollectionCreate", "MediaCollectionUpdate",
+    "TagCount",
+    "BatchItemError", "BatchDelete", "BatchDeleteResult",
+    "ImportJob", "ImportRecordError",
     "Token"
 ]
\ No newline at end of file
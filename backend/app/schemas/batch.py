@@ -0,0 +1,17 @@
+from typing import Any, List, Optional
+from pydantic import BaseModel
+
+
+class BatchItemError(BaseModel):
+    index: int
+    id: Optional[int] = None
+    detail: Any
+
+
+class BatchDelete(BaseModel):
+    ids: List[int]
+
+
+class BatchDeleteResult(BaseModel):
+    deleted: List[int] = []
+    errors: List[BatchItemError] = []
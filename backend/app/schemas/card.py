@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from app.schemas.batch import BatchItemError
 
 
 class KnowledgeCardBase(BaseModel):
@@ -33,6 +34,10 @@ class KnowledgeCardUpdate(BaseModel):
     is_public: Optional[bool] = None
 
 
+class KnowledgeCardBatchUpdate(KnowledgeCardUpdate):
+    id: int
+
+
 class KnowledgeCard(KnowledgeCardBase):
     id: Optional[int] = None
     owner_id: int
@@ -44,6 +49,39 @@ class KnowledgeCard(KnowledgeCardBase):
         from_attributes = True
 
 
+class KnowledgeCardSearchHit(KnowledgeCard):
+    snippet: Optional[str] = None
+
+
+class KnowledgeCardSummary(BaseModel):
+    id: int
+    title: str
+    content_type: str = "markdown"
+    summary: Optional[str] = ""
+    tags: Optional[str] = ""
+    category: Optional[str] = None
+    status: str = "active"
+    priority: int = 0
+    is_favorite: bool = False
+    is_public: bool = False
+    owner_id: int
+    created_at: datetime
+    updated_at: datetime
+    last_accessed: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class KnowledgeCardSummaryHit(KnowledgeCardSummary):
+    snippet: Optional[str] = None
+
+
+class KnowledgeCardBatchResult(BaseModel):
+    items: List[KnowledgeCard] = []
+    errors: List[BatchItemError] = []
+
+
 class NotebookBase(BaseModel):
     name: str
     description: Optional[str] = ""
@@ -92,4 +130,53 @@ class CardReference(CardReferenceBase):
 
 
 class KnowledgeCardWithReferences(KnowledgeCard):
-    references: List[CardReference] = []
\ No newline at end of file
+    references: List[CardReference] = []
+
+
+class CardGraphNode(BaseModel):
+    id: int
+    title: str
+    depth: Optional[int] = None
+
+
+class CardGraphEdge(BaseModel):
+    source: int
+    target: int
+    reference_type: str
+
+
+class CardGraph(BaseModel):
+    nodes: List[CardGraphNode] = []
+    edges: List[CardGraphEdge] = []
+    truncated: bool = False
+
+
+class CardPath(BaseModel):
+    length: int
+    nodes: List[CardGraphNode] = []
+
+
+class RelatedCard(BaseModel):
+    id: int
+    title: str
+    score: float
+
+
+class DuplicateCard(BaseModel):
+    id: int
+    title: str
+    similarity: float
+
+
+class CardDuplicateGroup(BaseModel):
+    similarity: float
+    cards: List[DuplicateCard] = []
+
+
+class CardMerge(BaseModel):
+    duplicate_ids: List[int] = Field(min_length=1, max_length=100)
+
+
+class CardGraphComponent(BaseModel):
+    size: int
+    card_ids: List[int] = []
\ No newline at end of file
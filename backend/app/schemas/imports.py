@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class ImportRecordError(BaseModel):
+    location: str
+    detail: str
+
+
+class ImportJob(BaseModel):
+    id: str
+    filename: str
+    status: str
+    bytes_total: int
+    bytes_processed: int
+    processed: int
+    created_cards: int
+    created_media: int
+    failed: int
+    errors: List[ImportRecordError] = []
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,17 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+from pydantic import BaseModel
+
+
+class Job(BaseModel):
+    id: str
+    name: str
+    status: str
+    attempts: int
+    max_attempts: int
+    progress: Dict[str, Any] = {}
+    result: Any = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field
+from app.schemas.batch import BatchItemError
 
 
 class MediaItemBase(BaseModel):
@@ -45,8 +46,34 @@ class MediaItemUpdate(BaseModel):
     category: Optional[str] = None
 
 
+class MediaItemBatchUpdate(MediaItemUpdate):
+    id: int
+
+
 class MediaItem(MediaItemBase):
     id: Optional[int] = None
+    metadata: Optional[dict] = Field(default={}, validation_alias=AliasChoices("meta_data", "metadata"))
+    owner_id: int
+    created_at: datetime
+    updated_at: datetime
+    last_accessed: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class MediaItemSummary(BaseModel):
+    id: int
+    title: str
+    media_type: str
+    original_title: Optional[str] = None
+    rating: Optional[float] = None
+    personal_rating: Optional[float] = None
+    status: str
+    progress: float = 0.0
+    poster_url: Optional[str] = None
+    tags: Optional[str] = ""
+    category: Optional[str] = None
     owner_id: int
     created_at: datetime
     updated_at: datetime
@@ -56,6 +83,23 @@ class MediaItem(MediaItemBase):
         from_attributes = True
 
 
+class DuplicateMediaItem(BaseModel):
+    id: int
+    title: str
+    media_type: str
+    similarity: float
+
+
+class MediaDuplicateGroup(BaseModel):
+    similarity: float
+    items: List[DuplicateMediaItem] = []
+
+
+class MediaItemBatchResult(BaseModel):
+    items: List[MediaItem] = []
+    errors: List[BatchItemError] = []
+
+
 class MediaCollectionBase(BaseModel):
     name: str
     description: Optional[str] = ""
@@ -0,0 +1,10 @@
+from typing import Any, Dict, List
+from pydantic import BaseModel
+
+
+class SyncPage(BaseModel):
+    # Rows use the export record format, keyed by entity type.
+    changes: Dict[str, List[Dict[str, Any]]] = {}
+    deleted: Dict[str, List[int]] = {}
+    next: str
+    has_more: bool
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class TagCount(BaseModel):
+    name: str
+    cards: int = 0
+    media: int = 0
@@ -0,0 +1,284 @@
+import asyncio
+import re
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import VersionedCache
+from app.core.config import settings
+from app.models.card import KnowledgeCard
+from app.models.media import MediaItem
+from app.services.related import CJK_RANGES
+
+MAX_CONTENT_CHARS = 20000
+INLINE_UPDATE_LIMIT = 64
+CARD_SHINGLE_TOKENS = 3
+MEDIA_SHINGLE_CHARS = 3
+CARD_DEDUP_FIELDS = ("title", "content")
+MEDIA_DEDUP_FIELDS = ("title", "original_title", "media_type", "external_id", "external_source")
+
+_SHIFT = np.uint64(32)
+# CJK characters count as words of their own, so CJK text shingles by character.
+_TOKEN_RE = re.compile(rf"[{CJK_RANGES}]|[^\W_]+")
+_PUNCTUATION_RE = re.compile(r"[^\w\s]+")
+
+# (id, scope, exact key, shingles): only items in the same scope can be duplicates.
+Entry = Tuple[Optional[int], str, Optional[str], Set[str]]
+
+
+def card_shingles(title: str, content: Optional[str]) -> Set[str]:
+    tokens = _TOKEN_RE.findall(f"{title} {(content or '')[:MAX_CONTENT_CHARS]}".casefold())
+    if len(tokens) < CARD_SHINGLE_TOKENS:
+        return {" ".join(tokens)} if tokens else set()
+    return set(map(" ".join, zip(*(tokens[i:] for i in range(CARD_SHINGLE_TOKENS)))))
+
+
+def title_shingles(*titles: Optional[str]) -> Set[str]:
+    shingles = set()
+    for title in titles:
+        # Sorting the words lets "Lord of the Rings, The" match "The Lord of the Rings".
+        text = " ".join(sorted(_PUNCTUATION_RE.sub(" ", (title or "").casefold()).split()))
+        if len(text) <= MEDIA_SHINGLE_CHARS:
+            shingles.update([text] if text else [])
+        else:
+            shingles.update(text[i:i + MEDIA_SHINGLE_CHARS] for i in range(len(text) - MEDIA_SHINGLE_CHARS + 1))
+    return shingles
+
+
+class MinHasher:
+    def __init__(self, num_perm: int, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(0, np.iinfo(np.uint64).max, num_perm, dtype=np.uint64, endpoint=True) | np.uint64(1)
+        self.b = rng.integers(0, np.iinfo(np.uint64).max, num_perm, dtype=np.uint64, endpoint=True)
+    
+    def signature(self, shingles: Set[str]) -> Optional[np.ndarray]:
+        if not shingles:
+            return None
+        # str hashes are salted per process, which is fine for an index that never leaves it.
+        hashes = np.fromiter(map(hash, shingles), dtype=np.int64, count=len(shingles)).view(np.uint64)
+        # Multiply-shift hashing: the uint64 product wraps and the high 32 bits are kept.
+        return ((np.outer(hashes, self.a) + self.b) >> _SHIFT).min(axis=0).astype(np.uint32)
+
+
+class DuplicateIndex:
+    def __init__(self, *, num_perm: int, bands: int):
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.signatures: Dict[int, np.ndarray] = {}
+        self.scopes: Dict[int, str] = {}
+        self.exact_keys: Dict[int, str] = {}
+        self._buckets: Dict[bytes, Set[int]] = defaultdict(set)
+        self._exact: Dict[str, Set[int]] = defaultdict(set)
+    
+    def _band_keys(self, scope: str, signature: np.ndarray) -> List[bytes]:
+        prefix = scope.encode() + b"\0"
+        return [
+            prefix + bytes([band]) + signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+    
+    def _exact_key(self, scope: str, key: str) -> str:
+        return f"{scope}\0{key}"
+    
+    def add(self, id: int, scope: str, exact_key: Optional[str], signature: Optional[np.ndarray]) -> None:
+        self.remove(id)
+        self.scopes[id] = scope
+        if signature is not None:
+            self.signatures[id] = signature
+            for key in self._band_keys(scope, signature):
+                self._buckets[key].add(id)
+        if exact_key:
+            self.exact_keys[id] = self._exact_key(scope, exact_key)
+            self._exact[self.exact_keys[id]].add(id)
+    
+    def remove(self, id: int) -> None:
+        scope = self.scopes.pop(id, None)
+        signature = self.signatures.pop(id, None)
+        if signature is not None:
+            for key in self._band_keys(scope, signature):
+                self._buckets[key].discard(id)
+                if not self._buckets[key]:
+                    del self._buckets[key]
+        exact_key = self.exact_keys.pop(id, None)
+        if exact_key is not None:
+            self._exact[exact_key].discard(id)
+            if not self._exact[exact_key]:
+                del self._exact[exact_key]
+    
+    def similarity(self, signature: np.ndarray, other: int) -> float:
+        return float(np.count_nonzero(signature == self.signatures[other])) / self.num_perm
+    
+    def similar(
+        self, scope: str, exact_key: Optional[str], signature: Optional[np.ndarray], *, threshold: float, exclude: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        matches = {}
+        if exact_key:
+            matches.update((id, 1.0) for id in self._exact.get(self._exact_key(scope, exact_key), ()))
+        if signature is not None:
+            # Only items sharing at least one whole band are ever compared.
+            candidates = set()
+            for key in self._band_keys(scope, signature):
+                candidates.update(self._buckets.get(key, ()))
+            for id in candidates - matches.keys():
+                score = self.similarity(signature, id)
+                if score >= threshold:
+                    matches[id] = score
+        matches.pop(exclude, None)
+        return sorted(matches.items(), key=lambda match: (-match[1], match[0]))
+    
+    def pair_similarity(self, a: int, b: int) -> float:
+        if a in self.exact_keys and self.exact_keys[a] == self.exact_keys.get(b):
+            return 1.0
+        if a in self.signatures and b in self.signatures:
+            return self.similarity(self.signatures[a], b)
+        return 0.0
+    
+    def groups(self, *, threshold: float) -> List[List[Tuple[int, float]]]:
+        parent: Dict[int, int] = {}
+        
+        def find(id: int) -> int:
+            parent.setdefault(id, id)
+            while parent[id] != id:
+                parent[id] = parent[parent[id]]
+                id = parent[id]
+            return id
+        
+        def union(a: int, b: int) -> None:
+            parent[find(b)] = find(a)
+        
+        for members in self._exact.values():
+            first, *rest = members
+            for id in rest:
+                union(first, id)
+        compared = set()
+        for members in self._buckets.values():
+            if len(members) < 2:
+                continue
+            # Each member is checked against the bucket's first one; true duplicates
+            # share several bands, so pairs missed here are joined through another bucket.
+            first, *rest = sorted(members)
+            for id in rest:
+                if (first, id) not in compared:
+                    compared.add((first, id))
+                    if self.similarity(self.signatures[first], id) >= threshold:
+                        union(first, id)
+        
+        grouped: Dict[int, List[int]] = defaultdict(list)
+        for id in parent:
+            grouped[find(id)].append(id)
+        # The oldest item leads its group, the natural merge target; the others are scored against it.
+        groups = [
+            [(ids[0], 1.0)] + [(id, self.pair_similarity(ids[0], id)) for id in ids[1:]]
+            for ids in map(sorted, grouped.values())
+            if len(ids) > 1
+        ]
+        return sorted(groups, key=lambda group: (-len(group), group[0][0]))
+
+
+class DuplicateIndexCache:
+    def __init__(
+        self,
+        *,
+        load_rows: Callable[[AsyncSession, int], Awaitable[Sequence[Any]]],
+        entry: Callable[[Any], Entry],
+        max_size: int,
+        ttl: float
+    ):
+        self.load_rows = load_rows
+        self.entry = entry
+        self.hasher = MinHasher(settings.DEDUP_NUM_PERM)
+        self._indexes = VersionedCache(max_size=max_size, ttl=ttl)
+    
+    def _add(self, index: DuplicateIndex, objs: Iterable[Any]) -> None:
+        for obj in objs:
+            id, scope, exact_key, shingles = self.entry(obj)
+            index.add(id, scope, exact_key, self.hasher.signature(shingles))
+    
+    def _build(self, rows: Iterable[Any]) -> DuplicateIndex:
+        index = DuplicateIndex(num_perm=settings.DEDUP_NUM_PERM, bands=settings.DEDUP_BANDS)
+        self._add(index, rows)
+        return index
+    
+    async def _load(self, db: AsyncSession, owner_id: int) -> DuplicateIndex:
+        rows = await self.load_rows(db, owner_id)
+        # Hashing a large library takes seconds; keep it off the event loop.
+        return await asyncio.to_thread(self._build, rows)
+    
+    async def get(self, db: AsyncSession, *, owner_id: int) -> DuplicateIndex:
+        return await self._indexes.get(owner_id, lambda: self._load(db, owner_id))
+    
+    async def find(self, db: AsyncSession, *, owner_id: int, obj: Any, exclude: Optional[int] = None) -> List[Tuple[int, float]]:
+        index = await self.get(db, owner_id=owner_id)
+        _, scope, exact_key, shingles = self.entry(obj)
+        return index.similar(
+            scope, exact_key, self.hasher.signature(shingles), threshold=settings.DEDUP_THRESHOLD, exclude=exclude
+        )
+    
+    async def groups(self, db: AsyncSession, *, owner_id: int) -> List[List[Tuple[int, float]]]:
+        index = await self.get(db, owner_id=owner_id)
+        return index.groups(threshold=settings.DEDUP_THRESHOLD)
+    
+    def upsert(self, owner_id: int, objs: Sequence[Any]) -> None:
+        index = self._indexes.peek(owner_id)
+        if index is None or len(objs) > INLINE_UPDATE_LIMIT:
+            # Also stops a build that started before these writes from being stored.
+            self._indexes.invalidate(owner_id)
+            return
+        self._add(index, objs)
+    
+    def remove(self, owner_id: int, ids: Iterable[int]) -> None:
+        index = self._indexes.peek(owner_id)
+        if index is None:
+            self._indexes.invalidate(owner_id)
+            return
+        for id in ids:
+            index.remove(id)
+
+
+def card_entry(card: Any) -> Entry:
+    return getattr(card, "id", None), "", None, card_shingles(card.title, card.content)
+
+
+def media_entry(item: Any) -> Entry:
+    exact_key = f"{item.external_source or ''}:{item.external_id}" if item.external_id else None
+    return getattr(item, "id", None), item.media_type, exact_key, title_shingles(item.title, item.original_title)
+
+
+async def load_card_rows(db: AsyncSession, owner_id: int) -> Sequence[Any]:
+    conn = await db.connection()
+    result = await conn.execute(
+        select(
+            KnowledgeCard.id,
+            KnowledgeCard.title,
+            func.substr(KnowledgeCard.content, 1, MAX_CONTENT_CHARS).label("content")
+        )
+        .where(KnowledgeCard.owner_id == owner_id)
+    )
+    return result.all()
+
+
+async def load_media_rows(db: AsyncSession, owner_id: int) -> Sequence[Any]:
+    conn = await db.connection()
+    result = await conn.execute(
+        select(MediaItem.id, *(getattr(MediaItem, field) for field in MEDIA_DEDUP_FIELDS))
+        .where(MediaItem.owner_id == owner_id)
+    )
+    return result.all()
+
+
+card_duplicates = DuplicateIndexCache(
+    load_rows=load_card_rows,
+    entry=card_entry,
+    max_size=settings.DEDUP_CACHE_MAX_SIZE,
+    ttl=settings.DEDUP_CACHE_TTL_SECONDS,
+)
+
+media_duplicates = DuplicateIndexCache(
+    load_rows=load_media_rows,
+    entry=media_entry,
+    max_size=settings.DEDUP_CACHE_MAX_SIZE,
+    ttl=settings.DEDUP_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,112 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Type
+from sqlalchemy import select
+from sqlmodel import SQLModel
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.card import CardReference, KnowledgeCard, Notebook
+from app.models.media import MediaCollection, MediaItem
+
+# Record "type" values line up with the importer so a cards/media export can be re-imported as is.
+EXPORT_ENTITIES: Dict[str, Type[SQLModel]] = {
+    "card": KnowledgeCard,
+    "notebook": Notebook,
+    "reference": CardReference,
+    "media": MediaItem,
+    "collection": MediaCollection,
+}
+EXPORT_FIELD_NAMES = {"meta_data": "metadata"}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def export_columns(model: Type[SQLModel]) -> List[str]:
+    return [column.key for column in model.__table__.columns]
+
+
+def export_row(obj: SQLModel, columns: Iterable[str]) -> Dict[str, Any]:
+    return {EXPORT_FIELD_NAMES.get(column, column): getattr(obj, column) for column in columns}
+
+
+def owned_query(model: Type[SQLModel], owner_id: int) -> Any:
+    query = select(model)
+    if model is CardReference:
+        owned_cards = select(KnowledgeCard.id).where(KnowledgeCard.owner_id == owner_id)
+        return query.where(CardReference.card_id.in_(owned_cards)).order_by(CardReference.id)
+    return query.where(model.owner_id == owner_id).order_by(model.id)
+
+
+async def stream_entity(owner_id: int, entity: str) -> AsyncIterator[Dict[str, Any]]:
+    model = EXPORT_ENTITIES[entity]
+    columns = export_columns(model)
+    async with AsyncSessionLocal() as db:
+        query = owned_query(model, owner_id).execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+        rows = await db.stream_scalars(query)
+        # The identity map only holds weak references, so rows already
+        # written out are released as the stream advances.
+        async for obj in rows:
+            yield export_row(obj, columns)
+
+
+async def ndjson_lines(owner_id: int, entities: List[str]) -> AsyncIterator[str]:
+    for entity in entities:
+        async for row in stream_entity(owner_id, entity):
+            yield json.dumps({"type": entity, **row}, default=_json_default, ensure_ascii=False) + "\n"
+
+
+async def csv_lines(owner_id: int, entity: str) -> AsyncIterator[str]:
+    columns = [EXPORT_FIELD_NAMES.get(column, column) for column in export_columns(EXPORT_ENTITIES[entity])]
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+    writer.writeheader()
+    async for row in stream_entity(owner_id, entity):
+        writer.writerow({
+            key: json.dumps(value, default=_json_default) if isinstance(value, (dict, list)) else value
+            for key, value in row.items()
+        })
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+async def encode_chunks(lines: AsyncIterator[str], *, gzip: bool = False) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=31) if gzip else None
+    pending: List[bytes] = []
+    size = 0
+    # The first line is flushed right away so the client sees bytes immediately,
+    # the rest is coalesced into EXPORT_CHUNK_BYTES writes.
+    first = True
+    async for line in lines:
+        data = line.encode("utf-8")
+        pending.append(data)
+        size += len(data)
+        if first or size >= settings.EXPORT_CHUNK_BYTES:
+            chunk = b"".join(pending)
+            pending, size = [], 0
+            if compressor:
+                chunk = compressor.compress(chunk) + (compressor.flush(zlib.Z_SYNC_FLUSH) if first else b"")
+            first = False
+            if chunk:
+                yield chunk
+    chunk = b"".join(pending)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+
+def export_stream(owner_id: int, *, format: str, entities: List[str], gzip: bool = False) -> AsyncIterator[bytes]:
+    if format == "csv":
+        lines = csv_lines(owner_id, entities[0])
+    else:
+        lines = ndjson_lines(owner_id, entities)
+    return encode_chunks(lines, gzip=gzip)
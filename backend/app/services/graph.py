@@ -0,0 +1,115 @@
+from collections import defaultdict, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import VersionedCache
+from app.core.config import settings
+from app.models.card import CardReference, KnowledgeCard
+
+GRAPH_DIRECTIONS = ("out", "in", "both")
+
+# (card_id, referenced_card_id, reference_type)
+Edge = Tuple[int, int, str]
+
+
+class ReferenceGraph:
+    def __init__(self, edges: Iterable[Edge]):
+        self.outgoing: Dict[int, Dict[int, str]] = defaultdict(dict)
+        self.incoming: Dict[int, Dict[int, str]] = defaultdict(dict)
+        for source, target, reference_type in edges:
+            self.outgoing[source][target] = reference_type
+            self.incoming[target][source] = reference_type
+    
+    def neighbors(self, node: int, direction: str = "both") -> Iterable[int]:
+        if direction in ("out", "both"):
+            yield from self.outgoing.get(node, ())
+        if direction in ("in", "both"):
+            yield from self.incoming.get(node, ())
+    
+    def neighborhood(self, start: int, *, depth: int, direction: str = "both", max_nodes: int = 500) -> Tuple[Dict[int, int], bool]:
+        depths = {start: 0}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            if depths[node] >= depth:
+                continue
+            for neighbor in self.neighbors(node, direction):
+                if neighbor in depths:
+                    continue
+                if len(depths) >= max_nodes:
+                    return depths, True
+                depths[neighbor] = depths[node] + 1
+                queue.append(neighbor)
+        return depths, False
+    
+    def edges_between(self, nodes: Iterable[int]) -> List[Edge]:
+        nodes = set(nodes)
+        return [
+            (source, target, reference_type)
+            for source in nodes
+            for target, reference_type in self.outgoing.get(source, {}).items()
+            if target in nodes
+        ]
+    
+    def shortest_path(self, source: int, target: int, *, direction: str = "both") -> Optional[List[int]]:
+        parents: Dict[int, Optional[int]] = {source: None}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            if node == target:
+                path = []
+                while node is not None:
+                    path.append(node)
+                    node = parents[node]
+                return path[::-1]
+            for neighbor in self.neighbors(node, direction):
+                if neighbor not in parents:
+                    parents[neighbor] = node
+                    queue.append(neighbor)
+        return None
+    
+    def components(self) -> List[List[int]]:
+        seen = set()
+        components = []
+        for start in list(self.outgoing) + list(self.incoming):
+            if start in seen:
+                continue
+            seen.add(start)
+            component = [start]
+            queue = deque([start])
+            while queue:
+                for neighbor in self.neighbors(queue.popleft()):
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        component.append(neighbor)
+                        queue.append(neighbor)
+            components.append(sorted(component))
+        return sorted(components, key=len, reverse=True)
+
+
+async def load_reference_graph(db: AsyncSession, owner_id: int) -> ReferenceGraph:
+    # Plain Core rows: skipping the ORM result layer matters at ~100k edges.
+    conn = await db.connection()
+    result = await conn.execute(
+        select(CardReference.card_id, CardReference.referenced_card_id, CardReference.reference_type)
+        .join(KnowledgeCard, CardReference.card_id == KnowledgeCard.id)
+        .where(KnowledgeCard.owner_id == owner_id)
+    )
+    return ReferenceGraph(result.all())
+
+
+class ReferenceGraphCache:
+    def __init__(self, *, max_size: int, ttl: float):
+        self._graphs = VersionedCache(max_size=max_size, ttl=ttl)
+    
+    async def get(self, db: AsyncSession, *, owner_id: int) -> ReferenceGraph:
+        return await self._graphs.get(owner_id, lambda: load_reference_graph(db, owner_id))
+    
+    def invalidate(self, owner_id: int) -> None:
+        self._graphs.invalidate(owner_id)
+
+
+reference_graph_cache = ReferenceGraphCache(
+    max_size=settings.GRAPH_CACHE_MAX_SIZE,
+    ttl=settings.GRAPH_CACHE_TTL_SECONDS,
+)
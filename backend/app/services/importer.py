@@ -0,0 +1,250 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import zipfile
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from pydantic import BaseModel, ValidationError
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.jobs import job_queue
+from app.crud.card import knowledge_card_crud
+from app.crud.media import media_item_crud
+from app.schemas.card import KnowledgeCardCreate
+from app.schemas.media import MediaItemCreate
+
+MARKDOWN_EXTENSIONS = (".md", ".markdown")
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+RECORD_SCHEMAS = {"card": KnowledgeCardCreate, "media": MediaItemCreate}
+MAX_REPORTED_ERRORS = 100
+IMPORT_JOB = "import"
+
+# (record type, validated record or error message, location in the upload)
+ImportRecord = Tuple[str, Any, str]
+
+
+def parse_front_matter(text: str) -> Tuple[Dict[str, Any], str]:
+    if not text.startswith("---"):
+        return {}, text
+    end = text.find("\n---", 3)
+    if end == -1:
+        return {}, text
+    meta: Dict[str, Any] = {}
+    key = None
+    for line in text[3:end].splitlines():
+        if not line.strip():
+            continue
+        if line.lstrip().startswith("- ") and key:
+            meta.setdefault(key, [])
+            if isinstance(meta[key], list):
+                meta[key].append(line.strip()[2:].strip().strip("'\""))
+            continue
+        if ":" in line:
+            key, value = line.split(":", 1)
+            key, value = key.strip().lower(), value.strip()
+            if value.startswith("[") and value.endswith("]"):
+                meta[key] = [item.strip().strip("'\"") for item in value[1:-1].split(",") if item.strip()]
+            elif value:
+                meta[key] = value.strip("'\"")
+    body_start = text.find("\n", end + 4)
+    return meta, text[body_start + 1:] if body_start != -1 else ""
+
+
+def markdown_to_card(name: str, text: str) -> Dict[str, Any]:
+    meta, body = parse_front_matter(text)
+    title = meta.get("title")
+    if not title:
+        for line in body.splitlines():
+            if line.startswith("# "):
+                title = line[2:].strip()
+                break
+    if not title:
+        title = os.path.splitext(os.path.basename(name))[0]
+    tags = meta.get("tags", "")
+    if isinstance(tags, list):
+        tags = ",".join(tags)
+    record = {"title": title[:500], "content": body, "tags": tags}
+    for field in ("summary", "category", "status"):
+        if meta.get(field):
+            record[field] = meta[field]
+    return record
+
+
+def _validate(record_type: str, data: Any, location: str) -> ImportRecord:
+    schema = RECORD_SCHEMAS.get(record_type)
+    if schema is None:
+        return "error", f"Unknown record type '{record_type}'", location
+    try:
+        return record_type, schema.model_validate(data), location
+    except ValidationError as e:
+        messages = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+        return "error", messages, location
+
+
+def _typed(data: Any, default_type: str) -> Tuple[str, Any]:
+    if isinstance(data, dict) and "type" in data:
+        data = dict(data)
+        return str(data.pop("type")), data
+    return default_type, data
+
+
+def iter_ndjson(fp: BinaryIO, name: str, default_type: str) -> Iterator[ImportRecord]:
+    for line_number, raw in enumerate(fp, start=1):
+        if not raw.strip():
+            continue
+        location = f"{name}:{line_number}"
+        try:
+            data = json.loads(raw)
+        except ValueError as e:
+            yield "error", f"Invalid JSON: {e}", location
+            continue
+        yield _validate(*_typed(data, default_type), location)
+
+
+def iter_json_array(fp: BinaryIO, name: str, default_type: str, chunk_size: int = 65536) -> Iterator[ImportRecord]:
+    decoder = json.JSONDecoder()
+    reader = io.TextIOWrapper(fp, encoding="utf-8")
+    buffer = ""
+    index = 0
+    started = False
+    eof = False
+    while True:
+        buffer = buffer.lstrip(" \t\r\n,")
+        if not started and buffer.startswith("["):
+            buffer, started = buffer[1:], True
+            continue
+        if buffer.startswith("]") or (eof and not buffer):
+            return
+        try:
+            data, end = decoder.raw_decode(buffer)
+        except ValueError:
+            if eof:
+                yield "error", "Invalid JSON array", f"{name}[{index}]"
+                return
+            chunk = reader.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+        yield _validate(*_typed(data, default_type), f"{name}[{index}]")
+        buffer = buffer[end:]
+        index += 1
+
+
+def iter_csv(fp: BinaryIO, name: str, default_type: str) -> Iterator[ImportRecord]:
+    reader = csv.DictReader(io.TextIOWrapper(fp, encoding="utf-8-sig", newline=""))
+    for row_number, row in enumerate(reader, start=2):
+        data = {key.strip(): value for key, value in row.items() if key and value not in (None, "")}
+        yield _validate(*_typed(data, default_type), f"{name}:{row_number}")
+
+
+def too_large() -> str:
+    return f"File exceeds the {settings.IMPORT_MAX_MEMBER_BYTES} byte limit"
+
+
+def iter_file(fp: BinaryIO, name: str, default_type: Optional[str]) -> Iterator[ImportRecord]:
+    lower = name.lower()
+    if lower.endswith(MARKDOWN_EXTENSIONS):
+        # One byte over the limit is enough to tell, whatever size the zip header claims.
+        data = fp.read(settings.IMPORT_MAX_MEMBER_BYTES + 1)
+        if len(data) > settings.IMPORT_MAX_MEMBER_BYTES:
+            yield "error", too_large(), name
+            return
+        yield _validate("card", markdown_to_card(name, data.decode("utf-8", errors="replace")), name)
+    elif lower.endswith(NDJSON_EXTENSIONS):
+        yield from iter_ndjson(fp, name, default_type or "card")
+    elif lower.endswith(".json"):
+        yield from iter_json_array(fp, name, default_type or "card")
+    elif lower.endswith(".csv"):
+        yield from iter_csv(fp, name, default_type or "media")
+
+
+def iter_zip(path: str, default_type: Optional[str], progress: Dict[str, Any]) -> Iterator[ImportRecord]:
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or os.path.basename(info.filename).startswith("."):
+                continue
+            if info.filename.lower().endswith(MARKDOWN_EXTENSIONS) and info.file_size > settings.IMPORT_MAX_MEMBER_BYTES:
+                yield "error", too_large(), info.filename
+            else:
+                try:
+                    with archive.open(info) as member:
+                        yield from iter_file(member, info.filename, default_type)
+                except zipfile.BadZipFile as e:
+                    # zipfile stops at the size in the header, so a member that lies about it fails its CRC here.
+                    yield "error", str(e), info.filename
+            progress["bytes_processed"] += info.compress_size
+
+
+def iter_upload(path: str, filename: str, default_type: Optional[str], progress: Dict[str, Any]) -> Iterator[ImportRecord]:
+    if zipfile.is_zipfile(path):
+        yield from iter_zip(path, default_type, progress)
+        return
+    with open(path, "rb") as fp:
+        for record in iter_file(fp, filename, default_type):
+            yield record
+            progress["bytes_processed"] = fp.tell()
+
+
+def new_import_progress(bytes_total: int) -> Dict[str, Any]:
+    return {
+        "bytes_total": bytes_total,
+        "bytes_processed": 0,
+        "processed": 0,
+        "created_cards": 0,
+        "created_media": 0,
+        "failed": 0,
+        "errors": [],
+    }
+
+
+def import_job_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        **job["progress"],
+        "id": job["id"],
+        "filename": job["args"]["filename"],
+        "status": job["status"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "finished_at": job["finished_at"],
+    }
+
+
+def _next_chunk(records: Iterator[ImportRecord], size: int) -> List[ImportRecord]:
+    return list(islice(records, size))
+
+
+@job_queue.task(IMPORT_JOB)
+async def run_import(job: Dict[str, Any], *, path: str, filename: str, default_type: Optional[str] = None) -> None:
+    # Not retried: a second attempt would create the already imported records again.
+    progress = job["progress"]
+    records = iter_upload(path, filename, default_type, progress)
+    try:
+        while True:
+            # Parsing and validation are CPU/file bound; keep them off the event loop.
+            chunk = await asyncio.to_thread(_next_chunk, records, settings.IMPORT_CHUNK_SIZE)
+            if not chunk:
+                break
+            batches: Dict[str, List[BaseModel]] = {"card": [], "media": []}
+            for record_type, payload, location in chunk:
+                if record_type == "error":
+                    progress["failed"] += 1
+                    if len(progress["errors"]) < MAX_REPORTED_ERRORS:
+                        progress["errors"].append({"location": location, "detail": payload})
+                else:
+                    batches[record_type].append(payload)
+            
+            async with AsyncSessionLocal() as db:
+                if batches["card"]:
+                    await knowledge_card_crud.create_many(db, objs_in=batches["card"], owner_id=job["owner_id"])
+                if batches["media"]:
+                    await media_item_crud.create_many(db, objs_in=batches["media"], owner_id=job["owner_id"])
+            progress["created_cards"] += len(batches["card"])
+            progress["created_media"] += len(batches["media"])
+            progress["processed"] += len(chunk)
+            await job_queue.save(job)
+        progress["bytes_processed"] = progress["bytes_total"]
+    finally:
+        records.close()
+        os.unlink(path)
@@ -0,0 +1,214 @@
+import asyncio
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import VersionedCache
+from app.core.config import settings
+from app.models.card import KnowledgeCard
+
+# Only the head of very long cards is vectorized.
+MAX_CONTENT_CHARS = 20000
+# Larger batches drop the index and let the next request rebuild it off the event loop.
+INLINE_UPDATE_LIMIT = 64
+TEXT_FIELDS = ("title", "summary", "content")
+
+CJK_RANGES = r"\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af"
+_TOKEN_RE = re.compile(rf"([{CJK_RANGES}]+)|([^\W_]{{2,}})")
+
+# (id, title, summary, content)
+CardText = Tuple[int, str, Optional[str], Optional[str]]
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    matches = _TOKEN_RE.findall(text.lower())
+    words = [word for _, word in matches if word]
+    # No spaces between CJK words: overlapping character bigrams stand in for them.
+    tokens = [cjk[i:i + 2] for cjk, _ in matches if cjk for i in range(max(len(cjk) - 1, 1))]
+    tokens.extend(words)
+    tokens.extend(map(" ".join, zip(words, words[1:])))
+    return tokens
+
+
+def term_frequencies(title: str, summary: Optional[str], content: Optional[str], dim: int) -> np.ndarray:
+    counts = Counter(tokenize((content or "")[:MAX_CONTENT_CHARS]))
+    for text, weight in ((title, 3), (summary, 2)):
+        for token in tokenize(text):
+            counts[token] += weight
+    # Signed feature hashing: colliding tokens cancel out on average instead of piling up.
+    # str hashes are salted per process, which is fine for an index that never leaves it.
+    hashes = np.fromiter(map(hash, counts), dtype=np.int64, count=len(counts))
+    weights = 1 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+    signs = np.where(hashes & (1 << 40), 1.0, -1.0)
+    return np.bincount(hashes % dim, weights=weights * signs, minlength=dim)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+class RelatedCardIndex:
+    def __init__(self, ids: Sequence[int], titles: Sequence[str], vectors: np.ndarray, idf: np.ndarray):
+        self.idf = idf
+        self.titles = list(titles)
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.vectors = vectors
+        self.size = len(self.titles)
+        self.positions = {int(id): position for position, id in enumerate(self.ids[:self.size])}
+    
+    @classmethod
+    def build(cls, cards: Iterable[CardText], dim: int) -> "RelatedCardIndex":
+        cards = list(cards)
+        tf = np.zeros((len(cards), dim), dtype=np.float32)
+        for row, (_, title, summary, content) in enumerate(cards):
+            tf[row] = term_frequencies(title, summary, content, dim)
+        # IDF is frozen at build time; cards saved later are weighted with it until the next rebuild.
+        df = np.count_nonzero(tf, axis=0)
+        idf = (np.log((1 + len(cards)) / (1 + df)) + 1).astype(np.float32)
+        tf *= idf
+        return cls([id for id, *_ in cards], [title for _, title, *_ in cards], _normalize(tf), idf)
+    
+    def vectorize(self, title: str, summary: Optional[str], content: Optional[str]) -> np.ndarray:
+        vector = term_frequencies(title, summary, content, len(self.idf)).astype(np.float32)
+        vector *= self.idf
+        return _normalize(vector)
+    
+    def upsert(self, id: int, title: str, vector: np.ndarray) -> None:
+        position = self.positions.get(id)
+        if position is None:
+            if self.size == len(self.vectors):
+                # Amortised growth, so a run of single-card saves never copies the matrix each time.
+                capacity = max(16, 2 * len(self.vectors))
+                self.vectors = np.resize(self.vectors, (capacity, len(self.idf)))
+                self.ids = np.resize(self.ids, capacity)
+            position = self.size
+            self.size += 1
+            self.titles.append(title)
+            self.positions[id] = position
+            self.ids[position] = id
+        self.titles[position] = title
+        self.vectors[position] = vector
+    
+    def remove(self, id: int) -> None:
+        position = self.positions.pop(id, None)
+        if position is None:
+            return
+        last = self.size - 1
+        if position != last:
+            # Swap the last row into the gap to keep the live rows contiguous.
+            moved = int(self.ids[last])
+            self.vectors[position] = self.vectors[last]
+            self.ids[position] = moved
+            self.titles[position] = self.titles[last]
+            self.positions[moved] = position
+        self.titles.pop()
+        self.size = last
+    
+    def top_k(
+        self, queries: np.ndarray, k: int, exclude: Sequence[Optional[int]] = (), min_score: float = 0.0
+    ) -> List[List[Tuple[int, str, float]]]:
+        if not self.size:
+            return [[] for _ in queries]
+        # One matrix product scores every query against every card.
+        scores = queries @ self.vectors[:self.size].T
+        for row, id in enumerate(exclude):
+            if id in self.positions:
+                scores[row, self.positions[id]] = -np.inf
+        k = min(k, self.size)
+        candidates = np.argpartition(scores, -k, axis=1)[:, -k:]
+        results = []
+        for row, columns in enumerate(candidates):
+            ranked = columns[np.argsort(-scores[row, columns])]
+            results.append([
+                (int(self.ids[column]), self.titles[column], float(scores[row, column]))
+                for column in ranked
+                if scores[row, column] > min_score
+            ])
+        return results
+
+
+async def load_related_index(db: AsyncSession, owner_id: int) -> RelatedCardIndex:
+    conn = await db.connection()
+    result = await conn.execute(
+        select(
+            KnowledgeCard.id,
+            KnowledgeCard.title,
+            KnowledgeCard.summary,
+            func.substr(KnowledgeCard.content, 1, MAX_CONTENT_CHARS)
+        )
+        .where(KnowledgeCard.owner_id == owner_id)
+        .order_by(KnowledgeCard.id)
+    )
+    rows = result.all()
+    # Tokenizing a large library takes seconds; keep it off the event loop.
+    return await asyncio.to_thread(RelatedCardIndex.build, rows, settings.RELATED_VECTOR_DIM)
+
+
+class RelatedCardIndexCache:
+    def __init__(self, *, max_size: int, ttl: float):
+        self._indexes = VersionedCache(max_size=max_size, ttl=ttl)
+    
+    async def get(self, db: AsyncSession, *, owner_id: int) -> RelatedCardIndex:
+        return await self._indexes.get(owner_id, lambda: load_related_index(db, owner_id))
+    
+    async def related(self, db: AsyncSession, *, owner_id: int, card_id: int, limit: int) -> List[Tuple[int, str, float]]:
+        index = await self.get(db, owner_id=owner_id)
+        position = index.positions.get(card_id)
+        if position is not None:
+            query = index.vectors[position]
+        else:
+            # Saved by another process since the index was built.
+            result = await db.execute(
+                select(KnowledgeCard.title, KnowledgeCard.summary, KnowledgeCard.content)
+                .where(KnowledgeCard.id == card_id)
+            )
+            title, summary, content = result.one()
+            query = index.vectorize(title, summary, content)
+            index.upsert(card_id, title, query)
+        while True:
+            related = index.top_k(query[np.newaxis, :], limit, exclude=[card_id], min_score=settings.RELATED_MIN_SCORE)[0]
+            # The index is cached per process: cards deleted through another worker are still in it.
+            titles = await self._live_titles(db, owner_id=owner_id, ids=[id for id, _, _ in related])
+            missing = [id for id, _, _ in related if id not in titles]
+            if not missing:
+                return [(id, titles[id], score) for id, _, score in related]
+            for id in missing:
+                index.remove(id)
+    
+    async def _live_titles(self, db: AsyncSession, *, owner_id: int, ids: List[int]) -> Dict[int, str]:
+        if not ids:
+            return {}
+        result = await db.execute(
+            select(KnowledgeCard.id, KnowledgeCard.title)
+            .where(KnowledgeCard.id.in_(ids), KnowledgeCard.owner_id == owner_id)
+        )
+        return dict(result.all())
+    
+    def upsert(self, owner_id: int, cards: Sequence[KnowledgeCard]) -> None:
+        index = self._indexes.peek(owner_id)
+        if index is None or len(cards) > INLINE_UPDATE_LIMIT:
+            # Also stops a build that started before these writes from being stored.
+            self._indexes.invalidate(owner_id)
+            return
+        for card in cards:
+            index.upsert(card.id, card.title, index.vectorize(card.title, card.summary, card.content))
+    
+    def remove(self, owner_id: int, card_ids: Iterable[int]) -> None:
+        index = self._indexes.peek(owner_id)
+        if index is None:
+            self._indexes.invalidate(owner_id)
+            return
+        for card_id in card_ids:
+            index.remove(card_id)
+
+
+related_card_index = RelatedCardIndexCache(
+    max_size=settings.RELATED_CACHE_MAX_SIZE,
+    ttl=settings.RELATED_CACHE_TTL_SECONDS,
+)
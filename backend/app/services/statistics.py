@@ -0,0 +1,28 @@
+from typing import Any, Dict
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.jobs import job_queue
+from app.crud.stats import stats_crud
+
+RECONCILE_STATISTICS_JOB = "reconcile_statistics"
+
+
+async def reconcile_statistics(batch_size: int = 1000) -> int:
+    reconciled = 0
+    last_id = 0
+    async with AsyncSessionLocal() as db:
+        while owner_ids := await stats_crud.get_owner_ids(db, after_id=last_id, limit=batch_size):
+            for owner_id in owner_ids:
+                await stats_crud.reconcile(db, owner_id=owner_id)
+            reconciled += len(owner_ids)
+            last_id = owner_ids[-1]
+    return reconciled
+
+
+@job_queue.task(RECONCILE_STATISTICS_JOB, max_attempts=3)
+async def reconcile_statistics_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {"owners": await reconcile_statistics()}
+
+
+if settings.STATS_RECONCILE_INTERVAL_SECONDS > 0:
+    job_queue.schedule(RECONCILE_STATISTICS_JOB, settings.STATS_RECONCILE_INTERVAL_SECONDS)
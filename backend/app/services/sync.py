@@ -0,0 +1,122 @@
+import base64
+import json
+from collections import defaultdict
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.jobs import job_queue
+from app.core.utils import get_current_timestamp
+from app.crud.sync import SYNC_ENTITY_TYPES, sync_crud
+from app.services.exporter import EXPORT_ENTITIES, export_columns, export_row, owned_query
+
+COMPACT_SYNC_LOG_JOB = "compact_sync_log"
+
+
+class SyncTokenExpired(Exception):
+    pass
+
+
+def encode_sync_token(state: Dict[str, int]) -> str:
+    payload = json.dumps(state, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> Dict[str, int]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        state = {key: int(payload[key]) for key in payload}
+    except (ValueError, TypeError, AttributeError) as e:
+        raise ValueError("Invalid sync token") from e
+    # {"s": seq} is a delta token; a snapshot token also carries the entity type index and last id.
+    if set(state) not in ({"s"}, {"s", "t", "i"}) or min(state.values()) < 0:
+        raise ValueError("Invalid sync token")
+    if state.get("t", 0) >= len(SYNC_ENTITY_TYPES):
+        raise ValueError("Invalid sync token")
+    return state
+
+
+async def _snapshot_page(db: AsyncSession, *, owner_id: int, state: Dict[str, int], limit: int) -> Dict[str, Any]:
+    # First sync: every row, one entity type after another in id order. Changes made
+    # meanwhile carry a seq above "s" and are replayed by the delta pages that follow.
+    seq, type_index, last_id = state["s"], state["t"], state["i"]
+    changes: Dict[str, List[Dict[str, Any]]] = {}
+    remaining = limit
+    while remaining and type_index < len(SYNC_ENTITY_TYPES):
+        entity = SYNC_ENTITY_TYPES[type_index]
+        model = EXPORT_ENTITIES[entity]
+        result = await db.scalars(owned_query(model, owner_id).where(model.id > last_id).limit(remaining))
+        rows = result.all()
+        if rows:
+            columns = export_columns(model)
+            changes[entity] = [export_row(row, columns) for row in rows]
+            last_id = rows[-1].id
+        if len(rows) < remaining:
+            type_index, last_id = type_index + 1, 0
+        remaining -= len(rows)
+    
+    if type_index < len(SYNC_ENTITY_TYPES):
+        return {
+            "changes": changes,
+            "deleted": {},
+            "next": encode_sync_token({"s": seq, "t": type_index, "i": last_id}),
+            "has_more": True
+        }
+    current, _ = await sync_crud.get_counter(db, owner_id=owner_id)
+    return {"changes": changes, "deleted": {}, "next": encode_sync_token({"s": seq}), "has_more": current > seq}
+
+
+async def _delta_page(db: AsyncSession, *, owner_id: int, since: int, limit: int) -> Dict[str, Any]:
+    # The counter is read first: a commit landing in between only adds rows above it.
+    current, compacted = await sync_crud.get_counter(db, owner_id=owner_id)
+    if since < compacted or since > current:
+        raise SyncTokenExpired()
+    log = await sync_crud.get_changes(db, owner_id=owner_id, since=since, limit=limit)
+    changed: Dict[str, List[int]] = defaultdict(list)
+    deleted: Dict[str, List[int]] = defaultdict(list)
+    for entry in log:
+        (deleted if entry.deleted else changed)[entry.entity_type].append(entry.entity_id)
+    
+    changes: Dict[str, List[Dict[str, Any]]] = {}
+    for entity, ids in changed.items():
+        model = EXPORT_ENTITIES[entity]
+        result = await db.scalars(owned_query(model, owner_id).where(model.id.in_(ids)))
+        rows = result.all()
+        columns = export_columns(model)
+        changes[entity] = [export_row(row, columns) for row in rows]
+        # Gone since the entry was read: its tombstone has a later seq, reported the same way.
+        found = {row.id for row in rows}
+        missing = [id for id in ids if id not in found]
+        if missing:
+            deleted[entity].extend(missing)
+    
+    has_more = len(log) == limit
+    next_seq = log[-1].seq if has_more else max(current, log[-1].seq if log else since)
+    return {"changes": changes, "deleted": dict(deleted), "next": encode_sync_token({"s": next_seq}), "has_more": has_more}
+
+
+async def sync_page(db: AsyncSession, *, owner_id: int, token: Optional[Dict[str, int]], limit: int) -> Dict[str, Any]:
+    if token is None:
+        current, _ = await sync_crud.get_counter(db, owner_id=owner_id)
+        token = {"s": current, "t": 0, "i": 0}
+    if "t" in token:
+        # A snapshot finishes by switching to deltas from its start; those must still be in the log.
+        _, compacted = await sync_crud.get_counter(db, owner_id=owner_id)
+        if token["s"] < compacted:
+            raise SyncTokenExpired()
+        return await _snapshot_page(db, owner_id=owner_id, state=token, limit=limit)
+    return await _delta_page(db, owner_id=owner_id, since=token["s"], limit=limit)
+
+
+@job_queue.task(COMPACT_SYNC_LOG_JOB, max_attempts=3)
+async def compact_sync_log_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    before = get_current_timestamp() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    async with AsyncSessionLocal() as db:
+        removed = await sync_crud.compact(db, before=before)
+    return {"tombstones": removed}
+
+
+if settings.SYNC_COMPACT_INTERVAL_SECONDS > 0:
+    job_queue.schedule(COMPACT_SYNC_LOG_JOB, settings.SYNC_COMPACT_INTERVAL_SECONDS)
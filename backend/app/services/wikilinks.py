@@ -0,0 +1,32 @@
+import re
+from typing import Dict, Optional, Set
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.card import KnowledgeCard
+
+WIKILINK_REFERENCE_TYPE = "wikilink"
+
+# [[Title]], [[Title|label]] and [[Title#heading]] all link to "Title".
+_WIKILINK_RE = re.compile(r"\[\[([^\[\]|#\n]+)(?:#[^\[\]|\n]*)?(?:\|[^\[\]\n]*)?\]\]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_title(title: str) -> str:
+    return _WHITESPACE_RE.sub(" ", title).strip().casefold()
+
+
+def extract_wikilinks(content: Optional[str]) -> Set[str]:
+    if not content or "[[" not in content:
+        return set()
+    return {normalize_title(match) for match in _WIKILINK_RE.findall(content)} - {""}
+
+
+async def load_title_index(db: AsyncSession, owner_id: int) -> Dict[str, int]:
+    conn = await db.connection()
+    result = await conn.execute(
+        select(KnowledgeCard.id, KnowledgeCard.title)
+        .where(KnowledgeCard.owner_id == owner_id)
+        .order_by(KnowledgeCard.id.desc())
+    )
+    # Descending ids, so the oldest card wins when titles collide.
+    return {normalize_title(title): id for id, title in result}
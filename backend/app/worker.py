@@ -0,0 +1,21 @@
+import argparse
+import asyncio
+import logging
+from app.core.config import settings
+from app.core.jobs import Worker, job_queue
+# Imported for their job registrations.
+from app.services import importer, statistics, sync  # noqa: F401
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run MindGarden background jobs")
+    parser.add_argument("--concurrency", type=int, default=settings.JOB_WORKER_CONCURRENCY)
+    args = parser.parse_args()
+    if settings.JOB_BACKEND != "redis":
+        parser.error("JOB_BACKEND=redis is required: the memory backend only reaches jobs of its own process")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(Worker(job_queue, concurrency=args.concurrency).run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import random
+import statistics
+import sys
+import time
+from itertools import combinations
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings
+from app.services.dedup import DuplicateIndex, MinHasher, card_shingles
+
+CARDS = 50_000
+DUPLICATES = 1_000
+CHECKS = 500
+PAIRWISE_SAMPLE = 1_000
+VOCABULARY = [f"term{i}" for i in range(20_000)]
+
+
+def make_text(rng: random.Random) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(150))
+
+
+def near_copy(text: str, rng: random.Random) -> str:
+    # A handful of edits, like a card pasted twice and touched up once.
+    words = text.split()
+    for _ in range(3):
+        words[rng.randrange(len(words))] = rng.choice(VOCABULARY)
+    return " ".join(words)
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b)
+
+
+def main() -> None:
+    rng = random.Random(7)
+    texts = {id: make_text(rng) for id in range(1, CARDS - DUPLICATES + 1)}
+    originals = rng.sample(sorted(texts), DUPLICATES)
+    planted = {}
+    for id, original in enumerate(originals, start=CARDS - DUPLICATES + 1):
+        texts[id] = near_copy(texts[original], rng)
+        planted[id] = original
+    shingles = {id: card_shingles("", text) for id, text in texts.items()}
+    
+    hasher = MinHasher(settings.DEDUP_NUM_PERM)
+    index = DuplicateIndex(num_perm=settings.DEDUP_NUM_PERM, bands=settings.DEDUP_BANDS)
+    started = time.perf_counter()
+    for id, card in shingles.items():
+        index.add(id, "", None, hasher.signature(card))
+    print(f"build {CARDS} cards, {settings.DEDUP_NUM_PERM} perms / {settings.DEDUP_BANDS} bands: {time.perf_counter() - started:.1f} s")
+    
+    timings = []
+    found = 0
+    for id in rng.sample(sorted(planted), CHECKS):
+        started = time.perf_counter()
+        matches = index.similar("", None, hasher.signature(card_shingles("", texts[id])), threshold=settings.DEDUP_THRESHOLD, exclude=id)
+        timings.append(time.perf_counter() - started)
+        found += planted[id] in dict(matches)
+    p95 = statistics.quantiles(timings, n=20)[-1]
+    print(f"create-time check        p50 {statistics.median(timings) * 1000:.2f} ms   p95 {p95 * 1000:.2f} ms   recall {found / CHECKS:.3f}")
+    
+    started = time.perf_counter()
+    groups = index.groups(threshold=settings.DEDUP_THRESHOLD)
+    elapsed = time.perf_counter() - started
+    pairs = {frozenset(id for id, _ in group) for group in groups}
+    recall = sum(frozenset((id, original)) in pairs for id, original in planted.items()) / DUPLICATES
+    print(f"duplicate report         {elapsed:.2f} s, {len(groups)} groups, recall {recall:.3f}, false groups {len(groups) - recall * DUPLICATES:.0f}")
+    
+    sample = rng.sample(sorted(shingles), PAIRWISE_SAMPLE)
+    started = time.perf_counter()
+    for a, b in combinations(sample, 2):
+        jaccard(shingles[a], shingles[b])
+    per_pair = (time.perf_counter() - started) / (PAIRWISE_SAMPLE * (PAIRWISE_SAMPLE - 1) / 2)
+    print(f"pairwise Jaccard         {per_pair * 1e6:.1f} us/pair: one create check ~{per_pair * CARDS:.2f} s, "
+          f"full report ~{per_pair * CARDS * (CARDS - 1) / 2 / 3600:.0f} h")
+
+
+if __name__ == "__main__":
+    main()
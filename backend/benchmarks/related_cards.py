@@ -0,0 +1,65 @@
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings
+from app.services.related import RelatedCardIndex
+
+CARDS = 50_000
+QUERIES = 500
+VOCABULARY = [f"term{i}" for i in range(20_000)]
+TOPICS = [random.Random(topic).sample(VOCABULARY, 200) for topic in range(500)]
+
+
+def make_card(id: int, topic: int, rng: random.Random) -> tuple:
+    # Most words come from the card's topic, the rest from the whole vocabulary.
+    words = [rng.choice(TOPICS[topic]) if rng.random() < 0.7 else rng.choice(VOCABULARY) for _ in range(300)]
+    return id, " ".join(words[:6]), " ".join(words[6:30]), " ".join(words)
+
+
+def percentiles(samples: list) -> str:
+    p95 = statistics.quantiles(samples, n=20)[-1]
+    return f"p50 {statistics.median(samples) * 1000:.2f} ms   p95 {p95 * 1000:.2f} ms"
+
+
+def main() -> None:
+    rng = random.Random(7)
+    dim = settings.RELATED_VECTOR_DIM
+    topics = {id: rng.randrange(len(TOPICS)) for id in range(1, CARDS + 1)}
+    cards = [make_card(id, topic, rng) for id, topic in topics.items()]
+    started = time.perf_counter()
+    index = RelatedCardIndex.build(cards, dim)
+    print(f"build {CARDS} cards x {dim} dims: {time.perf_counter() - started:.1f} s, {index.vectors.nbytes / 2**20:.0f} MiB")
+    
+    timings = []
+    hits = 0
+    for card_id in rng.sample(range(1, CARDS + 1), QUERIES):
+        started = time.perf_counter()
+        query = index.vectors[index.positions[card_id]]
+        related = index.top_k(query[np.newaxis, :], 10, exclude=[card_id])[0]
+        timings.append(time.perf_counter() - started)
+        hits += sum(topics[id] == topics[card_id] for id, _, _ in related)
+    print(f"top-10 single query      {percentiles(timings)}   same-topic precision {hits / (QUERIES * 10):.2f}")
+    
+    ids = rng.sample(range(1, CARDS + 1), 32)
+    started = time.perf_counter()
+    index.top_k(index.vectors[[index.positions[id] for id in ids]], 10, exclude=ids)
+    print(f"top-10 batch of 32       {(time.perf_counter() - started) * 1000:.2f} ms")
+    
+    timings = []
+    for id in range(CARDS + 1, CARDS + 201):
+        _, title, summary, content = make_card(id, rng.randrange(len(TOPICS)), rng)
+        started = time.perf_counter()
+        index.upsert(id, title, index.vectorize(title, summary, content))
+        timings.append(time.perf_counter() - started)
+    print(f"incremental upsert       {percentiles(timings)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.routing import routing_session_class
+from app.core.sqlite import create_sqlite_engines
+from app.core.utils import get_current_timestamp
+from app.models.card import KnowledgeCard
+
+SEED_CARDS = 5000
+WORKERS = 32
+EXPORTERS = 2
+DURATION_SECONDS = 10.0
+STATUSES = ("active", "archived", "draft")
+
+
+def naive_sessions(url: str):
+    # The previous setup: one shared pool, rollback journal, driver-managed transactions.
+    engine = create_async_engine(url, pool_size=20, max_overflow=30)
+    return engine, engine, sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def profile_sessions(url: str):
+    write_engine, read_engine = create_sqlite_engines(url)
+    return write_engine, read_engine, sessionmaker(
+        bind=write_engine,
+        class_=AsyncSession,
+        sync_session_class=routing_session_class(write_engine, read_engine),
+        expire_on_commit=False,
+    )
+
+
+async def seed(engine) -> None:
+    now = get_current_timestamp()
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.execute(
+            KnowledgeCard.__table__.insert(),
+            [
+                {"owner_id": 1, "title": f"Card {i}", "content": "lorem ipsum " * 40, "status": "active",
+                 "category": "notes", "created_at": now, "updated_at": now}
+                for i in range(SEED_CARDS)
+            ],
+        )
+
+
+async def read_page(db: AsyncSession) -> None:
+    result = await db.execute(
+        select(KnowledgeCard.id, KnowledgeCard.title, KnowledgeCard.updated_at)
+        .where(KnowledgeCard.owner_id == 1)
+        .order_by(KnowledgeCard.updated_at, KnowledgeCard.id)
+        .limit(50)
+    )
+    result.all()
+
+
+async def insert_card(db: AsyncSession) -> None:
+    now = get_current_timestamp()
+    db.add(KnowledgeCard(owner_id=1, title="new", content="lorem ipsum", created_at=now, updated_at=now))
+    await db.commit()
+
+
+async def read_then_write(db: AsyncSession) -> None:
+    # Mirrors the stat-tracking updates: the old value decides what the write does.
+    id = random.randint(1, SEED_CARDS)
+    result = await db.execute(select(KnowledgeCard.status).where(KnowledgeCard.id == id).with_for_update())
+    status = result.scalar_one()
+    await db.execute(
+        update(KnowledgeCard)
+        .where(KnowledgeCard.id == id)
+        .values(status=random.choice([s for s in STATUSES if s != status]), updated_at=get_current_timestamp())
+    )
+    await db.commit()
+
+
+OPERATIONS = [(read_page, 0.6), (insert_card, 0.2), (read_then_write, 0.2)]
+
+
+async def worker(Session, deadline: float, latencies: Dict[str, List[float]], errors: Counter) -> None:
+    operations, weights = zip(*OPERATIONS)
+    while time.perf_counter() < deadline:
+        operation = random.choices(operations, weights)[0]
+        started = time.perf_counter()
+        try:
+            async with Session() as db:
+                await operation(db)
+        except OperationalError as e:
+            errors["locked" if "locked" in str(e.orig) else str(e.orig)] += 1
+            continue
+        latencies[operation.__name__].append(time.perf_counter() - started)
+
+
+async def exporter(Session, deadline: float, errors: Counter) -> None:
+    # A slow streaming export keeps one read transaction open across many chunks.
+    while time.perf_counter() < deadline:
+        try:
+            async with Session() as db:
+                rows = await db.stream_scalars(select(KnowledgeCard).execution_options(yield_per=200))
+                async for _ in rows:
+                    await asyncio.sleep(0)
+        except OperationalError as e:
+            errors["locked" if "locked" in str(e.orig) else str(e.orig)] += 1
+
+
+async def run(name: str, factory, url: str) -> None:
+    write_engine, read_engine, Session = factory(url)
+    await seed(write_engine)
+    latencies: Dict[str, List[float]] = {operation.__name__: [] for operation, _ in OPERATIONS}
+    errors: Counter = Counter()
+    deadline = time.perf_counter() + DURATION_SECONDS
+    await asyncio.gather(
+        *(worker(Session, deadline, latencies, errors) for _ in range(WORKERS)),
+        *(exporter(Session, deadline, errors) for _ in range(EXPORTERS)),
+    )
+    await write_engine.dispose()
+    await read_engine.dispose()
+    
+    total = sum(len(samples) for samples in latencies.values())
+    print(f"{name}: {total / DURATION_SECONDS:.0f} ops/s, lock errors {errors.pop('locked', 0)}, other errors {dict(errors)}")
+    for operation, samples in latencies.items():
+        if samples:
+            p95 = statistics.quantiles(samples, n=20)[-1] * 1000
+            print(f"  {operation:<16}{len(samples):>8} ok   p50 {statistics.median(samples) * 1000:>7.1f} ms   p95 {p95:>7.1f} ms")
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        for name, factory in (("naive", naive_sessions), ("profile", profile_sessions)):
+            await run(name, factory, f"sqlite+aiosqlite:///{directory}/{name}.db")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
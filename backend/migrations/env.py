@@ -0,0 +1,64 @@
+import asyncio
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+import app.models
+from app.core.config import settings
+from app.core.search import KNOWLEDGE_CARD_FTS_TABLE, KNOWLEDGE_CARD_SEARCH_VECTOR
+
+config = context.config
+# The app passes its own connection at startup and keeps its logging setup.
+connection = config.attributes.get("connection")
+if connection is None and config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = SQLModel.metadata
+
+
+def include_name(name, type_, parent_names) -> bool:
+    # Full-text search objects are created by revision 0001, not by the models.
+    if type_ == "table":
+        return not name.startswith(KNOWLEDGE_CARD_FTS_TABLE)
+    if type_ == "column":
+        return name != KNOWLEDGE_CARD_SEARCH_VECTOR
+    if type_ == "index":
+        return name != f"ix_knowledge_cards_{KNOWLEDGE_CARD_SEARCH_VECTOR}"
+    return True
+
+
+def configure(**kwargs) -> None:
+    context.configure(
+        target_metadata=target_metadata,
+        include_name=include_name,
+        render_as_batch=True,
+        **kwargs
+    )
+
+
+def run_migrations_offline() -> None:
+    configure(url=settings.database_url, literal_binds=True, dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    configure(connection=connection)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    engine = create_async_engine(settings.database_url)
+    async with engine.begin() as connection:
+        await connection.run_sync(do_run_migrations)
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+elif connection is not None:
+    do_run_migrations(connection)
+else:
+    asyncio.run(run_async_migrations())
@@ -0,0 +1,292 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of the schema the create_all() startup used to produce, so later
+# model changes never rewrite this revision.
+metadata = sa.MetaData()
+
+sa.Table(
+    "users",
+    metadata,
+    sa.Column("id", sa.Integer(), primary_key=True),
+    sa.Column("email", sa.String(255), nullable=False),
+    sa.Column("username", sa.String(100), nullable=False),
+    sa.Column("full_name", sa.String(255), nullable=True),
+    sa.Column("hashed_password", sa.String(), nullable=False),
+    sa.Column("is_active", sa.Boolean(), nullable=False),
+    sa.Column("is_superuser", sa.Boolean(), nullable=False),
+    sa.Column("created_at", sa.DateTime(), nullable=False),
+    sa.Column("updated_at", sa.DateTime(), nullable=False),
+    sa.Index("ix_users_email", "email", unique=True),
+    sa.Index("ix_users_username", "username", unique=True),
+)
+
+sa.Table(
+    "user_profiles",
+    metadata,
+    sa.Column("id", sa.Integer(), primary_key=True),
+    sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False, unique=True),
+    sa.Column("bio", sa.String(), nullable=True),
+    sa.Column("avatar_url", sa.String(), nullable=True),
+    sa.Column("location", sa.String(), nullable=True),
+    sa.Column("website", sa.String(), nullable=True),
+    sa.Column("theme_preference", sa.String(), nullable=False),
+    sa.Column("language", sa.String(), nullable=False),
+    sa.Column("notification_preferences", sa.JSON(), nullable=True),
+    sa.Column("created_at", sa.DateTime(), nullable=False),
+    sa.Column("updated_at", sa.DateTime(), nullable=False),
+)
+
+knowledge_cards = sa.Table(
+    "knowledge_cards",
+    metadata,
+    sa.Column("id", sa.Integer(), primary_key=True),
+    sa.Column("title", sa.String(500), nullable=False),
+    sa.Column("content", sa.Text(), nullable=False),
+    sa.Column("content_type", sa.String(), nullable=False),
+    sa.Column("summary", sa.String(), nullable=True),
+    sa.Column("tags", sa.String(1000), nullable=True),
+    sa.Column("category", sa.String(100), nullable=True),
+    sa.Column("status", sa.String(), nullable=False),
+    sa.Column("priority", sa.Integer(), nullable=False),
+    sa.Column("is_favorite", sa.Boolean(), nullable=False),
+    sa.Column("is_public", sa.Boolean(), nullable=False),
+    sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+    sa.Column("created_at", sa.DateTime(), nullable=False),
+    sa.Column("updated_at", sa.DateTime(), nullable=False),
+    sa.Column("last_accessed", sa.DateTime(), nullable=True),
+    sa.Index("ix_knowledge_cards_title", "title"),
+    sa.Index("ix_knowledge_cards_category", "category"),
+    sa.Index("ix_knowledge_cards_owner_id", "owner_id"),
+)
+sa.Index(
+    "ix_knowledge_cards_owner_id_updated_at_id",
+    knowledge_cards.c.owner_id,
+    knowledge_cards.c.updated_at.desc(),
+    knowledge_cards.c.id,
+)
+
+sa.Table(
+    "notebooks",
+    metadata,
+    sa.Column("id", sa.Integer(), primary_key=True),
+    sa.Column("name", sa.String(200), nullable=False),
+    sa.Column("description", sa.String(), nullable=True),
+    sa.Column("color", sa.String(), nullable=False),
+    sa.Column("is_default", sa.Boolean(), nullable=False),
+    sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+    sa.Column("created_at", sa.DateTime(), nullable=False),
+    sa.Column("updated_at", sa.DateTime(), nullable=False),
+    sa.Index("ix_notebooks_name", "name"),
+    sa.Index("ix_notebooks_owner_id", "owner_id"),
+)
+
+sa.Table(
+    "card_references",
+    metadata,
+    sa.Column("id", sa.Integer(), primary_key=True),
+    sa.Column("card_id", sa.Integer(), sa.ForeignKey("knowledge_cards.id"), nullable=False),
+    sa.Column("referenced_card_id", sa.Integer(), sa.ForeignKey("knowledge_cards.id"), nullable=False),
+    sa.Column("reference_type", sa.String(), nullable=False),
+    sa.Column("description", sa.String(), nullable=True),
+    sa.Column("created_at", sa.DateTime(), nullable=False),
+    sa.Index("ix_card_references_card_id_referenced_card_id", "card_id", "referenced_card_id"),
+    sa.Index("ix_card_references_referenced_card_id_card_id", "referenced_card_id", "card_id"),
+)
+
+media_items = sa.Table(
+    "media_items",
+    metadata,
+    sa.Column("id", sa.Integer(), primary_key=True),
+    sa.Column("title", sa.String(500), nullable=False),
+    sa.Column("media_type", sa.String(), nullable=False),
+    sa.Column("original_title", sa.String(), nullable=True),
+    sa.Column("description", sa.String(), nullable=True),
+    sa.Column("content", sa.String(), nullable=True),
+    sa.Column("rating", sa.Float(), nullable=True),
+    sa.Column("personal_rating", sa.Float(), nullable=True),
+    sa.Column("status", sa.String(), nullable=False),
+    sa.Column("progress", sa.Float(), nullable=False),
+    sa.Column("notes", sa.String(), nullable=True),
+    sa.Column("external_id", sa.String(), nullable=True),
+    sa.Column("external_source", sa.String(), nullable=True),
+    sa.Column("poster_url", sa.String(), nullable=True),
+    sa.Column("meta_data", sa.JSON(), nullable=True),
+    sa.Column("tags", sa.String(1000), nullable=True),
+    sa.Column("category", sa.String(100), nullable=True),
+    sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+    sa.Column("created_at", sa.DateTime(), nullable=False),
+    sa.Column("updated_at", sa.DateTime(), nullable=False),
+    sa.Column("last_accessed", sa.DateTime(), nullable=True),
+    sa.Index("ix_media_items_title", "title"),
+    sa.Index("ix_media_items_category", "category"),
+    sa.Index("ix_media_items_owner_id", "owner_id"),
+)
+sa.Index(
+    "ix_media_items_owner_id_updated_at_id",
+    media_items.c.owner_id,
+    media_items.c.updated_at.desc(),
+    media_items.c.id,
+)
+
+sa.Table(
+    "media_collections",
+    metadata,
+    sa.Column("id", sa.Integer(), primary_key=True),
+    sa.Column("name", sa.String(200), nullable=False),
+    sa.Column("description", sa.String(), nullable=True),
+    sa.Column("color", sa.String(), nullable=False),
+    sa.Column("is_default", sa.Boolean(), nullable=False),
+    sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+    sa.Column("created_at", sa.DateTime(), nullable=False),
+    sa.Column("updated_at", sa.DateTime(), nullable=False),
+    sa.Index("ix_media_collections_name", "name"),
+    sa.Index("ix_media_collections_owner_id", "owner_id"),
+)
+
+sa.Table(
+    "tags",
+    metadata,
+    sa.Column("id", sa.Integer(), primary_key=True),
+    sa.Column("name", sa.String(100), nullable=False),
+    sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+    sa.Column("created_at", sa.DateTime(), nullable=False),
+    sa.UniqueConstraint("owner_id", "name", name="uq_tags_owner_id_name"),
+)
+
+sa.Table(
+    "card_tags",
+    metadata,
+    sa.Column("tag_id", sa.Integer(), sa.ForeignKey("tags.id"), primary_key=True),
+    sa.Column("card_id", sa.Integer(), sa.ForeignKey("knowledge_cards.id"), primary_key=True),
+    sa.Index("ix_card_tags_card_id_tag_id", "card_id", "tag_id"),
+)
+
+sa.Table(
+    "media_item_tags",
+    metadata,
+    sa.Column("tag_id", sa.Integer(), sa.ForeignKey("tags.id"), primary_key=True),
+    sa.Column("media_item_id", sa.Integer(), sa.ForeignKey("media_items.id"), primary_key=True),
+    sa.Index("ix_media_item_tags_media_item_id_tag_id", "media_item_id", "tag_id"),
+)
+
+sa.Table(
+    "user_stat_counters",
+    metadata,
+    sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+    sa.Column("scope", sa.String(30), primary_key=True),
+    sa.Column("key", sa.String(255), primary_key=True),
+    sa.Column("count", sa.Integer(), nullable=False),
+    sa.Column("rating_count", sa.Integer(), nullable=False),
+    sa.Column("rating_sum", sa.Float(), nullable=False),
+    sa.Column("personal_rating_count", sa.Integer(), nullable=False),
+    sa.Column("personal_rating_sum", sa.Float(), nullable=False),
+    sa.Column("progress_sum", sa.Float(), nullable=False),
+    sa.Column("updated_at", sa.DateTime(), nullable=False),
+)
+
+
+# Frozen copies of the full-text search objects as this revision created them.
+FTS_TABLE = "knowledge_cards_fts"
+SEARCH_VECTOR = "search_vector"
+
+# External-content FTS5 table kept in sync with knowledge_cards by triggers,
+# so the index never stores a second copy of the card bodies.
+SQLITE_FTS_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, summary, content,
+        content='knowledge_cards', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON knowledge_cards BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, summary, content)
+        VALUES (new.id, new.title, new.summary, new.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON knowledge_cards BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, summary, content)
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, summary, content ON knowledge_cards BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, summary, content)
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+        INSERT INTO {FTS_TABLE}(rowid, title, summary, content)
+        VALUES (new.id, new.title, new.summary, new.content);
+    END
+    """,
+]
+
+# Generated tsvector column: PostgreSQL maintains it on every write, the GIN
+# index serves the @@ lookups.
+POSTGRES_FTS_DDL = [
+    f"""
+    ALTER TABLE knowledge_cards ADD COLUMN IF NOT EXISTS {SEARCH_VECTOR} tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple'::regconfig, coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple'::regconfig, coalesce(summary, '')), 'B') ||
+        setweight(to_tsvector('simple'::regconfig, coalesce(content, '')), 'C')
+    ) STORED
+    """,
+    f"""
+    CREATE INDEX IF NOT EXISTS ix_knowledge_cards_{SEARCH_VECTOR}
+    ON knowledge_cards USING GIN ({SEARCH_VECTOR})
+    """,
+]
+
+
+def install_fulltext_search(conn: sa.engine.Connection) -> None:
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        exists = conn.execute(
+            sa.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE},
+        ).first()
+        for statement in SQLITE_FTS_DDL:
+            conn.execute(sa.text(statement))
+        if not exists:
+            conn.execute(
+                sa.text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+            )
+    elif dialect == "postgresql":
+        for statement in POSTGRES_FTS_DDL:
+            conn.execute(sa.text(statement))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # Databases from the create_all() era already hold some of these tables and
+    # may lack indexes added since; checkfirst adopts them and fills the gaps.
+    metadata.create_all(bind, checkfirst=True)
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind, checkfirst=True)
+    install_fulltext_search(bind)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        op.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    metadata.drop_all(bind)
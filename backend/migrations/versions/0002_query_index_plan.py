@@ -0,0 +1,67 @@
+"""query index plan
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The 0001 keyset indexes mixed updated_at DESC with id ASC, which left a sort step on
+# every page; all-ascending columns serve both cursor directions by scanning either way.
+KEYSET_INDEXES = [
+    ("ix_knowledge_cards_owner_id_updated_at_id", "knowledge_cards"),
+    ("ix_media_items_owner_id_updated_at_id", "media_items"),
+]
+
+# (index, table, filter column): each owner-scoped list filter, keyset-ordered on (updated_at, id).
+COMPOSITE_INDEXES = [
+    ("ix_knowledge_cards_owner_id_status_updated_at_id", "knowledge_cards", "status"),
+    ("ix_knowledge_cards_owner_id_category_updated_at_id", "knowledge_cards", "category"),
+    ("ix_knowledge_cards_owner_id_is_favorite_updated_at_id", "knowledge_cards", "is_favorite"),
+    ("ix_media_items_owner_id_status_updated_at_id", "media_items", "status"),
+    ("ix_media_items_owner_id_media_type_updated_at_id", "media_items", "media_type"),
+    ("ix_media_items_owner_id_category_updated_at_id", "media_items", "category"),
+]
+
+# Covered by the owner-prefixed composites above.
+SUPERSEDED_INDEXES = [
+    ("ix_knowledge_cards_owner_id", "knowledge_cards", "owner_id"),
+    ("ix_knowledge_cards_category", "knowledge_cards", "category"),
+    ("ix_media_items_owner_id", "media_items", "owner_id"),
+    ("ix_media_items_category", "media_items", "category"),
+]
+
+
+def upgrade() -> None:
+    for name, table in KEYSET_INDEXES:
+        op.drop_index(name, table_name=table)
+        op.create_index(name, table, ["owner_id", "updated_at", "id"])
+    for name, table, column in COMPOSITE_INDEXES:
+        op.create_index(name, table, ["owner_id", column, "updated_at", "id"])
+    for name, table, _ in SUPERSEDED_INDEXES:
+        op.drop_index(name, table_name=table)
+    # Single-column reference indexes replaced by composites in 0001; only
+    # databases adopted from create_all() still carry them.
+    op.drop_index("ix_card_references_card_id", table_name="card_references", if_exists=True)
+    op.drop_index("ix_card_references_referenced_card_id", table_name="card_references", if_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, column in SUPERSEDED_INDEXES:
+        op.create_index(name, table, [column])
+    for name, table, _ in COMPOSITE_INDEXES:
+        op.drop_index(name, table_name=table)
+    for name, table in KEYSET_INDEXES:
+        op.drop_index(name, table_name=table)
+        op.create_index(name, table, ["owner_id", sa.text("updated_at DESC"), "id"])
@@ -0,0 +1,43 @@
+"""sync change log
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sync_counters",
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("compacted_seq", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "sync_changes",
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("entity_type", sa.String(20), primary_key=True),
+        sa.Column("entity_id", sa.Integer(), primary_key=True),
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("deleted", sa.Boolean(), nullable=False),
+        sa.Column("changed_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_sync_changes_owner_id_seq", "sync_changes", ["owner_id", "seq"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sync_changes_owner_id_seq", table_name="sync_changes")
+    op.drop_table("sync_changes")
+    op.drop_table("sync_counters")
@@ -0,0 +1,72 @@
+"""card links
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+import re
+from typing import Optional, Sequence, Set, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 500
+
+# Frozen copy of app.services.wikilinks parsing as of this revision.
+WIKILINK_RE = re.compile(r"\[\[([^\[\]|#\n]+)(?:#[^\[\]|\n]*)?(?:\|[^\[\]\n]*)?\]\]")
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_title(title: str) -> str:
+    return WHITESPACE_RE.sub(" ", title).strip().casefold()
+
+
+def extract_wikilinks(content: Optional[str]) -> Set[str]:
+    if not content or "[[" not in content:
+        return set()
+    return {normalize_title(match) for match in WIKILINK_RE.findall(content)} - {""}
+
+
+def upgrade() -> None:
+    card_links = op.create_table(
+        "card_links",
+        sa.Column("card_id", sa.Integer(), sa.ForeignKey("knowledge_cards.id"), primary_key=True),
+        sa.Column("title", sa.String(), primary_key=True),
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+    )
+    op.create_index("ix_card_links_owner_id_title", "card_links", ["owner_id", "title"])
+
+    # Titles are normalized in Python, so existing links are parsed here rather than in SQL.
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        cards = connection.execute(
+            sa.text(
+                "SELECT id, owner_id, content FROM knowledge_cards "
+                "WHERE id > :last_id AND content LIKE '%[[%' ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE},
+        ).all()
+        if not cards:
+            break
+        rows = [
+            {"card_id": card_id, "title": title, "owner_id": owner_id}
+            for card_id, owner_id, content in cards
+            for title in extract_wikilinks(content)
+        ]
+        if rows:
+            op.bulk_insert(card_links, rows)
+        last_id = cards[-1][0]
+
+
+def downgrade() -> None:
+    op.drop_index("ix_card_links_owner_id_title", table_name="card_links")
+    op.drop_table("card_links")
@@ -0,0 +1,99 @@
+"""backfill tags
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+TAG_NAME_MAX_LENGTH = 100
+
+tags = sa.table(
+    "tags",
+    sa.column("id", sa.Integer()),
+    sa.column("name", sa.String()),
+    sa.column("owner_id", sa.Integer()),
+    sa.column("created_at", sa.DateTime()),
+)
+card_tags = sa.table("card_tags", sa.column("tag_id", sa.Integer()), sa.column("card_id", sa.Integer()))
+media_item_tags = sa.table(
+    "media_item_tags", sa.column("tag_id", sa.Integer()), sa.column("media_item_id", sa.Integer())
+)
+
+# (table holding the comma-separated tags, link table, link column)
+TAGGED = [
+    ("knowledge_cards", card_tags, "card_id"),
+    ("media_items", media_item_tags, "media_item_id"),
+]
+
+
+def parse_tags(value: Optional[str]) -> List[str]:
+    # Frozen copy of app.crud.tag.parse_tags as of this revision.
+    names: List[str] = []
+    for name in (value or "").split(","):
+        name = name.strip().lower()[:TAG_NAME_MAX_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    # Databases whose tags were filled by the old startup backfill are left as they are.
+    if connection.execute(sa.select(tags.c.id).limit(1)).first() is not None:
+        return
+    now = datetime.utcnow()
+    tag_ids: Dict[tuple, int] = {}
+    for table_name, link_table, link_column in TAGGED:
+        source = sa.table(
+            table_name, sa.column("id", sa.Integer()), sa.column("owner_id", sa.Integer()), sa.column("tags", sa.String())
+        )
+        last_id = 0
+        while True:
+            rows = connection.execute(
+                sa.select(source.c.id, source.c.owner_id, source.c.tags)
+                .where(sa.and_(source.c.id > last_id, source.c.tags.is_not(None), source.c.tags != ""))
+                .order_by(source.c.id)
+                .limit(BACKFILL_BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            wanted = {(owner_id, name) for _, owner_id, value in rows for name in parse_tags(value)}
+            missing = sorted(wanted - tag_ids.keys())
+            if missing:
+                connection.execute(
+                    tags.insert(), [{"owner_id": owner_id, "name": name, "created_at": now} for owner_id, name in missing]
+                )
+                for owner_id in {owner_id for owner_id, _ in missing}:
+                    names = [name for tag_owner, name in missing if tag_owner == owner_id]
+                    found = connection.execute(
+                        sa.select(tags.c.name, tags.c.id).where(sa.and_(tags.c.owner_id == owner_id, tags.c.name.in_(names)))
+                    )
+                    tag_ids.update({(owner_id, name): tag_id for name, tag_id in found})
+            links = [
+                {"tag_id": tag_ids[(owner_id, name)], link_column: entity_id}
+                for entity_id, owner_id, value in rows
+                for name in parse_tags(value)
+            ]
+            if links:
+                connection.execute(link_table.insert(), links)
+
+
+def downgrade() -> None:
+    # The comma-separated columns stay the source the tags were built from; nothing to undo.
+    pass
@@ -0,0 +1,67 @@
+"""backfill statistics
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 20:30:00.000000
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (scope, key expression) for each counter family, as app.crud.stats maintains them;
+# None is the per-owner total, stored under the empty key.
+MEDIA_SCOPES = [("media", None), ("media_status", "status"), ("media_type", "media_type")]
+CARD_SCOPES = [("card", None), ("card_status", "status"), ("card_category", "COALESCE(category, '')")]
+
+INSERT_COUNTERS = """
+    INSERT INTO user_stat_counters (
+        owner_id, scope, key, count, rating_count, rating_sum,
+        personal_rating_count, personal_rating_sum, progress_sum, updated_at
+    )
+"""
+
+MEDIA_COUNTERS = INSERT_COUNTERS + """
+    SELECT owner_id, :scope, {key}, COUNT(*),
+        COUNT(rating), COALESCE(SUM(rating), 0.0),
+        COUNT(personal_rating), COALESCE(SUM(personal_rating), 0.0),
+        COALESCE(SUM(progress), 0.0), :now
+    FROM media_items
+    GROUP BY owner_id{group_by}
+"""
+
+CARD_COUNTERS = INSERT_COUNTERS + """
+    SELECT owner_id, :scope, {key}, COUNT(*), 0, 0.0, 0, 0.0, 0.0, :now
+    FROM knowledge_cards
+    GROUP BY owner_id{group_by}
+"""
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    # Databases whose counters were seeded by the old startup backfill are left as they are.
+    if connection.execute(sa.text("SELECT 1 FROM user_stat_counters LIMIT 1")).first() is not None:
+        return
+    now = datetime.utcnow()
+    for template, scopes in ((MEDIA_COUNTERS, MEDIA_SCOPES), (CARD_COUNTERS, CARD_SCOPES)):
+        for scope, key in scopes:
+            # PostgreSQL rejects a constant in GROUP BY, so the totals group by owner alone.
+            sql = template.format(key=key or "''", group_by=f", {key}" if key else "")
+            statement = sa.text(sql).bindparams(
+                sa.bindparam("scope", scope, type_=sa.String()), sa.bindparam("now", now, type_=sa.DateTime())
+            )
+            connection.execute(statement)
+
+
+def downgrade() -> None:
+    # Counters are derived data; the application keeps maintaining them either way.
+    pass
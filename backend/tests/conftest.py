@@ -0,0 +1,33 @@
+import asyncio
+import os
+import tempfile
+
+# Must be set before app.core.database builds its engines.
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/mindgarden-test.db"
+
+import pytest
+from app.core.database import engine, read_engine
+from app.core.migrations import upgrade_schema
+
+
+async def _dispose() -> None:
+    await engine.dispose()
+    await read_engine.dispose()
+
+
+def run_async(coro):
+    # Each test gets a fresh event loop, so pooled connections must not outlive it.
+    async def main():
+        try:
+            return await coro
+        finally:
+            await _dispose()
+    return asyncio.run(main())
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    async def upgrade():
+        async with engine.begin() as conn:
+            await conn.run_sync(upgrade_schema)
+    run_async(upgrade())
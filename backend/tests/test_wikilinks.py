@@ -0,0 +1,113 @@
+from itertools import count
+from typing import List
+from sqlalchemy import delete, insert
+from app.core.database import AsyncSessionLocal
+from app.crud.card import card_reference_crud, knowledge_card_crud
+from app.crud.user import user_crud
+from app.models.card import CardReference, KnowledgeCard
+from app.schemas.card import KnowledgeCardCreate, KnowledgeCardUpdate
+from app.schemas.user import UserCreate
+from app.services.wikilinks import WIKILINK_REFERENCE_TYPE
+from conftest import run_async
+
+_users = count(1)
+
+
+async def new_owner(db) -> int:
+    n = next(_users)
+    user = await user_crud.create(
+        db, obj_in=UserCreate(email=f"wikilinks{n}@example.com", username=f"wikilinks{n}", password="secret123")
+    )
+    return user.id
+
+
+async def create(db, owner_id: int, title: str, content: str = "") -> int:
+    card = await knowledge_card_crud.create(db, obj_in=KnowledgeCardCreate(title=title, content=content), owner_id=owner_id)
+    return card.id
+
+
+async def links(db, card_id: int) -> List[int]:
+    references = await card_reference_crud.get_by_card_id(db, card_id=card_id)
+    return sorted(r.referenced_card_id for r in references if r.reference_type == WIKILINK_REFERENCE_TYPE)
+
+
+def test_link_resolves_when_target_is_created_later():
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            owner_id = await new_owner(db)
+            alpha = await create(db, owner_id, "Alpha", "see [[Beta]]")
+            assert await links(db, alpha) == []
+            beta = await create(db, owner_id, "beta")
+            assert await links(db, alpha) == [beta]
+    run_async(scenario())
+
+
+def test_link_follows_renames():
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            owner_id = await new_owner(db)
+            beta = await create(db, owner_id, "Beta")
+            alpha = await create(db, owner_id, "Alpha", "see [[Beta]] and [[Gamma]]")
+            assert await links(db, alpha) == [beta]
+            await knowledge_card_crud.update(db, id=beta, owner_id=owner_id, obj_in=KnowledgeCardUpdate(title="Delta"))
+            assert await links(db, alpha) == []
+            await knowledge_card_crud.update_many(
+                db, updates={beta: KnowledgeCardUpdate(title="Gamma")}, owner_id=owner_id
+            )
+            assert await links(db, alpha) == [beta]
+    run_async(scenario())
+
+
+def test_link_resolves_to_a_recreated_card():
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            owner_id = await new_owner(db)
+            beta = await create(db, owner_id, "Beta")
+            alpha = await create(db, owner_id, "Alpha", "[[Beta]]")
+            await knowledge_card_crud.delete(db, id=beta, owner_id=owner_id)
+            assert await links(db, alpha) == []
+            recreated = await create(db, owner_id, "Beta")
+            assert await links(db, alpha) == [recreated]
+    run_async(scenario())
+
+
+def test_batch_links_between_new_cards():
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            owner_id = await new_owner(db)
+            one, two = await knowledge_card_crud.create_many(
+                db,
+                objs_in=[
+                    KnowledgeCardCreate(title="One", content="[[Two]]"),
+                    KnowledgeCardCreate(title="Two", content="[[One]]"),
+                ],
+                owner_id=owner_id
+            )
+            assert await links(db, one.id) == [two.id]
+            assert await links(db, two.id) == [one.id]
+    run_async(scenario())
+
+
+def test_links_use_titles_written_by_other_workers():
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            owner_id = await new_owner(db)
+            beta = await create(db, owner_id, "Beta")
+            alpha = await create(db, owner_id, "Alpha")
+            await knowledge_card_crud.update(db, id=alpha, owner_id=owner_id, obj_in=KnowledgeCardUpdate(content="[[Beta]]"))
+            assert await links(db, alpha) == [beta]
+            # Another worker deletes Beta and creates Gamma without going through this process.
+            async with AsyncSessionLocal() as other:
+                await other.execute(delete(CardReference).where(CardReference.referenced_card_id == beta))
+                await other.execute(delete(KnowledgeCard).where(KnowledgeCard.id == beta))
+                result = await other.execute(
+                    insert(KnowledgeCard).returning(KnowledgeCard.id),
+                    [{"title": "Gamma", "content": "", "owner_id": owner_id}]
+                )
+                gamma = result.scalar_one()
+                await other.commit()
+            await knowledge_card_crud.update(
+                db, id=alpha, owner_id=owner_id, obj_in=KnowledgeCardUpdate(content="[[Beta]] [[Gamma]]")
+            )
+            assert await links(db, alpha) == [gamma]
+    run_async(scenario())